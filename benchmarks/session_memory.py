@@ -0,0 +1,83 @@
+"""
+Benchmark the memory held by in-memory conversation history.
+
+Fills a session store the way the orchestrator does (a user message and an
+assistant answer with its intent per turn, capped at ``--history`` messages)
+once with the previous dictionary layout and once with
+:class:`~neoserve_ai.agents.conversation.MessageRecord`, and reports the memory
+allocated for each, as measured by ``tracemalloc``. Message texts are created
+before measuring, so only the per-message overhead is compared.
+
+Usage:
+    python benchmarks/session_memory.py [--sessions 100000] [--history 20]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neoserve_ai.agents.conversation import MessageRecord  # noqa: E402
+
+INTENTS = ["billing", "product_information", "general_inquiry", "technical_support"]
+
+
+def dict_message(role: str, content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """The previous layout of a history entry."""
+    return {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.utcnow().isoformat(),
+        "metadata": metadata or {}
+    }
+
+
+def fill(make: Callable[[str, str, Dict[str, Any]], Any], texts: List[str], sessions: int, history: int) -> Dict[str, list]:
+    store: Dict[str, list] = {}
+    turns = history // 2
+    for i in range(sessions):
+        messages = store[f"session-{i}"] = []
+        for turn in range(turns):
+            messages.append(make("user", texts[turn], {}))
+            messages.append(make("assistant", texts[turn + turns], {"intent": INTENTS[(i + turn) % len(INTENTS)]}))
+    return store
+
+
+def measure(make: Callable[[str, str, Dict[str, Any]], Any], texts: List[str], sessions: int, history: int) -> int:
+    """Bytes allocated by a filled store."""
+    gc.collect()
+    tracemalloc.start()
+    store = fill(make, texts, sessions, history)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare conversation history memory layouts")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--history", type=int, default=20, help="Messages kept per session")
+    args = parser.parse_args()
+
+    texts = [f"message text number {i} of a typical customer conversation" for i in range(args.history)]
+    messages = args.sessions * (args.history // 2) * 2
+    results = {
+        "dict": measure(dict_message, texts, args.sessions, args.history),
+        "MessageRecord": measure(MessageRecord.create, texts, args.sessions, args.history),
+    }
+
+    print(f"{args.sessions} sessions x {args.history} messages")
+    print(f"{'layout':<16}{'total MiB':>12}{'bytes/message':>16}")
+    for name, total in results.items():
+        print(f"{name:<16}{total / 2 ** 20:>12.1f}{total / messages:>16.0f}")
+    print(f"saved {1 - results['MessageRecord'] / results['dict']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Benchmark gunicorn worker memory and time to first request, with and without preload.
+
+For each mode the script starts gunicorn with ``gunicorn.conf.py``, waits until
+``/health/ready`` answers, and reads every worker's memory from
+``/proc/<pid>/smaps_rollup`` (Linux only). PSS splits shared pages between the
+processes that map them, so its sum is the real footprint of the worker pool.
+
+Usage:
+    python benchmarks/worker_startup.py [--workers 4] [--modes preload,no-preload]
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Fields after the parenthesized command name: state, ppid, ...
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def _wait_ready(url: str, timeout: float) -> float:
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.monotonic() - start
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def run_mode(preload: bool, workers: int, timeout: float) -> Dict[str, float]:
+    """
+    Start gunicorn in one mode and measure it.
+
+    Args:
+        preload: Whether the master preloads the application
+        workers: Number of worker processes
+        timeout: Seconds to wait for readiness
+
+    Returns:
+        Time to first request and per-worker / total memory in MiB
+    """
+    port = _free_port()
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD="true" if preload else "false",
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+    )
+    started = time.monotonic()
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "neoserve_ai.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_ready(f"http://127.0.0.1:{port}/health/live", timeout)
+        first_request = time.monotonic() - started
+        # Let every worker finish booting before reading memory
+        deadline = time.monotonic() + timeout
+        while len(_children(master.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+        time.sleep(1.0)
+
+        memory = [_memory_kb(pid) for pid in _children(master.pid)]
+        master_memory = _memory_kb(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+    n = max(len(memory), 1)
+    return {
+        "first_request_s": round(first_request, 2),
+        "worker_rss_mib": round(sum(m.get("Rss", 0) for m in memory) / n / 1024, 1),
+        "worker_pss_mib": round(sum(m.get("Pss", 0) for m in memory) / n / 1024, 1),
+        "worker_private_mib": round(
+            sum(m.get("Private_Clean", 0) + m.get("Private_Dirty", 0) for m in memory) / n / 1024, 1
+        ),
+        "total_pss_mib": round((sum(m.get("Pss", 0) for m in memory) + master_memory.get("Pss", 0)) / 1024, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure gunicorn worker RSS and time to first request")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", default="preload,no-preload")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    rows = []
+    for mode in args.modes.split(","):
+        result = run_mode(mode == "preload", args.workers, args.timeout)
+        rows.append((mode, result))
+
+    columns = list(rows[0][1])
+    print(f"{'mode':<12}" + "".join(f"{c:>20}" for c in columns))
+    for mode, result in rows:
+        print(f"{mode:<12}" + "".join(f"{result[c]:>20}" for c in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for NeoServe AI.
+
+Gunicorn reads ``./gunicorn.conf.py`` by default, so the commands in the
+Dockerfile and Procfile pick this up; their command-line flags take precedence.
+
+With ``GUNICORN_PRELOAD=true`` (the default) the master imports the application
+once and builds the read-only state (see ``neoserve_ai.agents.preload``) before
+forking, and workers share those pages copy-on-write. Each worker still opens
+its own Google Cloud clients at startup, in the application lifespan.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def when_ready(server):
+    """Warm and freeze shared state in the master once the app is loaded."""
+    if not preload_app:
+        return
+    from neoserve_ai.api.api_v1.endpoints.chat import orchestrator
+    from neoserve_ai.agents.preload import preload_shared_state
+
+    summary = preload_shared_state(orchestrator.config)
+    server.log.info(
+        f"Preloaded agents {summary['agents']} in {summary['seconds']}s; "
+        f"{summary['frozen_objects']} objects frozen before fork"
+    )
+    if summary["unavailable_sdks"]:
+        server.log.warning(f"Unavailable SDKs: {', '.join(summary['unavailable_sdks'])}")
@@ -7,10 +7,17 @@ class BaseAgent(ABC):
     Abstract base class for all agents in the NeoServe AI system.
     """
     
+    # Whether the agent still gives a useful answer when its dependency is down;
+    # agents without a local fallback are required for readiness by default
+    has_local_fallback = True
+    
     def __init__(self, agent_name: str, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the base agent.
         
+        Construction only sets up local state. Network clients are created by
+        ``initialize_agent``, which the orchestrator calls once per worker process.
+        
         Args:
             agent_name: Name of the agent
             config: Optional configuration dictionary
@@ -18,15 +25,53 @@ class BaseAgent(ABC):
         self.agent_name = agent_name
         self.config = config or {}
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        self.initialize_agent()
     
     def initialize_agent(self) -> None:
         """
-        Initialize agent-specific resources.
+        Initialize agent-specific resources (e.g. network clients).
         Override in child classes if needed.
         """
         pass
     
+    def is_initialized(self) -> bool:
+        """
+        Whether the agent's external client was set up.
+        
+        Agents that are not initialized answer from their local fallback.
+        Override in child classes that depend on an external service.
+        """
+        return True
+    
+    def health(self, max_error_rate: float = 0.5) -> Dict[str, Any]:
+        """
+        Report the agent's health from its dependency's rolling call window.
+        
+        Args:
+            max_error_rate: Failure rate at or above which the agent counts as degraded
+            
+        Returns:
+            Dictionary with the agent status ('operational', 'degraded' or
+            'fallback'), whether it initialized, and the error rate and latency
+            percentiles of its recent dependency calls
+        """
+        initialized = self.is_initialized()
+        breaker = getattr(self, "circuit_breaker", None)
+        window = breaker.snapshot() if breaker is not None else {}
+        
+        if not initialized:
+            agent_status = "fallback"
+        elif window.get("state", "closed") != "closed" or window.get("failure_rate", 0.0) >= max_error_rate:
+            agent_status = "degraded"
+        else:
+            agent_status = "operational"
+        
+        return {
+            "status": agent_status,
+            "initialized": initialized,
+            "dependency": breaker.name if breaker is not None else None,
+            **window
+        }
+    
     @abstractmethod
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,113 @@
+"""
+Compact records for in-memory conversation history.
+
+The orchestrator keeps the last ``max_history_size`` messages of every active
+session. Stored as dictionaries, each message costs a dict, an ISO timestamp
+string and a (usually empty) metadata dict. :class:`MessageRecord` keeps the same
+information in a ``__slots__`` object instead: roles and intents are interned so
+every record shares the same few strings, the timestamp is a float (Unix time),
+and the metadata dict only exists when there is metadata besides the intent.
+
+Records are converted to the dictionary shape only at the edges (agent inputs
+and API responses) with :meth:`MessageRecord.to_dict`.
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Position of a message in a session's timeline: (Unix time in microseconds, message ID)
+HistoryKey = Tuple[int, str]
+
+
+class MessageRecord:
+    """A single message of a conversation."""
+
+    __slots__ = ("role", "content", "timestamp", "intent", "metadata")
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        timestamp: Optional[float] = None,
+        intent: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.intent = sys.intern(intent) if isinstance(intent, str) else intent
+        self.metadata = metadata or None
+
+    @classmethod
+    def create(cls, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> "MessageRecord":
+        """
+        Create a record for a message sent now.
+
+        Args:
+            role: The role of the message sender ('user', 'assistant', 'system')
+            content: The message content
+            metadata: Message metadata; an ``intent`` entry is stored in its own field
+
+        Returns:
+            The record
+        """
+        intent = None
+        if metadata and "intent" in metadata:
+            metadata = dict(metadata)
+            intent = metadata.pop("intent")
+        return cls(role, content, intent=intent, metadata=metadata)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the message as a dictionary with an ISO timestamp."""
+        metadata = dict(self.metadata) if self.metadata else {}
+        if self.intent is not None:
+            metadata["intent"] = self.intent
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": datetime.utcfromtimestamp(self.timestamp).isoformat(),
+            "metadata": metadata
+        }
+
+    @property
+    def message_id(self) -> str:
+        """ID of the message, derived from its timestamp and role."""
+        return f"{int(self.timestamp * 1_000_000):x}-{self.role}"
+
+    def key(self) -> HistoryKey:
+        """Position of the message in its session's timeline."""
+        return int(self.timestamp * 1_000_000), self.message_id
+
+    def to_message(self, session_id: str) -> Dict[str, Any]:
+        """Return the message in the shape of the API's ``ChatMessage``."""
+        message = self.to_dict()
+        message["message_id"] = self.message_id
+        message["session_id"] = session_id
+        return message
+
+    def to_state(self) -> List[Any]:
+        """Return the record's fields as a list (the snapshot encoding)."""
+        return [self.role, self.content, self.timestamp, self.intent, self.metadata]
+
+    @classmethod
+    def from_state(cls, state: Sequence[Any]) -> "MessageRecord":
+        """Rebuild a record from :meth:`to_state` output."""
+        return cls(*state)
+
+    def __repr__(self) -> str:
+        return f"MessageRecord(role={self.role!r}, intent={self.intent!r}, timestamp={self.timestamp})"
+
+
+class HistoryPage(NamedTuple):
+    """One page of a session's messages, oldest first."""
+    messages: List[Dict[str, Any]]
+    # Key of the last message on the page (None for an empty page)
+    last_key: Optional[HistoryKey]
+    # Whether messages after the page are known to exist
+    has_more: bool
+
+
+def to_dicts(records: Iterable[MessageRecord]) -> List[Dict[str, Any]]:
+    """Convert records to the dictionary shape used by agents and the API."""
+    return [record.to_dict() for record in records]
@@ -1,9 +1,47 @@
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+import asyncio
+import json
 import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent
+from .escalation_queue import EscalationQueue, PRIORITY_RANKS, DEFAULT_PRIORITY_RANK
+from ..utils.sentiment import sentiment_scorer
+from ..utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from ..utils.deadline import DeadlineExceeded, remaining_timeout
 # Use our custom import wrapper for better error handling
-from .google_imports import FIRESTORE_CLIENT, FieldFilter
+from .google_imports import FIRESTORE_CLIENT, FieldFilter, firestore
+
+# Escalation statuses that still represent an open ticket for a session
+OPEN_ESCALATION_STATUSES = ["pending", "in_progress"]
+
+# Conversation turn fields kept in escalation snapshots
+SNAPSHOT_FIELDS = ("id", "role", "message", "content", "intent", "timestamp")
+SNAPSHOT_TEXT_FIELDS = ("message", "content")
+
+# Phrases that call for immediate escalation
+HIGH_PRIORITY_PHRASES = [
+    "speak to a human",
+    "talk to a person",
+    "let me talk to a manager",
+    "this is urgent",
+    "I need help now",
+    "emergency",
+    "critical issue",
+    "not working at all",
+    "cancel my account",
+    "I want to cancel"
+]
+
+# Phrases of users explicitly asking for a human
+EXPLICIT_ESCALATION_PHRASES = [
+    "speak to a human",
+    "talk to a real person",
+    "connect me with an agent",
+    "let me talk to someone",
+    "transfer me to a person"
+]
 
 class EscalationAgent(BaseAgent):
     """
@@ -11,6 +49,8 @@ class EscalationAgent(BaseAgent):
     Tracks conversation history and applies escalation rules to determine when human intervention is needed.
     """
     
+    has_local_fallback = False
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the Escalation Agent.
@@ -22,8 +62,30 @@ class EscalationAgent(BaseAgent):
                 - interaction_collection: Firestore collection for interaction history (default: 'interactions')
                 - max_unsuccessful_attempts: Number of failed resolutions before escalation (default: 3)
                 - max_wait_time: Maximum wait time before escalation (minutes, default: 30)
+                - queue_refresh_seconds: How often the pending queue is reloaded from Firestore (default: 60)
+                - snapshot_max_messages: Conversation turns embedded in an escalation (default: 10)
+                - snapshot_max_message_chars: Characters kept per embedded turn (default: 500)
+                - snapshot_max_bytes: Size budget of the embedded snapshot (default: 16384)
+                - sentiment_threshold: Compound sentiment score at or below which to escalate (default: -0.6)
+                - open_escalation_cache_size: Sessions whose open ticket ID is cached (default: 10000)
+                - firestore_timeout_seconds: Timeout of a Firestore read or write (default: 5)
         """
+        self.queue = EscalationQueue()
+        self.queue_refresh_seconds = 60
+        self.snapshot_max_messages = 10
+        self.snapshot_max_message_chars = 500
+        self.snapshot_max_bytes = 16384
+        self.sentiment_scorer = sentiment_scorer
+        self.sentiment_threshold = -0.6
+        self.circuit_breaker = get_circuit_breaker("firestore")
+        # session_id -> ID of the open ticket last seen for that session, least recently used first.
+        # Entries are hints only: the ticket's status is re-checked before it is updated.
+        self._open_escalations: "OrderedDict[str, str]" = OrderedDict()
+        self._open_escalation_sessions: Dict[str, str] = {}
+        self.open_escalation_cache_size = 10000
+        self._session_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
         super().__init__("escalation_agent", config)
+        self.firestore_timeout = self.config.get("firestore_timeout_seconds", 5.0)
         self.db = None
         self.escalation_collection = None
         self.interaction_collection = None
@@ -43,7 +105,7 @@ class EscalationAgent(BaseAgent):
                 return
             
             # Initialize Firestore client using our import wrapper
-            if FIRESTORE_CLIENT is None:
+            if not FIRESTORE_CLIENT:
                 raise ValueError("Firestore client is not available. Check your Google Cloud setup and credentials.")
             self.db = FIRESTORE_CLIENT(project=project_id)
             
@@ -54,6 +116,12 @@ class EscalationAgent(BaseAgent):
             # Load configuration
             self.max_attempts = self.config.get("max_unsuccessful_attempts", 3)
             self.max_wait_minutes = self.config.get("max_wait_time", 30)
+            self.queue_refresh_seconds = self.config.get("queue_refresh_seconds", 60)
+            self.snapshot_max_messages = self.config.get("snapshot_max_messages", 10)
+            self.snapshot_max_message_chars = self.config.get("snapshot_max_message_chars", 500)
+            self.snapshot_max_bytes = self.config.get("snapshot_max_bytes", 16384)
+            self.sentiment_threshold = self.config.get("sentiment_threshold", -0.6)
+            self.open_escalation_cache_size = self.config.get("open_escalation_cache_size", 10000)
             
             # Initialize default escalation rules
             self._initialize_default_rules()
@@ -64,6 +132,10 @@ class EscalationAgent(BaseAgent):
             self.logger.error(f"Error initializing Escalation Agent: {str(e)}")
             self.db = None
     
+    def is_initialized(self) -> bool:
+        """Whether the Firestore client is available."""
+        return self.db is not None
+    
     def _initialize_default_rules(self) -> None:
         """Initialize default escalation rules if none are provided in config."""
         self.escalation_rules = self.config.get("escalation_rules", [
@@ -135,15 +207,16 @@ class EscalationAgent(BaseAgent):
             # Check escalation rules
             escalation_result = await self._check_escalation_rules(input_data, conversation_history)
             
-            # If escalation is needed, create an escalation record
+            # If escalation is needed, create (or update) the session's escalation record
             if escalation_result["needs_escalation"]:
-                await self._create_escalation_record(
+                escalation_result["escalation_id"] = await self._create_escalation_record(
                     user_id=user_id,
                     session_id=session_id,
                     reason=escalation_result["reason"],
                     priority=escalation_result["priority"],
                     suggested_agent=escalation_result["suggested_agent"],
-                    conversation_history=conversation_history
+                    conversation_history=conversation_history,
+                    conversation_summary=input_data.get("summary")
                 )
             
             return escalation_result
@@ -242,22 +315,9 @@ class EscalationAgent(BaseAgent):
         Returns:
             Dictionary with escalation decision
         """
-        high_priority_phrases = [
-            "speak to a human",
-            "talk to a person",
-            "let me talk to a manager",
-            "this is urgent",
-            "I need help now",
-            "emergency",
-            "critical issue",
-            "not working at all",
-            "cancel my account",
-            "I want to cancel"
-        ]
-        
         message = current_input.get("message", "").lower()
         
-        for phrase in high_priority_phrases:
+        for phrase in HIGH_PRIORITY_PHRASES:
             if phrase in message:
                 return {
                     "needs_escalation": True,
@@ -283,22 +343,13 @@ class EscalationAgent(BaseAgent):
         Returns:
             Dictionary with escalation decision
         """
-        # This is a simplified implementation. In production, you would use a sentiment analysis API.
-        negative_words = [
-            "angry", "frustrated", "disappointed", "terrible", "awful",
-            "horrible", "worst", "hate", "useless", "waste"
-        ]
-        
-        message = current_input.get("message", "").lower()
+        message = current_input.get("message", "")
+        sentiment = self.sentiment_scorer.score(message)
         
-        # Check for negative words and exclamation marks as a simple proxy for sentiment
-        negative_word_count = sum(1 for word in negative_words if word in message)
-        exclamation_count = message.count("!")
-        
-        if negative_word_count > 1 or (negative_word_count > 0 and exclamation_count > 1):
+        if sentiment <= self.sentiment_threshold:
             return {
                 "needs_escalation": True,
-                "reason": "Negative sentiment detected",
+                "reason": f"Negative sentiment detected (score: {sentiment:.2f})",
                 "priority": "high",
                 "suggested_agent": "customer_relations"
             }
@@ -322,15 +373,7 @@ class EscalationAgent(BaseAgent):
         """
         message = current_input.get("message", "").lower()
         
-        explicit_requests = [
-            "speak to a human",
-            "talk to a real person",
-            "connect me with an agent",
-            "let me talk to someone",
-            "transfer me to a person"
-        ]
-        
-        if any(req in message for req in explicit_requests):
+        if any(req in message for req in EXPLICIT_ESCALATION_PHRASES):
             return {
                 "needs_escalation": True,
                 "reason": "User explicitly requested human assistance",
@@ -340,6 +383,35 @@ class EscalationAgent(BaseAgent):
         
         return {"needs_escalation": False}
     
+    def is_escalation_prone(self, message: str) -> bool:
+        """
+        Cheaply check whether a message is likely to be escalated.
+        
+        Uses the phrase and sentiment rules only (no history or store lookups), so
+        it can run before a turn is admitted for processing.
+        
+        Args:
+            message: The user's message
+            
+        Returns:
+            True if the message matches an escalation phrase or is strongly negative
+        """
+        message_lower = message.lower()
+        if any(phrase.lower() in message_lower for phrase in HIGH_PRIORITY_PHRASES):
+            return True
+        if any(phrase in message_lower for phrase in EXPLICIT_ESCALATION_PHRASES):
+            return True
+        return self.sentiment_scorer.score(message) <= self.sentiment_threshold
+    
+    def has_open_escalation(self, session_id: str) -> bool:
+        """
+        Whether this worker last saw an open ticket for a session.
+        
+        Answered from the local cache without a store round-trip, so it is a hint:
+        the ticket may have been closed elsewhere since.
+        """
+        return session_id in self._open_escalations
+    
     async def _get_conversation_history(
         self,
         user_id: str,
@@ -367,12 +439,15 @@ class EscalationAgent(BaseAgent):
                 .limit(limit)
             )
             
-            docs = await query.get()
+            timeout = remaining_timeout(self.firestore_timeout)
+            docs = await self.circuit_breaker.call(lambda: query.get(timeout=timeout))
             
             # Convert to list of dictionaries and reverse to maintain chronological order
-            history = [doc.to_dict() for doc in docs]
+            history = [{"id": doc.id, **doc.to_dict()} for doc in docs]
             return history[::-1]  # Reverse to get oldest first
             
+        except (CircuitOpenError, DeadlineExceeded):
+            return []
         except Exception as e:
             self.logger.error(f"Error fetching conversation history: {str(e)}")
             return []
@@ -384,10 +459,15 @@ class EscalationAgent(BaseAgent):
         reason: str,
         priority: str = "medium",
         suggested_agent: Optional[str] = None,
-        conversation_history: Optional[List[Dict[str, Any]]] = None
-    ) -> None:
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        conversation_summary: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
         """
-        Create a new escalation record in Firestore.
+        Create an escalation record in Firestore, or update the session's open one.
+        
+        Escalation is idempotent per session: while a session has a pending or
+        in-progress escalation, repeat triggers update that ticket instead of
+        creating a new document.
         
         Args:
             user_id: The user ID
@@ -396,31 +476,239 @@ class EscalationAgent(BaseAgent):
             priority: Escalation priority (low, medium, high, critical)
             suggested_agent: Suggested agent type for handling the escalation
             conversation_history: The conversation history leading to escalation
+            conversation_summary: Rolling summary of the session's older messages
+            
+        Returns:
+            The escalation ID, or None if the record could not be written
         """
         try:
-            escalation_data = {
-                "user_id": user_id,
-                "session_id": session_id,
-                "status": "pending",
-                "reason": reason,
-                "priority": priority,
-                "suggested_agent": suggested_agent,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-                "assigned_agent": None,
-                "resolved_at": None,
-                "resolution_notes": None,
-                "conversation_snapshot": conversation_history or []
+            snapshot, omitted_ids = self._build_conversation_snapshot(conversation_history or [])
+            conversation_refs = {
+                "collection": self.interaction_collection,
+                "ids": omitted_ids
             }
             
-            # Add the escalation record to Firestore
-            doc_ref = self.db.collection(self.escalation_collection).document()
-            await doc_ref.set(escalation_data)
+            async with self._session_lock(session_id):
+                # A cached ticket may have been closed elsewhere; then look again in the store
+                for _ in range(2):
+                    open_escalation_id = await self._find_open_escalation(session_id)
+                    if not open_escalation_id:
+                        break
+                    updated_id = await self._update_open_escalation(
+                        escalation_id=open_escalation_id,
+                        session_id=session_id,
+                        reason=reason,
+                        priority=priority,
+                        snapshot=snapshot,
+                        conversation_refs=conversation_refs,
+                        conversation_summary=conversation_summary
+                    )
+                    if updated_id:
+                        return updated_id
+                
+                now = datetime.utcnow()
+                escalation_data = {
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "status": "pending",
+                    "reason": reason,
+                    "priority": priority,
+                    "suggested_agent": suggested_agent,
+                    "created_at": now,
+                    "updated_at": now,
+                    "assigned_agent": None,
+                    "resolved_at": None,
+                    "resolution_notes": None,
+                    "trigger_count": 1,
+                    "conversation_snapshot": snapshot,
+                    "conversation_refs": conversation_refs,
+                    "conversation_summary": conversation_summary
+                }
+                
+                # Add the escalation record to Firestore
+                doc_ref = self.db.collection(self.escalation_collection).document()
+                timeout = remaining_timeout(self.firestore_timeout)
+                await self.circuit_breaker.call(lambda: doc_ref.set(escalation_data, timeout=timeout))
+                self._remember_open_escalation(session_id, doc_ref.id)
+            
+            # Make the new escalation visible to human agents without a store round-trip
+            self.queue.push({"id": doc_ref.id, **escalation_data})
             
             self.logger.info(f"Created escalation record for user {user_id}, session {session_id}")
+            return doc_ref.id
             
         except Exception as e:
             self.logger.error(f"Error creating escalation record: {str(e)}")
+            return None
+    
+    async def _update_open_escalation(
+        self,
+        escalation_id: str,
+        session_id: str,
+        reason: str,
+        priority: str,
+        snapshot: List[Dict[str, Any]],
+        conversation_refs: Dict[str, Any],
+        conversation_summary: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Record a repeat trigger on a session's open escalation.
+        
+        The ticket is read first and only updated while it is still pending or in
+        progress. The update carries a ``last_update_time`` precondition, so a
+        ticket closed in between is not reopened.
+        
+        Args:
+            escalation_id: ID of the open escalation
+            session_id: The conversation session ID
+            reason: Reason for the latest trigger
+            priority: Priority of the latest trigger
+            snapshot: Bounded conversation snapshot
+            conversation_refs: References to turns left out of the snapshot
+            conversation_summary: Rolling summary of the session's older messages
+            
+        Returns:
+            The escalation ID, or None if the ticket is no longer open
+        """
+        doc_ref = self.db.collection(self.escalation_collection).document(escalation_id)
+        timeout = remaining_timeout(self.firestore_timeout)
+        current = await self.circuit_breaker.call(lambda: doc_ref.get(timeout=timeout))
+        data = current.to_dict() if current.exists else None
+        if not data or data.get("status") not in OPEN_ESCALATION_STATUSES:
+            self._forget_open_escalation(escalation_id)
+            self.queue.discard(escalation_id)
+            return None
+        
+        priority = self._higher_priority(data.get("priority", "medium"), priority)
+        now = datetime.utcnow()
+        update_data = {
+            "reason": reason,
+            "priority": priority,
+            "updated_at": now,
+            "last_triggered_at": now,
+            "trigger_count": firestore.Increment(1),
+            "conversation_snapshot": snapshot,
+            "conversation_refs": conversation_refs
+        }
+        if conversation_summary is not None:
+            update_data["conversation_summary"] = conversation_summary
+        
+        option = self.db.write_option(last_update_time=current.update_time)
+        timeout = remaining_timeout(self.firestore_timeout)
+        await self.circuit_breaker.call(lambda: doc_ref.update(update_data, option=option, timeout=timeout))
+        self._remember_open_escalation(session_id, escalation_id)
+        
+        # Re-rank the queued ticket if its priority went up
+        queued = self.queue.get(escalation_id)
+        if queued is not None and queued.get("priority") != priority:
+            self.queue.push({**queued, "priority": priority, "reason": reason, "updated_at": now})
+        
+        self.logger.info(f"Updated open escalation {escalation_id} for session {session_id}")
+        return escalation_id
+    
+    async def _find_open_escalation(self, session_id: str) -> Optional[str]:
+        """
+        Find the open escalation for a session.
+        
+        Args:
+            session_id: The conversation session ID
+            
+        Returns:
+            The escalation ID, or None if the session has no open escalation
+        """
+        if session_id in self._open_escalations:
+            self._open_escalations.move_to_end(session_id)
+            return self._open_escalations[session_id]
+        
+        # Fall back to the store for escalations opened by another worker or before a restart
+        query = (
+            self.db.collection(self.escalation_collection)
+            .where(filter=FieldFilter("session_id", "==", session_id))
+            .where(filter=FieldFilter("status", "in", OPEN_ESCALATION_STATUSES))
+            .limit(1)
+        )
+        timeout = remaining_timeout(self.firestore_timeout)
+        docs = await self.circuit_breaker.call(lambda: query.get(timeout=timeout))
+        for doc in docs:
+            self._remember_open_escalation(session_id, doc.id)
+            return doc.id
+        return None
+    
+    def _remember_open_escalation(self, session_id: str, escalation_id: str) -> None:
+        """Cache a session's open ticket, evicting the least recently used sessions."""
+        previous = self._open_escalations.pop(session_id, None)
+        if previous is not None:
+            self._open_escalation_sessions.pop(previous, None)
+        self._open_escalations[session_id] = escalation_id
+        self._open_escalation_sessions[escalation_id] = session_id
+        while len(self._open_escalations) > max(self.open_escalation_cache_size, 0):
+            _, evicted = self._open_escalations.popitem(last=False)
+            self._open_escalation_sessions.pop(evicted, None)
+    
+    @asynccontextmanager
+    async def _session_lock(self, session_id: str) -> AsyncIterator[None]:
+        """Serialize escalation writes for a session so concurrent triggers cannot race."""
+        lock, users = self._session_locks.get(session_id, (asyncio.Lock(), 0))
+        self._session_locks[session_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._session_locks[session_id]
+            if users <= 1:
+                del self._session_locks[session_id]
+            else:
+                self._session_locks[session_id] = (lock, users - 1)
+    
+    def _build_conversation_snapshot(
+        self,
+        conversation_history: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Build a size-bounded conversation snapshot for an escalation record.
+        
+        Only the most recent turns are embedded, long messages are truncated and
+        the snapshot is kept under the configured byte budget. Older turns are
+        stored by reference to their interaction documents.
+        
+        Args:
+            conversation_history: Conversation turns, oldest first
+            
+        Returns:
+            Tuple of (embedded turns, IDs of turns left out of the snapshot)
+        """
+        max_messages = max(self.snapshot_max_messages, 0)
+        split = max(len(conversation_history) - max_messages, 0)
+        older, recent = conversation_history[:split], conversation_history[split:]
+        
+        snapshot = []
+        for turn in recent:
+            entry = {key: turn[key] for key in SNAPSHOT_FIELDS if key in turn}
+            for key in SNAPSHOT_TEXT_FIELDS:
+                text = entry.get(key)
+                if isinstance(text, str) and len(text) > self.snapshot_max_message_chars:
+                    entry[key] = text[:self.snapshot_max_message_chars] + "..."
+                    entry["truncated"] = True
+            snapshot.append(entry)
+        
+        # Drop the oldest embedded turns until the snapshot fits the byte budget
+        sizes = [len(json.dumps(entry, default=str).encode("utf-8")) for entry in snapshot]
+        total = sum(sizes)
+        dropped = 0
+        while dropped < len(snapshot) and total > self.snapshot_max_bytes:
+            total -= sizes[dropped]
+            dropped += 1
+        
+        omitted = older + recent[:dropped]
+        omitted_ids = [turn["id"] for turn in omitted if turn.get("id")]
+        return snapshot[dropped:], omitted_ids
+    
+    @staticmethod
+    def _higher_priority(current: str, new: str) -> str:
+        """Return whichever of two priorities should be served first."""
+        current_rank = PRIORITY_RANKS.get(current, DEFAULT_PRIORITY_RANK)
+        new_rank = PRIORITY_RANKS.get(new, DEFAULT_PRIORITY_RANK)
+        return new if new_rank < current_rank else current
     
     async def get_active_escalations(
         self,
@@ -431,6 +719,9 @@ class EscalationAgent(BaseAgent):
         """
         Retrieve active escalations matching the given criteria.
         
+        Pending escalations are served from the in-process priority queue, ordered
+        by priority and then age. Other statuses are queried from Firestore.
+        
         Args:
             status: Status filter (default: 'pending')
             priority: Optional priority filter (low, medium, high, critical)
@@ -441,28 +732,154 @@ class EscalationAgent(BaseAgent):
         """
         if not self.db:
             return []
+        
+        if status == "pending":
+            await self.refresh_queue()
+            return self.queue.peek(priority=priority, limit=limit)
             
         try:
-            query = self.db.collection(self.escalation_collection)
-            
-            # Apply filters
-            query = query.where("status", "==", status)
+            return await self._query_escalations(status, priority=priority, limit=limit)
             
-            if priority:
-                query = query.where("priority", "==", priority)
+        except Exception as e:
+            self.logger.error(f"Error retrieving active escalations: {str(e)}")
+            return []
+    
+    async def refresh_queue(self, force: bool = False) -> None:
+        """
+        Reload the pending escalation queue from Firestore if it is stale.
+        
+        Args:
+            force: Reload even if the queue was refreshed recently
+        """
+        if not self.db:
+            return
+        if not force and not self.queue.is_stale(self.queue_refresh_seconds):
+            return
+        
+        try:
+            records = await self._query_escalations("pending")
+            self.queue.load(records)
+            self.logger.debug(f"Loaded {len(records)} pending escalations into the queue")
             
-            # Order by creation time (oldest first)
-            query = query.order_by("created_at", direction="ASCENDING").limit(limit)
+        except Exception as e:
+            self.logger.error(f"Error refreshing escalation queue: {str(e)}")
+    
+    async def claim_escalation(
+        self,
+        agent_id: str,
+        escalation_id: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Claim a pending escalation for a human agent.
+        
+        The claim is taken atomically from the in-process queue, so two agents
+        served by this worker can never receive the same escalation, and is then
+        written to Firestore only if the ticket is still pending there, so two
+        workers cannot both claim it either.
+        
+        Args:
+            agent_id: ID of the human agent claiming the escalation
+            escalation_id: Specific escalation to claim; the next one in priority order if omitted
+            priority: Optional priority filter when claiming the next escalation
             
-            # Execute query
-            docs = await query.get()
+        Returns:
+            The claimed escalation record, or None if nothing could be claimed
+        """
+        if not self.db:
+            return None
+        
+        await self.refresh_queue()
+        
+        if escalation_id:
+            record = self.queue.claim(escalation_id, agent_id)
+        else:
+            record = self.queue.claim_next(agent_id, priority=priority)
+        
+        if record is None:
+            return None
+        
+        try:
+            claimed = await self._claim_in_store(record["id"], agent_id)
+        except Exception as e:
+            self.logger.error(f"Error claiming escalation {record['id']}: {str(e)}")
+            # Put the escalation back so another agent can pick it up
+            self.queue.push({**record, "status": "pending", "assigned_agent": None})
+            return None
+        
+        if not claimed:
+            self.logger.info(f"Escalation {record['id']} was already taken by another worker")
+            return None
+        
+        return record
+    
+    async def _claim_in_store(self, escalation_id: str, agent_id: str) -> bool:
+        """
+        Mark an escalation as in progress if it is still pending in Firestore.
+        
+        The update carries a ``last_update_time`` precondition from the read, so
+        it fails if another worker changed the ticket in between.
+        
+        Args:
+            escalation_id: The ID of the escalation to claim
+            agent_id: ID of the human agent claiming it
             
-            # Convert to list of dictionaries
-            return [{"id": doc.id, **doc.to_dict()} for doc in docs]
+        Returns:
+            True if the escalation was claimed, False if it is no longer pending
+        """
+        doc_ref = self.db.collection(self.escalation_collection).document(escalation_id)
+        timeout = remaining_timeout(self.firestore_timeout)
+        snapshot = await self.circuit_breaker.call(lambda: doc_ref.get(timeout=timeout))
+        if not snapshot.exists or (snapshot.to_dict() or {}).get("status") != "pending":
+            return False
+        
+        option = self.db.write_option(last_update_time=snapshot.update_time)
+        update_data = {
+            "status": "in_progress",
+            "assigned_agent": agent_id,
+            "updated_at": datetime.utcnow()
+        }
+        timeout = remaining_timeout(self.firestore_timeout)
+        await self.circuit_breaker.call(lambda: doc_ref.update(update_data, option=option, timeout=timeout))
+        self.logger.info(f"Updated escalation {escalation_id} to status: in_progress")
+        return True
+    
+    async def _query_escalations(
+        self,
+        status: str,
+        priority: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query escalation records from Firestore.
+        
+        Args:
+            status: Status filter
+            priority: Optional priority filter
+            limit: Optional maximum number of records
             
-        except Exception as e:
-            self.logger.error(f"Error retrieving active escalations: {str(e)}")
-            return []
+        Returns:
+            List of escalation records, oldest first
+        """
+        query = self.db.collection(self.escalation_collection)
+        
+        # Apply filters
+        query = query.where("status", "==", status)
+        
+        if priority:
+            query = query.where("priority", "==", priority)
+        
+        # Order by creation time (oldest first)
+        query = query.order_by("created_at", direction="ASCENDING")
+        if limit:
+            query = query.limit(limit)
+        
+        # Execute query
+        timeout = remaining_timeout(self.firestore_timeout)
+        docs = await self.circuit_breaker.call(lambda: query.get(timeout=timeout))
+        
+        # Convert to list of dictionaries
+        return [{"id": doc.id, **doc.to_dict()} for doc in docs]
     
     async def update_escalation_status(
         self,
@@ -501,7 +918,13 @@ class EscalationAgent(BaseAgent):
                     update_data["resolution_notes"] = resolution_notes
             
             doc_ref = self.db.collection(self.escalation_collection).document(escalation_id)
-            await doc_ref.update(update_data)
+            timeout = remaining_timeout(self.firestore_timeout)
+            await self.circuit_breaker.call(lambda: doc_ref.update(update_data, timeout=timeout))
+            
+            if status != "pending":
+                self.queue.discard(escalation_id)
+            if status not in OPEN_ESCALATION_STATUSES:
+                self._forget_open_escalation(escalation_id)
             
             self.logger.info(f"Updated escalation {escalation_id} to status: {status}")
             return True
@@ -509,3 +932,9 @@ class EscalationAgent(BaseAgent):
         except Exception as e:
             self.logger.error(f"Error updating escalation status: {str(e)}")
             return False
+    
+    def _forget_open_escalation(self, escalation_id: str) -> None:
+        """Allow a new escalation for the session whose ticket was closed."""
+        session_id = self._open_escalation_sessions.pop(escalation_id, None)
+        if session_id is not None:
+            self._open_escalations.pop(session_id, None)
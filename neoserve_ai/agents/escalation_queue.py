@@ -0,0 +1,302 @@
+"""
+In-process priority queue of pending escalations.
+
+Human agents used to poll Firestore for pending escalations ordered only by
+creation time. This queue keeps the pending set in memory, ordered by priority
+and then age, so the dashboard can be served without a Firestore query per poll.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is served first
+PRIORITY_RANKS: Dict[str, int] = {
+    "critical": 0,
+    "high": 1,
+    "medium": 2,
+    "low": 3,
+}
+DEFAULT_PRIORITY_RANK = PRIORITY_RANKS["medium"]
+
+
+def _to_epoch(value: Any) -> float:
+    """Convert a Firestore/datetime/ISO timestamp to epoch seconds."""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _priority_key(priority: Any) -> str:
+    """Normalize a priority value to the key of its heap."""
+    return str(priority or "").lower()
+
+
+class EscalationQueue:
+    """
+    Priority queue of pending escalations with atomic claim semantics.
+
+    Entries are kept in one binary heap per priority, keyed by (priority rank,
+    created_at, sequence). Claiming the next escalation compares the tops of the
+    (few) priority heaps, and a priority filter goes straight to that priority's
+    heap. Claims and removals use lazy deletion, so every claim is O(log n) amortized.
+    Subscribers receive a push feed of queue changes through asyncio queues.
+
+    The queue is per-process: it is a cache of the escalation collection and
+    Firestore remains the source of truth.
+    """
+
+    def __init__(self, feed_buffer_size: int = 100):
+        """
+        Initialize an empty escalation queue.
+
+        Args:
+            feed_buffer_size: Maximum number of undelivered events kept per subscriber
+        """
+        # priority -> heap of (rank, created_at, sequence, escalation_id)
+        self._heaps: Dict[str, List[Tuple[int, float, int, str]]] = {}
+        self._heap_size = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._entry_seq: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._feed_buffer_size = feed_buffer_size
+        self.last_refreshed: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, escalation_id: str) -> bool:
+        return escalation_id in self._entries
+
+    def push(self, record: Dict[str, Any]) -> None:
+        """
+        Add a pending escalation, or re-rank it if it is already queued.
+
+        Args:
+            record: Escalation record; must contain an ``id`` key
+        """
+        escalation_id = record["id"]
+        with self._lock:
+            event = "updated" if escalation_id in self._entries else "added"
+            self._push_locked(record)
+        self._publish(event, record)
+
+    def claim(self, escalation_id: str, agent_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim a specific escalation for an agent.
+
+        Args:
+            escalation_id: ID of the escalation to claim
+            agent_id: ID of the human agent claiming it
+
+        Returns:
+            The claimed record, or None if it was already claimed or is unknown
+        """
+        with self._lock:
+            record = self._remove_locked(escalation_id)
+        if record is None:
+            return None
+        record = {**record, "status": "in_progress", "assigned_agent": agent_id}
+        self._publish("claimed", record)
+        return record
+
+    def claim_next(
+        self,
+        agent_id: str,
+        priority: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the highest priority, oldest pending escalation.
+
+        Args:
+            agent_id: ID of the human agent claiming the escalation
+            priority: Optional priority filter (only claim escalations of this priority)
+
+        Returns:
+            The claimed record, or None if no matching escalation is pending
+        """
+        with self._lock:
+            if priority is None:
+                heaps = list(self._heaps.values())
+            else:
+                heaps = [self._heaps.get(_priority_key(priority), [])]
+            best = None
+            for heap in heaps:
+                # Drop entries left behind by claims and re-ranking
+                while heap and self._entry_seq.get(heap[0][3]) != heap[0][2]:
+                    heapq.heappop(heap)
+                    self._heap_size -= 1
+                if heap and (best is None or heap[0] < best[0]):
+                    best = heap
+            record = None
+            if best is not None:
+                _, _, _, escalation_id = heapq.heappop(best)
+                self._heap_size -= 1
+                self._entry_seq.pop(escalation_id)
+                record = self._entries.pop(escalation_id)
+        if record is None:
+            return None
+        record = {**record, "status": "in_progress", "assigned_agent": agent_id}
+        self._publish("claimed", record)
+        return record
+
+    def discard(self, escalation_id: str) -> bool:
+        """
+        Remove an escalation that left the pending state (resolved, cancelled, ...).
+
+        Args:
+            escalation_id: ID of the escalation to remove
+
+        Returns:
+            True if the escalation was queued, False otherwise
+        """
+        with self._lock:
+            record = self._remove_locked(escalation_id)
+        if record is None:
+            return False
+        self._publish("removed", record)
+        return True
+
+    def get(self, escalation_id: str) -> Optional[Dict[str, Any]]:
+        """Return the queued record for an escalation, if any."""
+        return self._entries.get(escalation_id)
+
+    def peek(
+        self,
+        priority: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Return pending escalations in dispatch order without claiming them.
+
+        Args:
+            priority: Optional priority filter
+            limit: Maximum number of escalations to return
+
+        Returns:
+            List of escalation records, highest priority and oldest first
+        """
+        with self._lock:
+            return self._ordered_locked(priority=priority, limit=limit)
+
+    def load(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Replace the queue contents with records loaded from the store.
+
+        Args:
+            records: Pending escalation records, each with an ``id`` key
+        """
+        with self._lock:
+            self._heaps = {}
+            self._heap_size = 0
+            self._entries = {}
+            self._entry_seq = {}
+            for record in records:
+                self._push_locked(record)
+            self.last_refreshed = time.monotonic()
+        self._publish("reloaded", None)
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """Check whether the queue should be refreshed from the store."""
+        if self.last_refreshed is None:
+            return True
+        return time.monotonic() - self.last_refreshed > max_age_seconds
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Subscribe to the push feed of queue changes.
+
+        Returns:
+            An asyncio queue that receives event dictionaries
+        """
+        feed: asyncio.Queue = asyncio.Queue(maxsize=self._feed_buffer_size)
+        self._subscribers.add(feed)
+        return feed
+
+    def unsubscribe(self, feed: asyncio.Queue) -> None:
+        """Stop delivering events to a feed returned by :meth:`subscribe`."""
+        self._subscribers.discard(feed)
+
+    def _push_locked(self, record: Dict[str, Any]) -> None:
+        escalation_id = record["id"]
+        seq = next(self._counter)
+        rank = PRIORITY_RANKS.get(str(record.get("priority", "")).lower(), DEFAULT_PRIORITY_RANK)
+        created_at = _to_epoch(record.get("created_at"))
+        self._entries[escalation_id] = record
+        self._entry_seq[escalation_id] = seq
+        heap = self._heaps.setdefault(_priority_key(record.get("priority")), [])
+        heapq.heappush(heap, (rank, created_at, seq, escalation_id))
+        self._heap_size += 1
+        self._compact_locked()
+
+    def _remove_locked(self, escalation_id: str) -> Optional[Dict[str, Any]]:
+        # The heap entry becomes stale and is skipped when it reaches the top
+        self._entry_seq.pop(escalation_id, None)
+        record = self._entries.pop(escalation_id, None)
+        if record is not None:
+            self._compact_locked()
+        return record
+
+    def _compact_locked(self) -> None:
+        # Rebuild once stale entries dominate so the heaps stay O(n) in size
+        if self._heap_size > 2 * len(self._entries) + 32:
+            for key, heap in list(self._heaps.items()):
+                heap = [item for item in heap if self._entry_seq.get(item[3]) == item[2]]
+                if heap:
+                    heapq.heapify(heap)
+                    self._heaps[key] = heap
+                else:
+                    del self._heaps[key]
+            self._heap_size = sum(len(heap) for heap in self._heaps.values())
+
+    def _ordered_locked(
+        self,
+        priority: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        if priority is None:
+            items = itertools.chain.from_iterable(self._heaps.values())
+        else:
+            items = self._heaps.get(_priority_key(priority), [])
+        valid = (item for item in items if self._entry_seq.get(item[3]) == item[2])
+        return [self._entries[item[3]] for item in heapq.nsmallest(limit, valid)]
+
+    def _publish(self, event: str, record: Optional[Dict[str, Any]]) -> None:
+        if not self._subscribers:
+            return
+        message = {
+            "event": event,
+            "escalation_id": record.get("id") if record else None,
+            "priority": record.get("priority") if record else None,
+            "assigned_agent": record.get("assigned_agent") if record else None,
+            "depth": len(self._entries),
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        for feed in list(self._subscribers):
+            if feed.full():
+                # Slow consumers lose the oldest events rather than blocking the queue
+                try:
+                    feed.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            try:
+                feed.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning("Dropping escalation feed event for a slow subscriber")
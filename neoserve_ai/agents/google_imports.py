@@ -4,13 +4,19 @@ Wrapper module for Google Cloud imports to help with debugging and provide a sin
 This module provides a centralized way to import and access Google Cloud client libraries
 with proper error handling and logging. It ensures that all Google Cloud imports are
 handled consistently across the application.
+
+The client libraries are heavy (several seconds of imports for all of them), so the
+names exported here are :class:`LazyImport` proxies: nothing is imported until a
+proxy is first used, and an agent that is disabled or not configured never pays for
+its SDK. A proxy is falsy when its library cannot be imported, so callers check
+availability with ``if not FIRESTORE_CLIENT:``.
 """
 import sys
 import os
 import importlib
 import logging
-from pathlib import Path
-from typing import Any, Dict, Optional, Type, TypeVar
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -21,52 +27,40 @@ T = TypeVar('T')
 def debug_import(module_name: str) -> Any:
     """
     Debug helper to import a module and log information about it.
-    
+
+    The interpreter and environment details are only collected when the
+    import fails.
+
     Args:
         module_name: Fully qualified module name to import
-        
+
     Returns:
         The imported module
-        
+
     Raises:
         ImportError: If the module cannot be imported
     """
-    debug_info = []
-    debug_info.append(f"\n{'='*80}")
-    debug_info.append(f"Attempting to import: {module_name}")
-    debug_info.append(f"Current working directory: {os.getcwd()}")
-    debug_info.append(f"Python executable: {sys.executable}")
-    debug_info.append(f"Python path:")
-    
-    for p in sys.path:
-        debug_info.append(f"  - {p}")
-    
     try:
-        # Check if the module is already imported
-        if module_name in sys.modules:
-            module = sys.modules[module_name]
-            debug_info.append(f"✅ Module {module_name} is already imported")
-            debug_info.append(f"  Module file: {getattr(module, '__file__', 'Unknown')}")
-            logger.debug("\n".join(debug_info[-5:]))  # Log only the last few lines
-            return module
-            
-        # Try to import the module
-        module = importlib.import_module(module_name)
-        debug_info.append(f"✅ Successfully imported {module_name}")
-        debug_info.append(f"  Module file: {getattr(module, '__file__', 'Unknown')}")
-        logger.debug("\n".join(debug_info[-5:]))  # Log only the last few lines
+        module = sys.modules.get(module_name) or importlib.import_module(module_name)
+        logger.debug(f"Imported {module_name} from {getattr(module, '__file__', 'Unknown')}")
         return module
-        
+
     except ImportError as e:
-        debug_info.append(f"❌ Failed to import {module_name}")
-        debug_info.append(f"  Error: {str(e)}")
-        debug_info.append(f"  sys.path_importer_cache: {sys.path_importer_cache}")
+        debug_info = [
+            f"\n{'='*80}",
+            f"❌ Failed to import {module_name}",
+            f"  Error: {str(e)}",
+            f"Current working directory: {os.getcwd()}",
+            f"Python executable: {sys.executable}",
+            "Python path:",
+        ]
+        debug_info.extend(f"  - {p}" for p in sys.path)
         debug_info.append("  Environment variables:")
-        
+
         for k, v in os.environ.items():
             if any(x in k.upper() for x in ['PYTHON', 'PATH', 'CONDA', 'VIRTUAL_ENV']):
                 debug_info.append(f"    {k} = {v}")
-        
+
         error_msg = "\n".join(debug_info)
         logger.error(error_msg)
         raise ImportError(f"Failed to import {module_name}. See logs for details.") from e
@@ -77,20 +71,20 @@ google_imports: Dict[str, Any] = {}
 def import_google_module(module_name: str, class_name: Optional[str] = None) -> Any:
     """
     Import a Google Cloud module and optionally a specific class from it.
-    
+
     Args:
         module_name: The name of the module to import (e.g., 'google.cloud.firestore')
         class_name: Optional name of a class to import from the module
-        
+
     Returns:
         The imported module or class
-        
+
     Raises:
         ImportError: If the module or class cannot be imported
     """
     try:
         module = debug_import(module_name)
-        
+
         if class_name:
             if hasattr(module, class_name):
                 cls = getattr(module, class_name)
@@ -98,141 +92,174 @@ def import_google_module(module_name: str, class_name: Optional[str] = None) ->
                 return cls
             else:
                 raise ImportError(f"Class {class_name} not found in module {module_name}")
-        
+
         google_imports[module_name.split('.')[-1]] = module
         return module
-        
+
     except ImportError as e:
         logger.error(f"Failed to import {module_name}.{class_name or ''}: {str(e)}")
         raise
 
-# Import Google Cloud Discovery Engine
-try:
-    discoveryengine = import_google_module('google.cloud.discoveryengine')
-    SEARCH_SERVICE_CLIENT = import_google_module('google.cloud.discoveryengine', 'SearchServiceClient')
-    google_imports['discoveryengine'] = discoveryengine
-except ImportError as e:
-    logger.error("Failed to import Google Cloud Discovery Engine: %s", str(e))
-    discoveryengine = None
-    SEARCH_SERVICE_CLIENT = None
-
-# Import Google Cloud Vertex AI
-try:
-    import vertexai
-    from vertexai.preview.generative_models import GenerativeModel
-    from google.cloud import aiplatform
-    
-    # Initialize Vertex AI with project and location from environment variables
+class LazyImport:
+    """
+    Proxy for a module, or an attribute of a module, imported on first use.
+
+    Attribute access and calls are forwarded to the imported object. A failed
+    import is remembered and not retried, and makes the proxy falsy.
+    """
+
+    __slots__ = ("module_name", "attribute", "on_load", "_target", "_error", "_lock")
+
+    def __init__(
+        self,
+        module_name: str,
+        attribute: Optional[str] = None,
+        on_load: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        Initialize the proxy.
+
+        Args:
+            module_name: Fully qualified module name to import
+            attribute: Optional name of a class or submodule to take from the module
+            on_load: Optional hook called with the module once it has been imported
+        """
+        self.module_name = module_name
+        self.attribute = attribute
+        self.on_load = on_load
+        self._target: Any = None
+        self._error: Optional[ImportError] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Any:
+        """
+        Import the target if that has not happened yet and return it.
+
+        Raises:
+            ImportError: If the module or attribute cannot be imported
+        """
+        if self._target is not None:
+            return self._target
+        with self._lock:
+            if self._target is None and self._error is None:
+                try:
+                    module = import_google_module(self.module_name)
+                    if self.on_load is not None:
+                        self.on_load(module)
+                    self._target = (
+                        import_google_module(self.module_name, self.attribute)
+                        if self.attribute else module
+                    )
+                except ImportError as e:
+                    self._error = e
+            if self._error is not None:
+                raise self._error
+        return self._target
+
+    def available(self) -> bool:
+        """Whether the target can be imported (imports it if needed)."""
+        try:
+            self.load()
+            return True
+        except ImportError:
+            return False
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the target has been imported already."""
+        return self._target is not None
+
+    def __bool__(self) -> bool:
+        return self.available()
+
+    def __getattr__(self, name: str) -> Any:
+        if name in LazyImport.__slots__:
+            # Slot not set yet (e.g. while copying); never import for it
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        target = f"{self.module_name}.{self.attribute}" if self.attribute else self.module_name
+        state = "loaded" if self.loaded else ("unavailable" if self._error else "not loaded")
+        return f"<LazyImport {target} ({state})>"
+
+def _init_vertexai(vertexai_module: Any) -> None:
+    """Initialize Vertex AI with project and location from environment variables."""
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
-    
+
     if project_id:
-        vertexai.init(project=project_id, location=location)
+        vertexai_module.init(project=project_id, location=location)
         logger.info(f"Initialized Vertex AI with project: {project_id}, location: {location}")
     else:
         logger.warning("GOOGLE_CLOUD_PROJECT not set. Vertex AI initialization skipped.")
-    
-    google_imports['vertexai'] = vertexai
-    google_imports['GenerativeModel'] = GenerativeModel
-    google_imports['aiplatform'] = aiplatform
-    
-except ImportError as e:
-    logger.error("Failed to import Google Cloud Vertex AI: %s", str(e))
-    vertexai = None
-    GenerativeModel = None
-    aiplatform = None
-
-# Import Google Cloud Firestore
-try:
-    firestore = import_google_module('google.cloud.firestore')
-    firestore_v1 = import_google_module('google.cloud.firestore_v1')
-    from google.cloud.firestore_v1.base_query import FieldFilter
-    
-    FIRESTORE_CLIENT = firestore.Client
-    
-    google_imports['firestore'] = firestore
-    google_imports['firestore_v1'] = firestore_v1
-    google_imports['FieldFilter'] = FieldFilter
-except ImportError as e:
-    logger.error("Failed to import Google Cloud Firestore: %s", str(e))
-    firestore = None
-    firestore_v1 = None
-    FIRESTORE_CLIENT = None
-    FieldFilter = None
-
-# Import Google Cloud Pub/Sub
-try:
-    pubsub = import_google_module('google.cloud.pubsub_v1')
-    from google.cloud.pubsub_v1 import PublisherClient, SubscriberClient
-    
-    PUBSUB_PUBLISHER_CLIENT = PublisherClient
-    PUBSUB_SUBSCRIBER_CLIENT = SubscriberClient
-    
-    google_imports['pubsub'] = pubsub
-    google_imports['pubsub_v1'] = pubsub
-    google_imports['PublisherClient'] = PublisherClient
-    google_imports['SubscriberClient'] = SubscriberClient
-except ImportError as e:
-    logger.error("Failed to import Google Cloud Pub/Sub: %s", str(e))
-    pubsub = None
-    PUBSUB_PUBLISHER_CLIENT = None
-    PUBSUB_SUBSCRIBER_CLIENT = None
-
-# Import Google Cloud Scheduler
-try:
-    scheduler = import_google_module('google.cloud.scheduler')
-    CLOUD_SCHEDULER_CLIENT = import_google_module('google.cloud.scheduler', 'CloudSchedulerClient')
-    google_imports['scheduler'] = scheduler
-except ImportError as e:
-    logger.error("Failed to import Google Cloud Scheduler: %s", str(e))
-    scheduler = None
-    CLOUD_SCHEDULER_CLIENT = None
-
-# Import Google Cloud Tasks
-try:
-    tasks_v2 = import_google_module('google.cloud.tasks_v2')
-    CLOUD_TASKS_CLIENT = import_google_module('google.cloud.tasks_v2', 'CloudTasksClient')
-    google_imports['tasks_v2'] = tasks_v2
-except ImportError as e:
-    logger.error("Failed to import Google Cloud Tasks: %s", str(e))
-    tasks_v2 = None
-    CLOUD_TASKS_CLIENT = None
+
+# Google Cloud Discovery Engine
+discoveryengine = LazyImport('google.cloud.discoveryengine')
+SEARCH_SERVICE_CLIENT = LazyImport('google.cloud.discoveryengine', 'SearchServiceClient')
+
+# Google Cloud Vertex AI (initialized from the environment when first used)
+vertexai = LazyImport('vertexai', on_load=_init_vertexai)
+GenerativeModel = LazyImport('vertexai.preview.generative_models', 'GenerativeModel')
+aiplatform = LazyImport('google.cloud.aiplatform')
+
+# Google Cloud Firestore
+firestore = LazyImport('google.cloud.firestore')
+firestore_v1 = LazyImport('google.cloud.firestore_v1')
+FIRESTORE_CLIENT = LazyImport('google.cloud.firestore', 'Client')
+FieldFilter = LazyImport('google.cloud.firestore_v1.base_query', 'FieldFilter')
+
+# Google Cloud Pub/Sub
+pubsub = LazyImport('google.cloud.pubsub_v1')
+pubsub_v1 = pubsub
+PublisherClient = PUBSUB_PUBLISHER_CLIENT = LazyImport('google.cloud.pubsub_v1', 'PublisherClient')
+SubscriberClient = PUBSUB_SUBSCRIBER_CLIENT = LazyImport('google.cloud.pubsub_v1', 'SubscriberClient')
+
+# Google Cloud Scheduler
+scheduler = LazyImport('google.cloud.scheduler')
+CLOUD_SCHEDULER_CLIENT = LazyImport('google.cloud.scheduler', 'CloudSchedulerClient')
+
+# Google Cloud Tasks
+tasks_v2 = LazyImport('google.cloud.tasks_v2')
+CLOUD_TASKS_CLIENT = LazyImport('google.cloud.tasks_v2', 'CloudTasksClient')
 
 # Define all exports
 __all__ = [
     # Discovery Engine
     'discoveryengine', 'SEARCH_SERVICE_CLIENT',
-    
+
     # Firestore
     'firestore', 'firestore_v1', 'FIRESTORE_CLIENT', 'FieldFilter',
-    
+
     # Pub/Sub
     'pubsub', 'pubsub_v1', 'PUBSUB_PUBLISHER_CLIENT', 'PUBSUB_SUBSCRIBER_CLIENT',
     'PublisherClient', 'SubscriberClient',
-    
+
     # Scheduler
     'scheduler', 'CLOUD_SCHEDULER_CLIENT',
-    
+
     # Tasks
     'tasks_v2', 'CLOUD_TASKS_CLIENT',
-    
+
     # Vertex AI
     'vertexai', 'GenerativeModel', 'aiplatform',
-    
+
     # Utility
-    'debug_import', 'import_google_module', 'google_imports'
+    'LazyImport', 'debug_import', 'import_google_module', 'google_imports'
 ]
 
-# Update the module's __dict__ to make imports available directly
-# This allows importing directly from the module, e.g., `from neoserve_ai.agents.google_imports import FirestoreClient`
-globals().update(google_imports)
-
-# Add a final log message showing what was successfully imported
+# Import everything and report what is available
 if __name__ == "__main__":
-    logger.info("Successfully imported the following Google Cloud components:")
-    for name, obj in google_imports.items():
-        if obj is not None:
-            module = getattr(obj, '__module__', 'unknown')
-            logger.info(f"  - {name}: {module}.{obj.__name__ if hasattr(obj, '__name__') else type(obj).__name__}")
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Google Cloud components:")
+    for name in __all__:
+        proxy = globals()[name]
+        if not isinstance(proxy, LazyImport):
+            continue
+        if proxy:
+            logger.info(f"  - {name}: {proxy.module_name}{'.' + proxy.attribute if proxy.attribute else ''}")
         else:
             logger.warning(f"  - {name}: NOT AVAILABLE")
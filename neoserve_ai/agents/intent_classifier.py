@@ -1,9 +1,26 @@
 from typing import Dict, Any, List, Optional
+import asyncio
 import logging
+import time
 from .base_agent import BaseAgent
 from ..utils.vertex_ai_logger import vertex_ai_logger
+from ..utils.deadline import DeadlineExceeded, remaining_timeout
+from ..utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from ..utils.hedging import get_hedger
 from neoserve_ai.agents.google_imports import aiplatform, vertexai
 
+# Keyword rules of the fallback classifier, in priority order. Built once at
+# import, so preloading workers share them with the gunicorn master.
+RULE_BASED_INTENT_KEYWORDS = (
+    ("billing", ("bill", "invoice", "payment", "charge", "refund", "pricing")),
+    ("technical_support", ("help", "support", "issue", "problem", "not working", "error")),
+    ("product_information", ("feature", "how to", "what is", "can i", "does it", "product")),
+    ("account_management", ("account", "login", "sign up", "password", "profile")),
+    ("order_status", ("order", "track", "delivery", "shipping", "when will")),
+    ("refund_request", ("refund", "return", "cancel", "money back")),
+    ("general_inquiry", ("hello", "hi", "hey", "thank", "thanks", "bye")),
+)
+
 class IntentClassifierAgent(BaseAgent):
     """
     Agent responsible for classifying user intents and routing them to the appropriate handler.
@@ -19,9 +36,13 @@ class IntentClassifierAgent(BaseAgent):
                 - project_id: Google Cloud project ID
                 - location: Google Cloud region
                 - endpoint_id: Vertex AI endpoint ID for the classification model
+                - predict_timeout_seconds: Timeout of a prediction call (default: 10)
         """
         super().__init__("intent_classifier", config)
         self.endpoint = None
+        self.predict_timeout = self.config.get("predict_timeout_seconds", 10.0)
+        self.circuit_breaker = get_circuit_breaker("vertex_ai")
+        self.hedger = get_hedger("vertex_ai")
         self.possible_intents = [
             "billing",
             "technical_support",
@@ -70,6 +91,10 @@ class IntentClassifierAgent(BaseAgent):
             )
             self.endpoint = None
     
+    def is_initialized(self) -> bool:
+        """Whether the Vertex AI endpoint is available."""
+        return self.endpoint is not None
+    
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process the user query to determine the intent.
@@ -100,21 +125,78 @@ class IntentClassifierAgent(BaseAgent):
         
         # Otherwise, use the Vertex AI endpoint for classification
         return await self._vertex_ai_classification(message)
-    
+
+    async def classify_batch(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """
+        Classify several messages with a single prediction request.
+
+        Args:
+            messages: User message texts
+
+        Returns:
+            One classification result per message, in the same order
+        """
+        messages = [(message or "").strip() for message in messages]
+        results: List[Optional[Dict[str, Any]]] = [
+            None if message else {"intent": "unknown", "confidence": 0.0, "entities": {}}
+            for message in messages
+        ]
+        pending = [i for i, message in enumerate(messages) if message]
+
+        if pending and self.endpoint is not None:
+            instances = [{"content": messages[i], "mime_type": "text/plain"} for i in pending]
+            start = time.monotonic()
+            try:
+                timeout = remaining_timeout(self.predict_timeout)
+                prediction = await self.circuit_breaker.call(lambda: self.hedger.call(
+                    lambda: asyncio.to_thread(self.endpoint.predict, instances=instances, timeout=timeout)
+                ))
+
+                vertex_ai_logger.log_prediction(
+                    endpoint=self.endpoint.resource_name,
+                    instances=instances,
+                    parameters={"method": "predict", "batch_size": len(pending)},
+                    response=prediction,
+                    latency_seconds=time.monotonic() - start,
+                    model_name="intent_classifier"
+                )
+
+                predictions = list(prediction.predictions or [])
+                if len(predictions) == len(pending):
+                    for i, result in zip(pending, predictions):
+                        results[i] = {
+                            "intent": result.get("intent", "unknown"),
+                            "confidence": result.get("confidence", 0.0),
+                            "entities": result.get("entities", {})
+                        }
+                else:
+                    vertex_ai_logger.logger.warning(
+                        "Vertex AI returned an unexpected number of batch predictions",
+                        extra={"expected": len(pending), "received": len(predictions)}
+                    )
+            except (CircuitOpenError, DeadlineExceeded):
+                pass
+            except Exception as e:
+                self.logger.error(f"Error in Vertex AI batch classification: {str(e)}")
+                vertex_ai_logger.log_prediction(
+                    endpoint=self.endpoint.resource_name,
+                    instances=instances,
+                    parameters={"method": "predict", "batch_size": len(pending)},
+                    error=e,
+                    latency_seconds=time.monotonic() - start,
+                    model_name="intent_classifier"
+                )
+
+        # Anything the endpoint did not classify falls back to the rules
+        return [
+            result if result is not None else self._rule_based_classification(message)
+            for message, result in zip(messages, results)
+        ]
+
     async def _vertex_ai_classification(self, message: str) -> Dict[str, Any]:
         """Classify intent using Vertex AI endpoint."""
+        start = time.monotonic()
         try:
-            # Log the prediction request
-            vertex_ai_logger.log_model_call(
-                model_name="intent_classifier",
-                prompt=message,
-                parameters={"method": "predict"},
-                metadata={
-                    "endpoint": self.endpoint.resource_name,
-                    "message_length": len(message)
-                }
-            )
-            
             # Prepare the instance for prediction
             instance = {
                 "content": message,
@@ -122,7 +204,10 @@ class IntentClassifierAgent(BaseAgent):
             }
             
             # Make the prediction
-            prediction = await self.endpoint.predict(instances=[instance])
+            timeout = remaining_timeout(self.predict_timeout)
+            prediction = await self.circuit_breaker.call(lambda: self.hedger.call(
+                lambda: asyncio.to_thread(self.endpoint.predict, instances=[instance], timeout=timeout)
+            ))
             
             # Process the prediction result
             if prediction.predictions and len(prediction.predictions) > 0:
@@ -139,8 +224,10 @@ class IntentClassifierAgent(BaseAgent):
                     prompt=message,
                     parameters={"method": "predict"},
                     response=response,
+                    latency_seconds=time.monotonic() - start,
                     metadata={
                         "endpoint": self.endpoint.resource_name,
+                        "message_length": len(message),
                         "prediction_type": type(prediction).__name__
                     }
                 )
@@ -150,10 +237,13 @@ class IntentClassifierAgent(BaseAgent):
             # If no predictions, log and fall back to rule-based
             vertex_ai_logger.logger.warning(
                 "No predictions returned from Vertex AI endpoint",
-                extra={"message": message[:100]}
+                extra={"message_preview": message[:100]}
             )
             return self._rule_based_classification(message)
             
+        except (CircuitOpenError, DeadlineExceeded):
+            # Vertex AI is unhealthy or the request is out of time; skip the call entirely
+            return self._rule_based_classification(message)
         except Exception as e:
             error_msg = f"Error in Vertex AI classification: {str(e)}"
             self.logger.error(error_msg)
@@ -164,6 +254,7 @@ class IntentClassifierAgent(BaseAgent):
                 prompt=message,
                 parameters={"method": "predict"},
                 error=e,
+                latency_seconds=time.monotonic() - start,
                 metadata={
                     "endpoint": self.endpoint.resource_name if self.endpoint else None,
                     "error_type": type(e).__name__
@@ -178,28 +269,11 @@ class IntentClassifierAgent(BaseAgent):
         Simple rule-based intent classification as a fallback.
         This is a basic implementation that can be enhanced with more sophisticated rules.
         """
-        # Log fallback to rule-based classification
-        vertex_ai_logger.logger.info(
-            "Using rule-based classification fallback",
-            extra={"message_preview": (message[:100] + '...') if len(message) > 100 else message}
-        )
-        
         message_lower = message.lower()
         
-        # Define keyword patterns for each intent
-        intent_keywords = {
-            "billing": ["bill", "invoice", "payment", "charge", "refund", "pricing"],
-            "technical_support": ["help", "support", "issue", "problem", "not working", "error"],
-            "product_information": ["feature", "how to", "what is", "can i", "does it", "product"],
-            "account_management": ["account", "login", "sign up", "password", "profile"],
-            "order_status": ["order", "track", "delivery", "shipping", "when will"],
-            "refund_request": ["refund", "return", "cancel", "money back"],
-            "general_inquiry": ["hello", "hi", "hey", "thank", "thanks", "bye"]
-        }
-        
         # Check for matching intents
         matched_intents = []
-        for intent, keywords in intent_keywords.items():
+        for intent, keywords in RULE_BASED_INTENT_KEYWORDS:
             if any(keyword in message_lower for keyword in keywords):
                 matched_intents.append(intent)
         
@@ -212,13 +286,15 @@ class IntentClassifierAgent(BaseAgent):
             intent = matched_intents[0]
             confidence = min(0.9, 0.3 + (len(matched_intents) * 0.1))
         
-        # Log the matched intent
-        vertex_ai_logger.logger.info(
+        # One record per fallback classification, at DEBUG since it runs on every
+        # message when Vertex AI is not configured
+        vertex_ai_logger.logger.debug(
             f"Rule-based classification matched intent '{intent}'",
             extra={
                 "matched_intents": matched_intents,
                 "confidence": confidence,
-                "intent": intent
+                "intent": intent,
+                "message_length": len(message)
             }
         )
         
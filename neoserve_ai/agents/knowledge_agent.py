@@ -1,15 +1,29 @@
 from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 from .base_agent import BaseAgent
+from ..utils.deadline import DeadlineExceeded, remaining_timeout
+from ..utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from ..utils.hedging import get_hedger
 # Use our custom import wrapper for better error handling
 from .google_imports import SEARCH_SERVICE_CLIENT
 
+# Canned answers used while the knowledge base is unavailable, by trigger keywords
+FALLBACK_RESPONSES = (
+    (("how to", "how do i"), "Please check our help center at https://support.example.com for detailed instructions."),
+    (("contact", "support", "help"), "You can reach our support team at support@example.com or call us at 1-800-EXAMPLE."),
+    (("pricing", "cost", "how much"), "For the most up-to-date pricing information, please visit our pricing page at https://example.com/pricing."),
+    (("refund", "return", "cancel"), "For refund and return requests, please contact our support team with your order number."),
+)
+
 class KnowledgeBaseAgent(BaseAgent):
     """
     Agent responsible for answering questions using a knowledge base.
     Integrates with Vertex AI Search (Discovery Engine) for document retrieval.
     """
     
+    has_local_fallback = False
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the Knowledge Base Agent.
@@ -20,11 +34,15 @@ class KnowledgeBaseAgent(BaseAgent):
                 - location: Google Cloud region
                 - search_engine_id: Vertex AI Search engine ID
                 - serving_config_id: Serving configuration ID (defaults to 'default_config')
+                - search_timeout_seconds: Timeout of a search call (default: 10)
         """
         super().__init__("knowledge_base_agent", config)
         self.client = None
         self.search_engine = None
         self.serving_config = None
+        self.search_timeout = self.config.get("search_timeout_seconds", 10.0)
+        self.circuit_breaker = get_circuit_breaker("discovery_engine")
+        self.hedger = get_hedger("discovery_engine")
     
     def initialize_agent(self) -> None:
         """Initialize the Vertex AI Search client and configuration."""
@@ -41,7 +59,7 @@ class KnowledgeBaseAgent(BaseAgent):
                 return
             
             # Initialize the Discovery Engine client using our imported client class
-            if SEARCH_SERVICE_CLIENT is None:
+            if not SEARCH_SERVICE_CLIENT:
                 raise ImportError("Failed to import SearchServiceClient. Check logs for details.")
             self.client = SEARCH_SERVICE_CLIENT()
             
@@ -61,6 +79,10 @@ class KnowledgeBaseAgent(BaseAgent):
             self.client = None
             self.serving_config = None
     
+    def is_initialized(self) -> bool:
+        """Whether the Vertex AI Search client is available."""
+        return self.client is not None and self.serving_config is not None
+    
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process a user query against the knowledge base.
@@ -115,7 +137,10 @@ class KnowledgeBaseAgent(BaseAgent):
                 request["filter"] = self._build_filter_expression(input_data["filters"])
             
             # Execute the search
-            response = await self.client.search(request)
+            timeout = remaining_timeout(self.search_timeout)
+            response = await self.circuit_breaker.call(lambda: self.hedger.call(
+                lambda: asyncio.to_thread(self.client.search, request, timeout=timeout)
+            ))
             
             # Process the response
             if not response.results:
@@ -152,6 +177,8 @@ class KnowledgeBaseAgent(BaseAgent):
                 "sources": sources
             }
             
+        except (CircuitOpenError, DeadlineExceeded):
+            return self._fallback_response(query)
         except Exception as e:
             self.logger.error(f"Error querying knowledge base: {str(e)}")
             return self._fallback_response(query)
@@ -190,14 +217,7 @@ class KnowledgeBaseAgent(BaseAgent):
         # Simple keyword matching for common questions
         query_lower = query.lower()
         
-        responses = [
-            (["how to", "how do i"], "Please check our help center at https://support.example.com for detailed instructions."),
-            (["contact", "support", "help"], "You can reach our support team at support@example.com or call us at 1-800-EXAMPLE."),
-            (["pricing", "cost", "how much"], "For the most up-to-date pricing information, please visit our pricing page at https://example.com/pricing."),
-            (["refund", "return", "cancel"], "For refund and return requests, please contact our support team with your order number.")
-        ]
-        
-        for keywords, response in responses:
+        for keywords, response in FALLBACK_RESPONSES:
             if any(keyword in query_lower for keyword in keywords):
                 return {
                     "answer": response,
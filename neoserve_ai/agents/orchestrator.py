@@ -1,13 +1,51 @@
-from typing import Dict, Any, Optional, List, Callable, Awaitable
+from typing import Dict, Any, Optional, List, Callable, Awaitable, AsyncIterator, Iterable, Tuple, Union
 import asyncio
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from ..utils.batching import MicroBatcher, SingleFlightCache
+from ..utils.deadline import deadline_scope, run_stage
+from ..utils.metrics import counter, histogram
+from ..utils.tracing import start_trace
 from .intent_classifier import IntentClassifierAgent
 from .knowledge_agent import KnowledgeBaseAgent
 from .personalization_agent import PersonalizationAgent
 from .proactive_engagement_agent import ProactiveEngagementAgent
 from .escalation_agent import EscalationAgent
 from .base_agent import BaseAgent
+from .conversation import HistoryKey, HistoryPage, MessageRecord, to_dicts
+from .snapshot import SessionSnapshot, encode_session, write_snapshot
+from .summary import ConversationSummary, RollingSummarizer
+
+# Callback receiving (event name, event data) as a turn progresses through the pipeline
+StageEmitter = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Callback receiving server-initiated messages for a session (e.g. proactive engagements)
+SessionListener = Callable[[Dict[str, Any]], Awaitable[None]]
+
+TURN_DURATION = histogram("neoserve_chat_turn_duration_seconds", "End-to-end duration of chat turns")
+TURNS_DEGRADED = counter("neoserve_chat_turns_degraded_total", "Chat turns answered with at least one degraded stage")
+
+class BatchContext:
+    """
+    Resources shared by the turns of one bulk request.
+    
+    Intent classification is micro-batched across concurrent turns and
+    knowledge base lookups are memoized for the lifetime of the batch.
+    """
+    
+    def __init__(
+        self,
+        classify: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+        classify_batch_size: int = 32,
+        classify_max_wait: float = 0.005,
+        kb_cache_size: int = 1024
+    ):
+        self.classifier = MicroBatcher(classify, classify_batch_size, classify_max_wait)
+        self.kb_cache = SingleFlightCache(max_entries=kb_cache_size, name="knowledge_base")
+        # Completion future of the last queued turn per session; turns of the
+        # same session are chained so conversation history stays in order
+        self.session_tails: Dict[str, asyncio.Future] = {}
 
 class AgentOrchestrator:
     """
@@ -25,8 +63,23 @@ class AgentOrchestrator:
         self.logger = logging.getLogger(__name__)
         self.config = config
         self.agents = {}
-        self.conversation_history = {}
+        self.conversation_history: Dict[str, List[MessageRecord]] = {}
+        # Digest of the messages folded out of each session's history
+        self.conversation_summaries: Dict[str, ConversationSummary] = {}
+        # User each session belongs to
+        self.session_owners: Dict[str, str] = {}
+        self.session_listeners: Dict[str, List[SessionListener]] = {}
         self.max_history_size = config.get("max_history_size", 20)
+        self.summarizer = RollingSummarizer(
+            max_messages=self.max_history_size,
+            fold_size=config.get("history_fold_size")
+        )
+        # Default time budget of a turn when the caller did not set a deadline
+        self.request_budget_seconds = config.get("request_budget_seconds")
+        # Sessions are checkpointed to this file and restored from it lazily
+        self.session_snapshot_path: Optional[str] = config.get("session_snapshot_path")
+        self.session_snapshot_max_age_seconds: Optional[float] = config.get("session_snapshot_max_age_seconds")
+        self.session_snapshot: Optional[SessionSnapshot] = None
         self.initialized = False
     
     async def initialize(self) -> None:
@@ -56,7 +109,8 @@ class AgentOrchestrator:
                 config=self.config.get("escalation", {})
             )
             
-            # Initialize all agents
+            # Create the agents' clients; this runs in each worker after fork, as
+            # gRPC channels and connection pools cannot be shared across processes
             for name, agent in self.agents.items():
                 if isinstance(agent, BaseAgent):
                     agent.initialize_agent()
@@ -73,20 +127,50 @@ class AgentOrchestrator:
         user_id: str,
         session_id: str,
         message: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        emit: Optional[StageEmitter] = None,
+        batch: Optional[BatchContext] = None
     ) -> Dict[str, Any]:
         """
         Process an incoming message through the agent pipeline.
         
+        Every stage runs within the remaining budget of the request deadline
+        (see utils.deadline); a stage that runs out of time falls back to its
+        degraded path and is listed in the response's ``metadata.degraded_stages``.
+        
         Args:
             user_id: Unique identifier for the user
             session_id: Unique identifier for the conversation session
             message: The user's message
             metadata: Additional metadata for context
+            emit: Optional callback notified as each pipeline stage completes
+                ('escalation', 'intent', 'sources')
+            batch: Shared resources when the message is part of a bulk request
             
         Returns:
             Dictionary containing the agent's response and metadata
         """
+        start = time.monotonic()
+        with deadline_scope(self.request_budget_seconds) as deadline, \
+                start_trace("chat_turn", session_id=session_id) as span:
+            response = await self._run_pipeline(user_id, session_id, message, metadata, emit, batch)
+            if deadline is not None and deadline.degraded_stages:
+                response.setdefault("metadata", {})["degraded_stages"] = list(deadline.degraded_stages)
+                TURNS_DEGRADED.inc()
+            span.set_attribute("intent", response.get("intent"))
+            TURN_DURATION.observe(time.monotonic() - start)
+            return response
+    
+    async def _run_pipeline(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]],
+        emit: Optional[StageEmitter],
+        batch: Optional[BatchContext]
+    ) -> Dict[str, Any]:
+        """Run a turn through the agent pipeline (see process_message)."""
         if not self.initialized:
             await self.initialize()
             if not self.initialized:
@@ -97,14 +181,20 @@ class AgentOrchestrator:
         
         try:
             # Initialize conversation history if needed
-            if session_id not in self.conversation_history:
+            if self._get_session(session_id) is None:
                 self.conversation_history[session_id] = []
+            self.session_owners.setdefault(session_id, user_id)
             
             # Add user message to history
-            self._add_to_history(session_id, "user", message, metadata)
+            user_record = self._add_to_history(session_id, "user", message, metadata)
             
             # Check for escalation first
             escalation_result = await self._check_escalation(user_id, session_id, message)
+            await self._emit(emit, "escalation", {
+                "needs_escalation": escalation_result["needs_escalation"],
+                "reason": escalation_result.get("reason"),
+                "priority": escalation_result.get("priority")
+            })
             if escalation_result["needs_escalation"]:
                 return await self._handle_escalation(
                     user_id=user_id,
@@ -114,8 +204,18 @@ class AgentOrchestrator:
                     metadata=metadata
                 )
             
-            # Classify intent
-            intent_result = await self.agents["intent_classifier"].process({"message": message})
+            # Classify intent, falling back to the keyword rules when out of time
+            intent_classifier = self.agents["intent_classifier"]
+            intent_result = await run_stage(
+                "intent",
+                batch.classifier.submit(message) if batch is not None
+                else intent_classifier.process({"message": message}),
+                lambda: intent_classifier._rule_based_classification(message)
+            )
+            await self._emit(emit, "intent", {
+                "intent": intent_result["intent"],
+                "confidence": intent_result["confidence"]
+            })
             
             # Route based on intent
             if intent_result["intent"] in ["billing", "product_information", "general_inquiry"]:
@@ -125,8 +225,10 @@ class AgentOrchestrator:
                     message=message,
                     intent=intent_result["intent"],
                     confidence=intent_result["confidence"],
-                    metadata=metadata
+                    metadata=metadata,
+                    batch=batch
                 )
+                await self._emit(emit, "sources", {"sources": response.get("sources", [])})
             else:
                 # Default response for other intents
                 response = {
@@ -141,7 +243,8 @@ class AgentOrchestrator:
                 user_id=user_id,
                 session_id=session_id,
                 response=response,
-                metadata=metadata
+                metadata=metadata,
+                user_message=user_record
             )
             
             # Add assistant response to history
@@ -153,12 +256,16 @@ class AgentOrchestrator:
             )
             
             # Check for proactive engagement opportunities
-            await self._check_proactive_engagement(
-                user_id=user_id,
-                session_id=session_id,
-                message=message,
-                intent=intent_result["intent"],
-                metadata=metadata
+            await run_stage(
+                "proactive_engagement",
+                self._check_proactive_engagement(
+                    user_id=user_id,
+                    session_id=session_id,
+                    message=message,
+                    intent=intent_result["intent"],
+                    metadata=metadata
+                ),
+                lambda: None
             )
             
             return personalized_response
@@ -171,6 +278,174 @@ class AgentOrchestrator:
                 "processing_error"
             )
     
+    async def process_batch(
+        self,
+        requests: Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]],
+        max_concurrency: int = 8,
+        classify_batch_size: int = 32,
+        classify_max_wait: float = 0.005
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process many messages with bounded concurrency.
+        
+        Requests are consumed lazily, so an async iterator over a streamed request
+        body is never buffered in full. Messages of the same session are processed
+        in input order; other messages run concurrently.
+        
+        Args:
+            requests: Items with ``user_id``, ``session_id``, ``message`` and optional
+                ``metadata`` and ``correlation_id`` keys. An item with an ``error``
+                key is passed through as a failed result.
+            max_concurrency: Maximum number of messages processed at once
+            classify_batch_size: Maximum number of messages per intent classification call
+            classify_max_wait: Seconds to wait for a classification batch to fill up
+            
+        Yields:
+            Dictionaries with ``correlation_id``, ``status`` ('ok' or 'error') and
+            either ``session_id`` and ``response`` or ``error``, in completion order
+        """
+        if not self.initialized:
+            await self.initialize()
+        
+        if hasattr(requests, "__aiter__"):
+            source = requests.__aiter__()
+        else:
+            iterator = iter(requests)
+            
+            async def _iterate() -> AsyncIterator[Dict[str, Any]]:
+                for item in iterator:
+                    yield item
+            source = _iterate()
+        
+        if not self.initialized:
+            async for item in source:
+                yield {
+                    "correlation_id": item.get("correlation_id"),
+                    "status": "error",
+                    "error": "System initialization failed. Please try again later."
+                }
+            return
+        
+        batch = BatchContext(
+            classify=self.agents["intent_classifier"].classify_batch,
+            classify_batch_size=classify_batch_size,
+            classify_max_wait=classify_max_wait
+        )
+        
+        source_lock = asyncio.Lock()
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency * 2)
+        
+        async def worker() -> None:
+            while True:
+                async with source_lock:
+                    try:
+                        item = await source.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    # Chain the turn behind the previous turn of its session, in input order
+                    previous = done = None
+                    if "error" not in item:
+                        previous = batch.session_tails.get(item["session_id"])
+                        done = asyncio.get_running_loop().create_future()
+                        batch.session_tails[item["session_id"]] = done
+                try:
+                    if previous is not None:
+                        await asyncio.shield(previous)
+                    result = await self._process_batch_item(item, batch)
+                finally:
+                    if done is not None:
+                        if not done.done():
+                            done.set_result(None)
+                        if batch.session_tails.get(item["session_id"]) is done:
+                            del batch.session_tails[item["session_id"]]
+                await results.put(result)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, max_concurrency))]
+        
+        async def close_when_done() -> None:
+            try:
+                await asyncio.gather(*workers)
+            except Exception as e:
+                self.logger.error(f"Error reading batch requests: {str(e)}", exc_info=True)
+            finally:
+                await results.put(None)
+        
+        closer = asyncio.create_task(close_when_done())
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            closer.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+            self.logger.info(f"Batch finished. Knowledge base cache: {batch.kb_cache.stats()}")
+    
+    async def _process_batch_item(
+        self,
+        item: Dict[str, Any],
+        batch: BatchContext
+    ) -> Dict[str, Any]:
+        """
+        Process one item of a bulk request, turning failures into error results.
+        
+        Args:
+            item: The batch item (see process_batch)
+            batch: Shared resources of the bulk request
+            
+        Returns:
+            The result dictionary for the item
+        """
+        correlation_id = item.get("correlation_id")
+        if "error" in item:
+            return {"correlation_id": correlation_id, "status": "error", "error": item["error"]}
+        
+        try:
+            response = await self.process_message(
+                user_id=item["user_id"],
+                session_id=item["session_id"],
+                message=item["message"],
+                metadata=item.get("metadata"),
+                batch=batch
+            )
+            return {
+                "correlation_id": correlation_id,
+                "session_id": item["session_id"],
+                "status": "ok",
+                "response": response
+            }
+        except Exception as e:
+            self.logger.error(f"Error processing batch item {correlation_id}: {str(e)}", exc_info=True)
+            return {
+                "correlation_id": correlation_id,
+                "status": "error",
+                "error": "An error occurred while processing this message"
+            }
+    
+    async def _emit(
+        self,
+        emit: Optional[StageEmitter],
+        event: str,
+        data: Dict[str, Any]
+    ) -> None:
+        """
+        Notify a stage listener, never letting listener errors fail the turn.
+        
+        Args:
+            emit: The listener passed to process_message, if any
+            event: Name of the completed stage
+            data: Stage result to publish
+        """
+        if emit is None:
+            return
+        try:
+            await emit(event, data)
+        except Exception as e:
+            self.logger.warning(f"Error emitting '{event}' stage event: {str(e)}")
+    
     async def _check_escalation(
         self,
         user_id: str,
@@ -188,15 +463,20 @@ class AgentOrchestrator:
         Returns:
             Dictionary with escalation decision
         """
-        escalation_result = await self.agents["escalation"].process({
-            "user_id": user_id,
-            "session_id": session_id,
-            "message": message,
-            "history": self.conversation_history.get(session_id, [])[-5:],  # Last 5 messages
-            "metadata": {
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        })
+        escalation_result = await run_stage(
+            "escalation",
+            self.agents["escalation"].process({
+                "user_id": user_id,
+                "session_id": session_id,
+                "message": message,
+                "history": to_dicts((self._get_session(session_id) or [])[-5:]),  # Last 5 messages
+                "summary": self._get_conversation_summary(session_id),
+                "metadata": {
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            }),
+            lambda: {"needs_escalation": False}
+        )
         
         return escalation_result
     
@@ -247,6 +527,7 @@ class AgentOrchestrator:
             "confidence": 1.0,
             "escalation": {
                 "escalated": True,
+                "escalation_id": escalation_result.get("escalation_id"),
                 "reason": reason,
                 "priority": priority,
                 "timestamp": datetime.utcnow().isoformat()
@@ -261,7 +542,8 @@ class AgentOrchestrator:
         message: str,
         intent: str,
         confidence: float,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        batch: Optional[BatchContext] = None
     ) -> Dict[str, Any]:
         """
         Handle a query that can be answered by the knowledge base.
@@ -273,19 +555,33 @@ class AgentOrchestrator:
             intent: The detected intent
             confidence: Confidence score of the intent
             metadata: Additional metadata
+            batch: Shared resources when the message is part of a bulk request
             
         Returns:
             Response from the knowledge base
         """
         # Query the knowledge base
-        kb_response = await self.agents["knowledge_base"].process({
-            "message": message,
-            "user_id": user_id,
-            "session_id": session_id,
-            "intent": intent,
-            "confidence": confidence,
-            "metadata": metadata or {}
-        })
+        def lookup() -> Awaitable[Dict[str, Any]]:
+            return self.agents["knowledge_base"].process({
+                "message": message,
+                "user_id": user_id,
+                "session_id": session_id,
+                "intent": intent,
+                "confidence": confidence,
+                "metadata": metadata or {}
+            })
+        
+        if batch is not None:
+            # Identical questions within a batch share one knowledge base lookup
+            cache_key = (intent, " ".join(message.lower().split()))
+            search = batch.kb_cache.get_or_load(cache_key, lookup)
+        else:
+            search = lookup()
+        kb_response = await run_stage(
+            "knowledge_base",
+            search,
+            lambda: self.agents["knowledge_base"]._fallback_response(message)
+        )
         
         return {
             "response": kb_response.get("answer", "I couldn't find any information on that topic."),
@@ -300,7 +596,8 @@ class AgentOrchestrator:
         user_id: str,
         session_id: str,
         response: Dict[str, Any],
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        user_message: Optional[MessageRecord] = None
     ) -> Dict[str, Any]:
         """
         Personalize a response using the personalization agent.
@@ -310,21 +607,29 @@ class AgentOrchestrator:
             session_id: The session ID
             response: The response to personalize
             metadata: Additional metadata
+            user_message: The user's message the response answers, logged with it
             
         Returns:
             Personalized response
         """
-        personalized = await self.agents["personalization"].process({
-            "user_id": user_id,
-            "session_id": session_id,
-            "message": response.get("response", ""),
-            "intent": response.get("intent"),
-            "metadata": metadata or {}
-        })
+        # Out of time, the unpersonalized text is sent as is
+        personalized = await run_stage(
+            "personalization",
+            self.agents["personalization"].process({
+                "user_id": user_id,
+                "session_id": session_id,
+                "message": response.get("response", ""),
+                "intent": response.get("intent"),
+                "metadata": metadata or {},
+                "user_message": user_message.content if user_message is not None else None,
+                "user_message_timestamp": user_message.timestamp if user_message is not None else None
+            }),
+            lambda: {}
+        )
         
         # Merge the personalized message with the original response
         response["response"] = personalized.get("personalized_message", response.get("response", ""))
-        response["personalization_applied"] = True
+        response["personalization_applied"] = bool(personalized)
         
         return response
     
@@ -357,7 +662,7 @@ class AgentOrchestrator:
             )
             
             if engagement_opportunity["should_engage"]:
-                await self.agents["proactive_engagement"].process({
+                engagement_result = await self.agents["proactive_engagement"].process({
                     "user_id": user_id,
                     "engagement_type": engagement_opportunity["type"],
                     "message": engagement_opportunity.get("message"),
@@ -376,9 +681,105 @@ class AgentOrchestrator:
                     f"Type: {engagement_opportunity['type']}"
                 )
                 
+                # Push the engagement to any live connection for this session
+                await self._notify_session(session_id, {
+                    "type": "engagement",
+                    "engagement_type": engagement_opportunity["type"],
+                    "message": engagement_opportunity.get("message"),
+                    "status": engagement_result.get("status"),
+                    "scheduled_time": engagement_result.get("scheduled_time")
+                })
+                
         except Exception as e:
             self.logger.error(f"Error in proactive engagement check: {str(e)}", exc_info=True)
     
+    def health_report(
+        self,
+        required_agents: Optional[Iterable[str]] = None,
+        max_error_rate: float = 0.5
+    ) -> Dict[str, Any]:
+        """
+        Report agent health and whether this worker should receive traffic.
+        
+        Args:
+            required_agents: Agents that must be operational for the worker to be
+                ready; other agents may run degraded or on their fallback. Defaults
+                to every agent without a local fallback.
+            max_error_rate: Dependency failure rate at which an agent is degraded
+            
+        Returns:
+            Dictionary with ``ready``, the overall ``status`` and per-agent health
+        """
+        agents = {
+            name: agent.health(max_error_rate)
+            for name, agent in self.agents.items()
+            if isinstance(agent, BaseAgent)
+        }
+        if required_agents is None:
+            required_agents = [
+                name for name, agent in self.agents.items()
+                if isinstance(agent, BaseAgent) and not agent.has_local_fallback
+            ]
+        unavailable = [
+            name for name in required_agents
+            if agents.get(name, {}).get("status") != "operational"
+        ]
+        ready = self.initialized and not unavailable
+        
+        if not ready:
+            overall = "unavailable"
+        elif any(agent["status"] != "operational" for agent in agents.values()):
+            overall = "degraded"
+        else:
+            overall = "operational"
+        
+        return {
+            "ready": ready,
+            "status": overall,
+            "initialized": self.initialized,
+            "required_agents": list(required_agents),
+            "unavailable_agents": unavailable,
+            "agents": agents
+        }
+    
+    def add_session_listener(self, session_id: str, listener: SessionListener) -> None:
+        """
+        Register a listener for server-initiated messages on a session.
+        
+        Args:
+            session_id: The session ID
+            listener: Coroutine called with each message pushed to the session
+        """
+        self.session_listeners.setdefault(session_id, []).append(listener)
+    
+    def remove_session_listener(self, session_id: str, listener: SessionListener) -> None:
+        """
+        Unregister a listener added with add_session_listener.
+        
+        Args:
+            session_id: The session ID
+            listener: The listener to remove
+        """
+        listeners = self.session_listeners.get(session_id, [])
+        if listener in listeners:
+            listeners.remove(listener)
+        if not listeners:
+            self.session_listeners.pop(session_id, None)
+    
+    async def _notify_session(self, session_id: str, message: Dict[str, Any]) -> None:
+        """
+        Deliver a server-initiated message to the session's listeners.
+        
+        Args:
+            session_id: The session ID
+            message: The message to deliver
+        """
+        for listener in list(self.session_listeners.get(session_id, [])):
+            try:
+                await listener(message)
+            except Exception as e:
+                self.logger.warning(f"Error notifying session {session_id}: {str(e)}")
+    
     async def _identify_engagement_opportunity(
         self,
         user_id: str,
@@ -435,31 +836,35 @@ class AgentOrchestrator:
         role: str,
         content: str,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> None:
+    ) -> MessageRecord:
         """
         Add a message to the conversation history.
         
+        Sessions keep at most ``max_history_size`` messages; older ones are
+        folded into the session's rolling summary.
+        
         Args:
             session_id: The session ID
             role: The role of the message sender ('user', 'assistant', 'system')
             content: The message content
             metadata: Additional metadata
+            
+        Returns:
+            The added message
         """
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
+        history = self._get_session(session_id)
+        if history is None:
+            history = self.conversation_history[session_id] = []
         
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.utcnow().isoformat(),
-            "metadata": metadata or {}
-        }
+        record = MessageRecord.create(role, content, metadata)
+        history.append(record)
         
-        self.conversation_history[session_id].append(message)
-        
-        # Limit history size
-        if len(self.conversation_history[session_id]) > self.max_history_size:
-            self.conversation_history[session_id] = self.conversation_history[session_id][-self.max_history_size:]
+        # Older messages are folded into the session summary once the history is full
+        if len(history) > self.max_history_size:
+            self.conversation_summaries[session_id] = self.summarizer.compact(
+                history, self.conversation_summaries.get(session_id)
+            )
+        return record
     
     def _get_conversation_history(
         self,
@@ -476,8 +881,216 @@ class AgentOrchestrator:
         Returns:
             List of message dictionaries
         """
-        history = self.conversation_history.get(session_id, [])
-        return history[-limit:] if limit else history
+        history = self._get_session(session_id) or []
+        return to_dicts(history[-limit:] if limit else history)
+    
+    def _get_conversation_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the summary of the messages folded out of a session's history.
+        
+        Args:
+            session_id: The session ID
+            
+        Returns:
+            The summary as a dictionary, or None if nothing has been folded yet
+        """
+        self._get_session(session_id)
+        summary = self.conversation_summaries.get(session_id)
+        return summary.to_dict() if summary is not None else None
+    
+    def _get_session(self, session_id: str) -> Optional[List[MessageRecord]]:
+        """
+        Get a session's messages, restoring the session from the snapshot if needed.
+        
+        Args:
+            session_id: The session ID
+            
+        Returns:
+            The session's message list, or None for unknown sessions
+        """
+        history = self.conversation_history.get(session_id)
+        if history is None and self.session_snapshot is not None:
+            restored = self.session_snapshot.pop(session_id)
+            if restored is not None:
+                history, summary_state, owner = restored
+                self.conversation_history[session_id] = history
+                if owner is not None:
+                    self.session_owners.setdefault(session_id, owner)
+                if summary_state:
+                    self.conversation_summaries[session_id] = ConversationSummary.from_state(
+                        summary_state, self.summarizer.max_unresolved, self.summarizer.max_sentiment_points
+                    )
+        return history
+    
+    def get_session_owner(self, session_id: str) -> Optional[str]:
+        """
+        Get the user a session belongs to.
+        
+        Args:
+            session_id: The session ID
+            
+        Returns:
+            The owner's user ID, or None if the session is not held by this process
+        """
+        self._get_session(session_id)
+        return self.session_owners.get(session_id)
+    
+    def claim_session(self, session_id: str, user_id: str) -> bool:
+        """
+        Check that a user may send turns to a session, claiming it if it is new.
+        
+        Args:
+            session_id: The session ID
+            user_id: The user sending the turn
+            
+        Returns:
+            True if the session is new or already belongs to the user
+        """
+        owner = self.get_session_owner(session_id)
+        if owner is None:
+            self.session_owners[session_id] = user_id
+            return True
+        return owner == user_id
+    
+    async def get_history_page(
+        self,
+        session_id: str,
+        user_id: str,
+        limit: int,
+        after: Optional[HistoryKey] = None
+    ) -> HistoryPage:
+        """
+        Get a page of a session's messages, oldest first.
+        
+        The session's recent messages come from memory. Interactions logged to
+        Firestore are used for the part of the timeline before the oldest
+        message still in memory (all of it when this process does not hold the
+        session), so pages that only cover recent messages need no query.
+        
+        Args:
+            session_id: The session ID
+            user_id: The user the session belongs to
+            limit: Maximum number of messages on the page
+            after: Position after which the page starts (None for the first page)
+            
+        Returns:
+            The page
+        """
+        history = self._get_session(session_id) or []
+        memory_start = history[0].key()[0] if history else None
+        
+        entries: List[Tuple[HistoryKey, Dict[str, Any]]] = []
+        if memory_start is None or after is None or after[0] < memory_start:
+            personalization = self.agents.get("personalization")
+            if personalization is not None:
+                entries = await personalization.get_session_interactions(
+                    session_id, user_id, limit + 1, after=after, before=memory_start
+                )
+        
+        if len(entries) <= limit:
+            for record in history:
+                key = record.key()
+                if after is not None and key <= after:
+                    continue
+                entries.append((key, record.to_message(session_id)))
+                if len(entries) > limit:
+                    break
+        
+        page = entries[:limit]
+        return HistoryPage(
+            messages=[message for _, message in page],
+            last_key=page[-1][0] if page else None,
+            has_more=len(entries) > limit
+        )
+    
+    def load_session_snapshot(self) -> int:
+        """
+        Map the session snapshot, if there is one.
+        
+        Only the snapshot's index is read here; each session is decoded when
+        it is first looked up.
+        
+        Returns:
+            Number of sessions available from the snapshot
+        """
+        if not self.session_snapshot_path:
+            return 0
+        snapshot = SessionSnapshot.open(self.session_snapshot_path)
+        if snapshot is None:
+            return 0
+        self._replace_session_snapshot(snapshot)
+        self.logger.info(f"Mapped session snapshot {snapshot.path} with {len(snapshot)} sessions")
+        return len(snapshot)
+    
+    async def checkpoint_sessions(self) -> int:
+        """
+        Write the in-memory sessions to the snapshot file.
+        
+        The sessions are captured on the event loop; encoding, compression and
+        file I/O run in a thread. Sessions other workers wrote to the file are
+        kept (see :func:`~neoserve_ai.agents.snapshot.write_snapshot`).
+        
+        Returns:
+            Number of sessions in the new snapshot
+        """
+        if not self.session_snapshot_path:
+            return 0
+        start = time.monotonic()
+        sessions = []
+        for session_id, history in list(self.conversation_history.items()):
+            if not history:
+                continue
+            summary = self.conversation_summaries.get(session_id)
+            sessions.append((
+                session_id,
+                history[-1].timestamp,
+                list(history),
+                summary.to_state() if summary is not None else None,
+                self.session_owners.get(session_id)
+            ))
+        
+        def write() -> Tuple[int, Optional[SessionSnapshot]]:
+            count = write_snapshot(
+                self.session_snapshot_path,
+                (
+                    (session_id, last_activity, encode_session(history, summary_state, owner))
+                    for session_id, last_activity, history, summary_state, owner in sessions
+                ),
+                self.session_snapshot_max_age_seconds
+            )
+            return count, SessionSnapshot.open(self.session_snapshot_path)
+        
+        count, snapshot = await asyncio.to_thread(write)
+        # Sessions written by other workers become available to this one
+        self._replace_session_snapshot(snapshot)
+        self.logger.info(
+            f"Checkpointed {len(sessions)} sessions ({count} in snapshot) "
+            f"in {time.monotonic() - start:.2f}s"
+        )
+        return count
+    
+    async def run_checkpoints(self, interval: float) -> None:
+        """
+        Checkpoint the sessions every ``interval`` seconds until cancelled.
+        
+        Args:
+            interval: Seconds between checkpoints
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.checkpoint_sessions()
+            except Exception as e:
+                self.logger.error(f"Error checkpointing sessions: {str(e)}", exc_info=True)
+    
+    def close_session_snapshot(self) -> None:
+        """Unmap the session snapshot."""
+        self._replace_session_snapshot(None)
+    
+    def _replace_session_snapshot(self, snapshot: Optional[SessionSnapshot]) -> None:
+        previous, self.session_snapshot = self.session_snapshot, snapshot
+        if previous is not None:
+            previous.close()
     
     def _create_error_response(
         self,
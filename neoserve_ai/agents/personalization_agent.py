@@ -1,9 +1,25 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from .base_agent import BaseAgent
+from ..utils.deadline import DeadlineExceeded, remaining_timeout
+from ..utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from ..utils.hedging import get_hedger
 # Use our custom import wrapper for better error handling
 from .google_imports import FIRESTORE_CLIENT, FieldFilter
+from .conversation import HistoryKey
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _to_micros(value: datetime) -> int:
+    """Exact Unix time in microseconds of a Firestore timestamp."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def _from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
 
 class PersonalizationAgent(BaseAgent):
     """
@@ -20,16 +36,25 @@ class PersonalizationAgent(BaseAgent):
                 - project_id: Google Cloud project ID
                 - user_collection: Name of the Firestore collection for user profiles (default: 'users')
                 - interaction_collection: Name of the Firestore collection for interaction history (default: 'interactions')
+                - firestore_timeout_seconds: Timeout of a Firestore read (default: 5)
         """
         super().__init__("personalization_agent", config)
         self.db = None
         self.user_collection = None
         self.interaction_collection = None
+        self.read_timeout = self.config.get("firestore_timeout_seconds", 5.0)
+        self.circuit_breaker = get_circuit_breaker("firestore")
+        self.hedger = get_hedger("firestore")
     
     def initialize_agent(self) -> None:
         """Initialize the Firestore client and collections."""
         try:
-            if FIRESTORE_CLIENT is None:
+            if not self.config.get("enable_personalization", True):
+                # Disabled agents never import the Firestore SDK
+                self.logger.info("Personalization is disabled. Responses will not be personalized.")
+                return
+            
+            if not FIRESTORE_CLIENT:
                 raise ImportError("Firestore client is not available. Check logs for import errors.")
                 
             # Initialize Firestore client
@@ -45,6 +70,10 @@ class PersonalizationAgent(BaseAgent):
             self.logger.error(f"Error initializing Personalization Agent: {str(e)}")
             self.db = None
     
+    def is_initialized(self) -> bool:
+        """Whether the Firestore client is available."""
+        return self.db is not None
+    
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Personalize the response based on user data and context.
@@ -116,7 +145,10 @@ class PersonalizationAgent(BaseAgent):
             
         try:
             doc_ref = self.db.collection(self.user_collection).document(user_id)
-            doc = await doc_ref.get()
+            timeout = remaining_timeout(self.read_timeout)
+            doc = await self.circuit_breaker.call(
+                lambda: self.hedger.call(lambda: asyncio.to_thread(doc_ref.get, timeout=timeout))
+            )
             
             if doc.exists:
                 return doc.to_dict()
@@ -128,9 +160,11 @@ class PersonalizationAgent(BaseAgent):
                     "preferences": {},
                     "metadata": {}
                 }
-                await doc_ref.set(default_profile)
+                await self.circuit_breaker.call(lambda: doc_ref.set(default_profile))
                 return default_profile
                 
+        except (CircuitOpenError, DeadlineExceeded):
+            return {}
         except Exception as e:
             self.logger.error(f"Error fetching user profile: {str(e)}")
             return {}
@@ -161,9 +195,12 @@ class PersonalizationAgent(BaseAgent):
                 .limit(limit)
             )
             
-            docs = await query.get()
+            timeout = remaining_timeout(self.read_timeout)
+            docs = await self.circuit_breaker.call(lambda: query.get(timeout=timeout))
             return [doc.to_dict() for doc in docs]
             
+        except (CircuitOpenError, DeadlineExceeded):
+            return []
         except Exception as e:
             self.logger.error(f"Error fetching interaction history: {str(e)}")
             return []
@@ -172,9 +209,14 @@ class PersonalizationAgent(BaseAgent):
         """
         Log a user interaction to Firestore.
         
+        The user's message (when given) and the response are written in one
+        batch as separate entries with their ``role``, so the session's
+        history can be rebuilt from the log.
+        
         Args:
             user_id: The user's unique identifier
-            interaction_data: Interaction data to log
+            interaction_data: Interaction data to log; ``user_message`` and
+                ``user_message_timestamp`` (Unix time) describe the user's turn
         """
         if not self.db:
             return
@@ -182,17 +224,105 @@ class PersonalizationAgent(BaseAgent):
         try:
             interaction = {
                 "user_id": user_id,
-                "timestamp": datetime.utcnow(),
-                "message": interaction_data.get("message", ""),
+                "session_id": interaction_data.get("session_id"),
                 "intent": interaction_data.get("intent"),
                 "context": interaction_data.get("context", {})
             }
+            entries = []
+            if interaction_data.get("user_message") is not None:
+                sent_at = interaction_data.get("user_message_timestamp")
+                entries.append({
+                    **interaction,
+                    "role": "user",
+                    "timestamp": _from_micros(int(sent_at * 1_000_000)) if sent_at else datetime.utcnow(),
+                    "message": interaction_data["user_message"]
+                })
+            entries.append({
+                **interaction,
+                "role": "assistant",
+                "timestamp": datetime.utcnow(),
+                "message": interaction_data.get("message", "")
+            })
             
-            await self.db.collection(self.interaction_collection).add(interaction)
+            def write():
+                collection = self.db.collection(self.interaction_collection)
+                batch = self.db.batch()
+                for entry in entries:
+                    batch.set(collection.document(), entry)
+                return batch.commit()
             
+            await self.circuit_breaker.call(write)
+            
+        except CircuitOpenError:
+            self.logger.warning(f"Firestore circuit open; interaction for user {user_id} not logged")
         except Exception as e:
             self.logger.error(f"Error logging interaction: {str(e)}")
     
+    async def get_session_interactions(
+        self,
+        session_id: str,
+        user_id: str,
+        limit: int,
+        after: Optional[HistoryKey] = None,
+        before: Optional[int] = None
+    ) -> List[Tuple[HistoryKey, Dict[str, Any]]]:
+        """
+        Page through the interactions logged for a session, oldest first.
+        
+        The query is a keyset scan over (timestamp, document ID) after equality
+        filters on session and user, which the composite index in
+        ``firestore.indexes.json`` serves directly.
+        
+        Args:
+            session_id: The session ID
+            user_id: The user the session belongs to
+            limit: Maximum number of interactions to return
+            after: Only return interactions after this position
+            before: Only return interactions before this Unix time (microseconds)
+            
+        Returns:
+            List of (position, message) tuples; messages are in the shape of
+            the API's ChatMessage
+        """
+        if not self.db:
+            return []
+        
+        try:
+            query = (
+                self.db.collection(self.interaction_collection)
+                .where(filter=FieldFilter("session_id", "==", session_id))
+                .where(filter=FieldFilter("user_id", "==", user_id))
+            )
+            if before is not None:
+                query = query.where(filter=FieldFilter("timestamp", "<", _from_micros(before)))
+            query = query.order_by("timestamp").order_by("__name__")
+            if after is not None:
+                query = query.start_after({"timestamp": _from_micros(after[0]), "__name__": after[1]})
+            query = query.limit(limit)
+            
+            timeout = remaining_timeout(self.read_timeout)
+            docs = await self.circuit_breaker.call(lambda: query.get(timeout=timeout))
+        except (CircuitOpenError, DeadlineExceeded):
+            return []
+        except Exception as e:
+            self.logger.error(f"Error fetching session interactions: {str(e)}")
+            return []
+        
+        interactions = []
+        for doc in docs:
+            data = doc.to_dict()
+            micros = _to_micros(data["timestamp"])
+            interactions.append(((micros, doc.id), {
+                "message_id": doc.id,
+                "session_id": session_id,
+                # Entries logged before user turns were recorded are responses
+                "role": data.get("role", "assistant"),
+                "content": data.get("message", ""),
+                "timestamp": _from_micros(micros).replace(tzinfo=None).isoformat(),
+                "metadata": {"intent": data["intent"]} if data.get("intent") else {}
+            }))
+        return interactions
+    
     def _personalize_message(
         self, 
         message: str, 
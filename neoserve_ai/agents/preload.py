@@ -0,0 +1,97 @@
+"""
+Warm shared state in the gunicorn master before workers are forked.
+
+With ``preload_app`` the master imports the application once, which already
+builds the immutable artifacts that live at module level (sentiment lexicon,
+keyword rules, canned responses, metric and breaker registries).
+:func:`preload_shared_state` additionally imports the Google Cloud SDKs of the
+agents that are enabled, then freezes the garbage collector so the collections
+in the workers do not write to (and un-share) those pages. Workers still create
+their own network clients after fork, in ``AgentOrchestrator.initialize``.
+"""
+import gc
+import logging
+import time
+from typing import Any, Dict, List
+
+from .google_imports import (
+    LazyImport, FieldFilter, aiplatform, discoveryengine, firestore, pubsub, scheduler,
+    tasks_v2, vertexai
+)
+
+logger = logging.getLogger(__name__)
+
+# SDK modules each agent's clients come from, keyed by orchestrator agent name
+AGENT_SDKS: Dict[str, tuple] = {
+    "intent_classifier": (vertexai, aiplatform),
+    "knowledge_base": (discoveryengine,),
+    "personalization": (firestore, FieldFilter),
+    "proactive_engagement": (pubsub, scheduler, tasks_v2),
+    "escalation": (firestore, FieldFilter),
+}
+
+
+def enabled_agents(config: Dict[str, Any]) -> List[str]:
+    """
+    Names of the agents that will create a client with this configuration.
+
+    Mirrors the checks in each agent's ``initialize_agent``.
+
+    Args:
+        config: Orchestrator configuration (agent name -> agent config)
+
+    Returns:
+        Agent names, in ``AGENT_SDKS`` order
+    """
+    def _agent(name: str) -> Dict[str, Any]:
+        return config.get(name) or {}
+
+    checks = {
+        "intent_classifier": lambda c: c.get("project_id") and c.get("endpoint_id"),
+        "knowledge_base": lambda c: c.get("project_id") and c.get("search_engine_id"),
+        "personalization": lambda c: c.get("enable_personalization", True),
+        "proactive_engagement": lambda c: c.get("project_id") and c.get("enable_proactive_engagement", True),
+        "escalation": lambda c: c.get("project_id"),
+    }
+    return [name for name in AGENT_SDKS if checks[name](_agent(name))]
+
+
+def preload_shared_state(config: Dict[str, Any], freeze: bool = True) -> Dict[str, Any]:
+    """
+    Import the SDKs of enabled agents and freeze the heap before forking.
+
+    Only modules are imported here; no client or channel is created, as those
+    cannot be shared across processes.
+
+    Args:
+        config: Orchestrator configuration (agent name -> agent config)
+        freeze: Whether to move every object to the permanent GC generation
+
+    Returns:
+        Summary with the preloaded agents, the SDKs that were unavailable,
+        the time taken and the number of frozen objects
+    """
+    start = time.monotonic()
+    agents = enabled_agents(config)
+
+    sdks: List[LazyImport] = []
+    for name in agents:
+        for sdk in AGENT_SDKS[name]:
+            if sdk not in sdks:
+                sdks.append(sdk)
+    unavailable = [repr(sdk) for sdk in sdks if not sdk.available()]
+
+    frozen = 0
+    if freeze:
+        gc.collect()
+        gc.freeze()
+        frozen = gc.get_freeze_count()
+
+    summary = {
+        "agents": agents,
+        "unavailable_sdks": unavailable,
+        "seconds": round(time.monotonic() - start, 3),
+        "frozen_objects": frozen,
+    }
+    logger.info(f"Preloaded shared state for agents {agents} in {summary['seconds']}s")
+    return summary
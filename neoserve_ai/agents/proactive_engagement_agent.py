@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from google.protobuf import timestamp_pb2
 
 from .base_agent import BaseAgent
+from ..utils.circuit_breaker import get_circuit_breaker
 # Use our custom import wrapper for better error handling
 from .google_imports import (
     PUBSUB_PUBLISHER_CLIENT, PUBSUB_SUBSCRIBER_CLIENT,
@@ -36,6 +37,7 @@ class ProactiveEngagementAgent(BaseAgent):
         self.location = None
         self.topic_path = None
         self.initialized = False
+        self.circuit_breaker = get_circuit_breaker("pubsub")
     
     def initialize_agent(self) -> None:
         """Initialize the required GCP clients and resources."""
@@ -49,24 +51,29 @@ class ProactiveEngagementAgent(BaseAgent):
                     "Missing project_id in config. Proactive engagement will be disabled."
                 )
                 return
+            
+            if not self.config.get("enable_proactive_engagement", True):
+                # Disabled agents never import the Pub/Sub, Scheduler or Tasks SDKs
+                self.logger.info("Proactive engagement is disabled.")
+                return
                 
             # Initialize Pub/Sub client
-            if PUBSUB_PUBLISHER_CLIENT is None:
+            if not PUBSUB_PUBLISHER_CLIENT:
                 self.logger.error("Failed to initialize Pub/Sub PublisherClient. Check logs for details.")
                 return
             self.publisher = PUBSUB_PUBLISHER_CLIENT()
             
             # Initialize Cloud Scheduler client
-            if SCHEDULER_CLIENT is None:
+            if not CLOUD_SCHEDULER_CLIENT:
                 self.logger.error("Failed to initialize Cloud Scheduler client. Check logs for details.")
                 return
-            self.scheduler_client = SCHEDULER_CLIENT()
+            self.scheduler_client = CLOUD_SCHEDULER_CLIENT()
             
             # Initialize Cloud Tasks client
-            if TASKS_CLIENT is None:
+            if not CLOUD_TASKS_CLIENT:
                 self.logger.error("Failed to initialize Cloud Tasks client. Check logs for details.")
                 return
-            self.tasks_client = TASKS_CLIENT()
+            self.tasks_client = CLOUD_TASKS_CLIENT()
             
             # Set up topic path
             self.topic_path = self.publisher.topic_path(project_id, topic_id)
@@ -255,8 +262,9 @@ class ProactiveEngagementAgent(BaseAgent):
                 "metadata": metadata
             }
             
-            # Publish the message
-            future = self.publisher.publish(
+            # Publish the message; while Pub/Sub is unhealthy the breaker fails fast
+            # instead of blocking on the publish future
+            message_id = await self.circuit_breaker.call(lambda: self.publisher.publish(
                 self.topic_path,
                 data=message_data["message"].encode("utf-8"),
                 **{
@@ -264,9 +272,7 @@ class ProactiveEngagementAgent(BaseAgent):
                     "engagement_type": engagement_type,
                     "timestamp": datetime.utcnow().isoformat()
                 }
-            )
-            
-            message_id = future.result()
+            ).result())
             
             return {
                 "message_id": message_id,
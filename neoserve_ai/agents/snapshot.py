@@ -0,0 +1,256 @@
+"""
+Local snapshots of the orchestrator's session store.
+
+Conversation history lives in process memory, so a deploy or worker recycle
+used to start every session from scratch. The orchestrator now checkpoints its
+sessions to a single snapshot file, periodically and on shutdown, and maps that
+file at startup.
+
+File layout (all integers big-endian)::
+
+    header:  b"NSSESS01" | created_at (float64)
+    record:  key length (uint16) | last activity (float64) | payload length (uint32)
+             | session ID (UTF-8) | payload
+
+Each payload is one session (its messages, rolling summary and owner) encoded as JSON
+and compressed with zlib. Opening a snapshot only walks the record headers to
+build an index; a session is decompressed the first time it is looked up, so a
+restarted worker answers requests within moments however many sessions the
+snapshot holds. Sessions that are never looked up are carried into the next
+snapshot as their compressed bytes, without being decoded.
+
+Several workers may share one snapshot path. Writers take an exclusive lock on
+``<path>.lock``, merge the sessions already in the file with their own (the
+copy with the later last activity wins) and atomically replace the file.
+Sessions whose ID does not fit the uint16 key length are skipped.
+"""
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.fast_json import dumps, loads
+from .conversation import MessageRecord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NSSESS01"
+HEADER = struct.Struct(">8sd")
+RECORD_HEADER = struct.Struct(">HdI")
+MAX_KEY_BYTES = 0xFFFF
+MAX_PAYLOAD_BYTES = 0xFFFFFFFF
+COMPRESSION_LEVEL = 3
+
+# (session ID, last activity, compressed payload)
+SnapshotEntry = Tuple[str, float, bytes]
+
+
+# (messages, summary state, owner's user ID)
+SessionState = Tuple[List[MessageRecord], Optional[Dict[str, Any]], Optional[str]]
+
+
+def encode_session(
+    history: List[MessageRecord],
+    summary_state: Optional[Dict[str, Any]],
+    owner: Optional[str] = None
+) -> bytes:
+    """Encode and compress one session's messages, summary and owner."""
+    return zlib.compress(
+        dumps({"messages": [record.to_state() for record in history], "summary": summary_state, "owner": owner}),
+        COMPRESSION_LEVEL
+    )
+
+
+def decode_session(payload: bytes) -> SessionState:
+    """Decompress and decode a payload written by :func:`encode_session`."""
+    data = loads(zlib.decompress(payload))
+    messages = [MessageRecord.from_state(state) for state in data["messages"]]
+    return messages, data.get("summary"), data.get("owner")
+
+
+class SessionSnapshot:
+    """A memory-mapped snapshot file with an index of the sessions it holds."""
+
+    def __init__(self, path: str, file: Any, data: mmap.mmap, index: Dict[str, Tuple[int, int, float]]):
+        self.path = path
+        self.created_at = HEADER.unpack_from(data, 0)[1]
+        self._file = file
+        self._data = data
+        # session ID -> (payload offset, payload length, last activity)
+        self._index = index
+
+    @classmethod
+    def open(cls, path: str) -> Optional["SessionSnapshot"]:
+        """
+        Map a snapshot file and index its records.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            The snapshot, or None if the file does not exist or is not a valid snapshot
+        """
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise ValueError("file is too short")
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring session snapshot {path}: {str(e)}")
+            file.close()
+            return None
+
+        if HEADER.unpack_from(data, 0)[0] != MAGIC:
+            logger.warning(f"Ignoring session snapshot {path}: unknown format")
+            data.close()
+            file.close()
+            return None
+
+        index: Dict[str, Tuple[int, int, float]] = {}
+        offset = HEADER.size
+        while offset + RECORD_HEADER.size <= len(data):
+            key_length, last_activity, payload_length = RECORD_HEADER.unpack_from(data, offset)
+            key_start = offset + RECORD_HEADER.size
+            payload_start = key_start + key_length
+            if payload_start + payload_length > len(data):
+                logger.warning(f"Session snapshot {path} is truncated; {len(index)} sessions recovered")
+                break
+            try:
+                session_id = data[key_start:payload_start].decode("utf-8")
+            except UnicodeDecodeError:
+                logger.warning(f"Session snapshot {path} is corrupt; {len(index)} sessions recovered")
+                break
+            index[session_id] = (payload_start, payload_length, last_activity)
+            offset = payload_start + payload_length
+        return cls(path, file, data, index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._index
+
+    def pop(self, session_id: str) -> Optional[SessionState]:
+        """
+        Decode a session and remove it from the index.
+
+        Args:
+            session_id: The session ID
+
+        Returns:
+            Tuple of (messages, summary state, owner), or None if the session is not in
+            the snapshot or its record is corrupt
+        """
+        entry = self._index.pop(session_id, None)
+        if entry is None:
+            return None
+        offset, length, _ = entry
+        try:
+            return decode_session(self._data[offset:offset + length])
+        except Exception as e:
+            logger.error(f"Dropping corrupt snapshot record for session {session_id}: {str(e)}")
+            return None
+
+    def entries(self) -> Iterator[SnapshotEntry]:
+        """Yield the sessions still in the index with their compressed payloads."""
+        for session_id, (offset, length, last_activity) in list(self._index.items()):
+            yield session_id, last_activity, self._data[offset:offset + length]
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._index.clear()
+        self._data.close()
+        self._file.close()
+
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def write_snapshot(path: str, sessions: Iterable[SnapshotEntry], max_age_seconds: Optional[float] = None) -> int:
+    """
+    Merge sessions into the snapshot file at ``path``.
+
+    Sessions already in the file are kept unless ``sessions`` holds a copy with
+    a later (or equal) last activity, or they have been inactive for longer than
+    ``max_age_seconds``. Sessions whose ID or payload is too large for a record
+    header are skipped. The new file is written next to the old one and renamed
+    over it, so readers never see a partial snapshot.
+
+    Args:
+        path: Snapshot file
+        sessions: Sessions to write (session ID, last activity, payload from
+            :func:`encode_session`)
+        max_age_seconds: Drop sessions inactive for longer than this
+
+    Returns:
+        Number of sessions in the new snapshot
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    cutoff = time.time() - max_age_seconds if max_age_seconds else None
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    # session ID -> (last activity, payload); the latest copy of each session wins
+    own: Dict[str, Tuple[float, bytes]] = {}
+    for session_id, last_activity, payload in sessions:
+        if session_id not in own or last_activity > own[session_id][0]:
+            own[session_id] = (last_activity, payload)
+
+    with _locked(path):
+        previous = SessionSnapshot.open(path)
+        written = set()
+
+        def write_record(f: Any, session_id: str, last_activity: float, payload: bytes) -> None:
+            if cutoff is not None and last_activity < cutoff:
+                return
+            key = session_id.encode("utf-8")
+            if len(key) > MAX_KEY_BYTES or len(payload) > MAX_PAYLOAD_BYTES:
+                logger.warning(
+                    f"Skipping session {session_id[:64]!r} in snapshot: "
+                    f"key of {len(key)} bytes or payload of {len(payload)} bytes is too large"
+                )
+                return
+            f.write(RECORD_HEADER.pack(len(key), last_activity, len(payload)))
+            f.write(key)
+            f.write(payload)
+            written.add(session_id)
+
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, time.time()))
+                # The file's copies are streamed from the map and kept where they are newer
+                for session_id, last_activity, payload in (previous.entries() if previous is not None else ()):
+                    mine = own.get(session_id)
+                    if mine is not None and mine[0] >= last_activity:
+                        continue
+                    own.pop(session_id, None)
+                    write_record(f, session_id, last_activity, payload)
+                for session_id, (last_activity, payload) in own.items():
+                    write_record(f, session_id, last_activity, payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            if previous is not None:
+                previous.close()
+    return len(written)
+
@@ -0,0 +1,239 @@
+"""
+Rolling summaries of long conversations.
+
+Instead of dropping the oldest messages once a session exceeds
+``max_messages``, :class:`RollingSummarizer` folds them into the session's
+:class:`ConversationSummary`: intent counts, the most frequent entities (order
+numbers, emails, amounts), issues the customer raised that were not yet
+resolved, and the customer's sentiment per folded chunk.
+
+Folding runs only when the history overflows and then takes ``fold_size``
+messages at once, so each message is summarized exactly once and the cost per
+message stays constant. Every part of the summary is bounded, which keeps both
+memory and the payload handed to agents the same size however long a session
+runs. The summary is extractive and uses the local sentiment lexicon, so it
+needs no model or network access.
+"""
+import re
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from ..utils.sentiment import LexiconSentimentScorer, sentiment_scorer
+from .conversation import MessageRecord
+
+# Order/ticket numbers ("#48213", "ORD-10492"), emails and amounts ("$19.99")
+ENTITY_PATTERN = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.-]+"
+    r"|#?\b[A-Z]{0,5}-?\d{4,}\b"
+    r"|[$€£]\s?\d+(?:[.,]\d{2})?"
+)
+
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+# Words marking a user message as a problem report
+ISSUE_TERMS = frozenset({
+    "broken", "bug", "can't", "cannot", "charged", "crash", "crashes", "damaged", "error",
+    "failed", "fails", "issue", "late", "missing", "problem", "refund", "still", "stuck",
+    "wrong"
+})
+
+# Phrases with which a customer confirms their issues are resolved. Thanks only
+# count when the message does not also report a problem ("thanks, but ...")
+RESOLUTION_PATTERN = re.compile(r"(?<!not )(?<!n't )\b(?:resolved|fixed|solved)\b|\bthat work(?:s|ed)\b|\ball good\b")
+THANKS_PHRASES = ("thank you", "thanks")
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+# Difference between the first and last sentiment point that counts as a trend
+TREND_THRESHOLD = 0.2
+
+
+class ConversationSummary:
+    """Bounded digest of the messages folded out of a session's history."""
+
+    __slots__ = ("messages", "started_at", "updated_at", "intents", "entities", "unresolved", "sentiment")
+
+    def __init__(self, max_unresolved: int = 5, max_sentiment_points: int = 8):
+        self.messages = 0
+        self.started_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        self.intents: Dict[str, int] = {}
+        self.entities: Dict[str, int] = {}
+        self.unresolved: Deque[str] = deque(maxlen=max_unresolved)
+        # Mean customer sentiment of each folded chunk, oldest first
+        self.sentiment: Deque[float] = deque(maxlen=max_sentiment_points)
+
+    @property
+    def sentiment_trend(self) -> str:
+        """'improving', 'declining', 'stable' or 'unknown' (nothing folded yet)."""
+        if not self.sentiment:
+            return "unknown"
+        change = self.sentiment[-1] - self.sentiment[0]
+        if change > TREND_THRESHOLD:
+            return "improving"
+        if change < -TREND_THRESHOLD:
+            return "declining"
+        return "stable"
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return the summary's fields as plain data (the snapshot encoding)."""
+        return {
+            "messages": self.messages,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "intents": dict(self.intents),
+            "entities": dict(self.entities),
+            "unresolved": list(self.unresolved),
+            "sentiment": list(self.sentiment)
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, Any],
+        max_unresolved: int = 5,
+        max_sentiment_points: int = 8
+    ) -> "ConversationSummary":
+        """Rebuild a summary from :meth:`to_state` output."""
+        summary = cls(max_unresolved, max_sentiment_points)
+        summary.messages = state.get("messages", 0)
+        summary.started_at = state.get("started_at")
+        summary.updated_at = state.get("updated_at")
+        summary.intents = dict(state.get("intents") or {})
+        summary.entities = dict(state.get("entities") or {})
+        summary.unresolved.extend(state.get("unresolved") or [])
+        summary.sentiment.extend(state.get("sentiment") or [])
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the summary as plain data for agents and API responses."""
+        return {
+            "messages": self.messages,
+            "started_at": datetime.utcfromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "updated_at": datetime.utcfromtimestamp(self.updated_at).isoformat() if self.updated_at else None,
+            "intents": dict(sorted(self.intents.items(), key=lambda item: -item[1])),
+            "entities": [entity for entity, _ in sorted(self.entities.items(), key=lambda item: -item[1])],
+            "unresolved_issues": list(self.unresolved),
+            "sentiment": [round(point, 3) for point in self.sentiment],
+            "sentiment_trend": self.sentiment_trend
+        }
+
+
+class RollingSummarizer:
+    """Folds overflowing conversation history into a :class:`ConversationSummary`."""
+
+    def __init__(
+        self,
+        max_messages: int = 20,
+        fold_size: Optional[int] = None,
+        max_entities: int = 20,
+        max_unresolved: int = 5,
+        max_sentiment_points: int = 8,
+        max_issue_chars: int = 160,
+        scorer: Optional[LexiconSentimentScorer] = None
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            max_messages: Raw messages a session may hold before folding
+            fold_size: Messages folded at once when the history overflows
+                (default: half of ``max_messages``)
+            max_entities: Entities kept per summary (least frequent are dropped)
+            max_unresolved: Open issues kept per summary (oldest are dropped)
+            max_sentiment_points: Sentiment points kept per summary (oldest are dropped)
+            max_issue_chars: Length at which an issue's text is cut
+            scorer: Sentiment scorer (default: the shared lexicon scorer)
+        """
+        self.max_messages = max(max_messages, 1)
+        self.fold_size = min(max(fold_size or self.max_messages // 2, 1), self.max_messages)
+        self.max_entities = max_entities
+        self.max_unresolved = max_unresolved
+        self.max_sentiment_points = max_sentiment_points
+        self.max_issue_chars = max_issue_chars
+        self.scorer = scorer or sentiment_scorer
+
+    def compact(
+        self,
+        history: List[MessageRecord],
+        summary: Optional[ConversationSummary] = None
+    ) -> Optional[ConversationSummary]:
+        """
+        Fold the oldest messages of an overflowing history into its summary.
+
+        Once the history holds more than ``max_messages`` messages, it is
+        shortened in place to ``max_messages + 1 - fold_size`` messages; until
+        then nothing happens.
+
+        Args:
+            history: The session's messages, oldest first
+            summary: The session's current summary, if any
+
+        Returns:
+            The updated summary (``summary`` when nothing was folded)
+        """
+        if len(history) <= self.max_messages:
+            return summary
+        count = len(history) - (self.max_messages + 1 - self.fold_size)
+        summary = self.fold(history[:count], summary)
+        del history[:count]
+        return summary
+
+    def fold(
+        self,
+        records: Sequence[MessageRecord],
+        summary: Optional[ConversationSummary] = None
+    ) -> ConversationSummary:
+        """
+        Add messages to a summary.
+
+        Args:
+            records: Messages to fold, oldest first
+            summary: Summary to update; a new one is created if None
+
+        Returns:
+            The updated summary
+        """
+        if summary is None:
+            summary = ConversationSummary(self.max_unresolved, self.max_sentiment_points)
+        if not records:
+            return summary
+
+        scores = []
+        for record in records:
+            if record.intent:
+                summary.intents[record.intent] = summary.intents.get(record.intent, 0) + 1
+            if record.role != "user":
+                continue
+            for entity in ENTITY_PATTERN.findall(record.content):
+                summary.entities[entity] = summary.entities.get(entity, 0) + 1
+            self._track_issues(summary, record.content)
+            scores.append(self.scorer.score(record.content))
+
+        # dict order is insertion order, so ties drop the entity seen first
+        while len(summary.entities) > self.max_entities:
+            del summary.entities[min(summary.entities, key=summary.entities.get)]
+        if scores:
+            summary.sentiment.append(sum(scores) / len(scores))
+
+        summary.messages += len(records)
+        if summary.started_at is None:
+            summary.started_at = records[0].timestamp
+        summary.updated_at = records[-1].timestamp
+        return summary
+
+    def _track_issues(self, summary: ConversationSummary, text: str) -> None:
+        lowered = text.lower()
+        if RESOLUTION_PATTERN.search(lowered):
+            summary.unresolved.clear()
+            return
+        if ISSUE_TERMS.isdisjoint(WORD_PATTERN.findall(lowered)):
+            if any(phrase in lowered for phrase in THANKS_PHRASES):
+                summary.unresolved.clear()
+            return
+        # The sentence stating the problem, usually the first
+        issue = SENTENCE_END.split(text.strip(), 1)[0]
+        if len(issue) > self.max_issue_chars:
+            issue = issue[:self.max_issue_chars] + "..."
+        summary.unresolved.append(issue)
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from neoserve_ai.models.user import UserInDB
 from neoserve_ai.schemas.token import TokenPayload
 from neoserve_ai.config.settings import get_config
+from neoserve_ai.utils.token_cache import VerifiedTokenCache, revoked_tokens
 
 # Get configuration
 settings = get_config()
@@ -20,6 +21,13 @@ oauth2_scheme = OAuth2PasswordBearer(
     auto_error=False
 )
 
+# Users resolved from verified tokens; see utils.token_cache
+token_user_cache: VerifiedTokenCache[UserInDB] = VerifiedTokenCache(
+    name="jwt_deps",
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+    max_ttl_seconds=settings.JWT_CACHE_MAX_TTL_SECONDS
+)
+
 # Mock user data for development
 MOCK_USER = UserInDB(
     id=1,
@@ -31,10 +39,12 @@ MOCK_USER = UserInDB(
     is_superuser=False
 )
 
-async def get_current_user_or_none(token: str = Depends(oauth2_scheme)) -> Optional[UserInDB]:
+def resolve_user_from_token(token: Optional[str]) -> Optional[UserInDB]:
     """
-    Get the current user from the token, or return None if no token is provided.
-    In development, returns a mock user if no token is provided.
+    Resolve the user for a bearer token outside of FastAPI dependency injection.
+    
+    Used by long-lived connections (WebSockets) that authenticate once.
+    In development, returns a mock user if the token is missing or invalid.
     """
     # In development, return a mock user if no token is provided
     if settings.ENVIRONMENT == "development" and not token:
@@ -44,12 +54,19 @@ async def get_current_user_or_none(token: str = Depends(oauth2_scheme)) -> Optio
     if not token:
         return None
     
+    cached_user = token_user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     try:
         # Try to decode the token
         if not token or token == 'null' or token == 'undefined':
             if settings.ENVIRONMENT == "development":
                 return MOCK_USER
             return None
+        
+        if revoked_tokens.is_revoked(token):
+            raise JWTError("Token has been revoked")
             
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -65,8 +82,16 @@ async def get_current_user_or_none(token: str = Depends(oauth2_scheme)) -> Optio
     # In a real app, you would fetch the user from the database here
     # For now, we'll return the mock user with the token's user ID
     mock_user = MOCK_USER.model_copy(update={"id": token_data.sub, "username": f"user_{token_data.sub}"})
+    token_user_cache.put(token, mock_user, payload.get("exp"))
     return mock_user
 
+async def get_current_user_or_none(token: str = Depends(oauth2_scheme)) -> Optional[UserInDB]:
+    """
+    Get the current user from the token, or return None if no token is provided.
+    In development, returns a mock user if no token is provided.
+    """
+    return resolve_user_from_token(token)
+
 async def get_optional_user(
     current_user: Optional[UserInDB] = Depends(get_current_user_or_none)
 ) -> Optional[UserInDB]:
@@ -1,6 +1,7 @@
 """
 Authentication endpoints for the NeoServe AI API.
 """
+import asyncio
 from datetime import timedelta
 from typing import Any, Dict, Optional
 
@@ -8,11 +9,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from neoserve_ai.schemas.user import Token, User, UserCreate, UserInDB
+from neoserve_ai.utils.admission import Overloaded
 from neoserve_ai.utils.auth import (
     authenticate_user,
     create_access_token,
     get_current_active_user,
-    get_password_hash,
+    get_password_hash_async,
+    oauth2_scheme,
+    revoke_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 from neoserve_ai.config.settings import get_config
@@ -23,6 +27,14 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 # Get configuration
 config = get_config()
 
+def _overloaded_exception(exc: Overloaded) -> HTTPException:
+    """Build the 503 response when the password hashing pool is full."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=exc.reason,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends()
@@ -37,9 +49,13 @@ async def login_for_access_token(
         Token object containing the access token and token type
         
     Raises:
-        HTTPException: If authentication fails
+        HTTPException: If authentication fails, or 503 while the password
+            hashing pool is saturated
     """
-    user = authenticate_user(form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(form_data.username, form_data.password)
+    except Overloaded as e:
+        raise _overloaded_exception(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,12 +92,14 @@ async def register_user(user_data: UserCreate) -> User:
         The newly created user
         
     Raises:
-        HTTPException: If the email is already registered
+        HTTPException: If the email is already registered, or 503 while the
+            password hashing pool is saturated
     """
-    from ....utils.auth import get_user, fake_users_db
+    from ....utils.auth import get_user_async, user_repository
+    from ....utils.user_repository import UserAlreadyExistsError, new_user_id
     
     # Check if user already exists
-    if get_user(user_data.email):
+    if await get_user_async(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -89,19 +107,27 @@ async def register_user(user_data: UserCreate) -> User:
     
     # Create new user
     user_dict = user_data.dict()
-    hashed_password = get_password_hash(user_dict.pop("password"))
+    try:
+        hashed_password = await get_password_hash_async(user_dict.pop("password"))
+    except Overloaded as e:
+        raise _overloaded_exception(e)
     
-    # In a real app, this would be saved to a database
     new_user = UserInDB(
         **user_dict,
         hashed_password=hashed_password,
-        user_id=f"user_{len(fake_users_db) + 1}",
+        user_id=new_user_id(),
         roles=["customer"],  # Default role for new users
         status="active"  # In a real app, you might want to require email verification first
     )
     
-    # Add to fake database
-    fake_users_db[user_data.email] = new_user.dict()
+    # The unique email index settles concurrent registrations of the same address
+    try:
+        await user_repository.create_async(new_user)
+    except UserAlreadyExistsError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Return the user without the hashed password
     return User(
@@ -132,6 +158,24 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)) -
     """
     return current_user
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    current_user: User = Depends(get_current_active_user),
+    token: str = Depends(oauth2_scheme)
+) -> None:
+    """
+    Revoke the current access token.
+    
+    The token is rejected from the next request on until it would have
+    expired. Revocations are stored in the user database, so the other
+    workers reject the token within TOKEN_REVOCATION_SYNC_SECONDS.
+    
+    Args:
+        current_user: The currently authenticated user
+        token: The bearer token to revoke
+    """
+    await asyncio.to_thread(revoke_access_token, token)
+
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     current_user: User = Depends(get_current_active_user)
@@ -1,16 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, AsyncIterator, Tuple
 from datetime import datetime, timedelta
+import asyncio
+import json
+from collections import OrderedDict
 import uuid
 import logging
 
+from neoserve_ai.agents.conversation import HistoryKey
 from neoserve_ai.agents.orchestrator import AgentOrchestrator
 from neoserve_ai.config.settings import get_config, get_agent_config
-from neoserve_ai.schemas.chat import ChatRequest, ChatResponse, ChatMessage, EscalationDetails
+from neoserve_ai.schemas.chat import (
+    MAX_SESSION_ID_LENGTH, ChatRequest, ChatResponse, ChatResponsePayload, ChatMessage, EscalationDetails,
+    build_chat_response_payload
+)
 from neoserve_ai.schemas.user import User, UserInDB
-from neoserve_ai.utils.auth import get_current_user, any_authenticated
-from neoserve_ai.api.api_v1.deps import get_optional_user
+from neoserve_ai.utils.auth import get_current_user, any_authenticated, agent_required
+from neoserve_ai.api.api_v1.deps import MOCK_USER, get_optional_user, resolve_user_from_token
+from neoserve_ai.utils.admission import AdmissionController, Overloaded
+from neoserve_ai.utils.circuit_breaker import circuit_breaker_states, configure_circuit_breakers
+from neoserve_ai.utils.hedging import configure_hedging, hedging_stats
+from neoserve_ai.utils.deadline import DEADLINE_HEADER, deadline_scope
+from neoserve_ai.utils.fast_json import FastJSONResponse, dumps, dumps_str
+from neoserve_ai.utils.pagination import compute_etag, decode_cursor, encode_cursor, etag_matches
+from neoserve_ai.utils.idempotency import IdempotencyCache
+from neoserve_ai.utils.metrics import gauge
+from neoserve_ai.utils.websocket import ChatConnection, WebSocketConnectionManager, WS_1013_TRY_AGAIN_LATER
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -21,15 +38,73 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 # Get configuration
 settings = get_config()
 
+# Breakers are created by the agents, so their defaults must be set first
+configure_circuit_breakers(
+    window_size=settings.CIRCUIT_WINDOW_SIZE,
+    minimum_calls=settings.CIRCUIT_MIN_CALLS,
+    failure_rate_threshold=settings.CIRCUIT_FAILURE_RATE,
+    slow_call_seconds=settings.CIRCUIT_SLOW_CALL_SECONDS,
+    slow_call_rate_threshold=settings.CIRCUIT_SLOW_CALL_RATE,
+    open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+    half_open_max_calls=settings.CIRCUIT_HALF_OPEN_CALLS
+)
+configure_hedging(
+    enabled=settings.HEDGING_ENABLED,
+    quantile=settings.HEDGE_QUANTILE,
+    budget_ratio=settings.HEDGE_BUDGET_RATIO,
+    min_delay=settings.HEDGE_MIN_DELAY_MS / 1000
+)
+
 # Initialize agent orchestrator
 orchestrator = AgentOrchestrator(config={
     "intent_classifier": get_agent_config("intent_classifier"),
     "knowledge_base": get_agent_config("knowledge_agent"),
     "personalization": get_agent_config("personalization_agent"),
     "proactive_engagement": get_agent_config("proactive_engagement_agent"),
-    "max_history_size": settings.max_history_size
+    "escalation": get_agent_config("escalation_agent"),
+    "max_history_size": settings.max_history_size,
+    "history_fold_size": settings.HISTORY_FOLD_SIZE,
+    "session_snapshot_path": settings.SESSION_SNAPSHOT_PATH if settings.SESSION_SNAPSHOT_ENABLED else None,
+    "session_snapshot_max_age_seconds": settings.SESSION_SNAPSHOT_MAX_AGE_SECONDS,
+    "request_budget_seconds": settings.CHAT_REQUEST_BUDGET_SECONDS
 })
 
+# Results of recent chat turns, replayed when a client retries a message_id
+idempotency_cache = IdempotencyCache(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES
+)
+
+# Turns recently shed by admission control, oldest first; see _admission_priority
+shed_turns: "OrderedDict[Tuple[str, str, str], datetime]" = OrderedDict()
+
+# Adaptive concurrency limit in front of the agent pipeline
+admission = AdmissionController(
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    max_queue_size=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    target_latency=settings.ADMISSION_TARGET_LATENCY_SECONDS
+)
+
+# Open chat WebSocket connections
+ws_connections = WebSocketConnectionManager(max_connections=settings.WS_MAX_CONNECTIONS)
+
+# Gauges read at scrape time from the objects above
+gauge("neoserve_admission_in_flight", "Chat turns currently holding an admission slot",
+      callback=lambda: admission.in_flight)
+gauge("neoserve_admission_queue_depth", "Chat turns waiting for an admission slot",
+      callback=lambda: admission.queued)
+gauge("neoserve_admission_limit", "Current adaptive admission limit",
+      callback=lambda: int(admission.limit))
+gauge("neoserve_sessions", "Conversation sessions held in memory",
+      callback=lambda: len(orchestrator.conversation_history))
+gauge("neoserve_websocket_connections", "Open chat WebSocket connections",
+      callback=lambda: ws_connections.count)
+gauge("neoserve_escalation_queue_depth", "Pending escalations in the in-memory queue",
+      callback=lambda: len(orchestrator.agents["escalation"].queue) if "escalation" in orchestrator.agents else 0)
+
 # Initialize the orchestrator
 @router.on_event("startup")
 async def startup_event():
@@ -40,80 +115,229 @@ async def startup_event():
         logger.error(f"Failed to initialize agent orchestrator: {str(e)}")
         raise
 
+def _format_sse(event: str, data: Any) -> str:
+    """Format a single server-sent event frame."""
+    return f"event: {event}\ndata: {dumps_str(data)}\n\n"
+
+class SessionNotFound(Exception):
+    """Raised when a turn is sent to a session that belongs to another user."""
+
+def _session_not_found() -> HTTPException:
+    """Build the 404 response for another user's session (its existence is not revealed)."""
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+def _resolve_chat_user(current_user: Optional[User]) -> User:
+    """
+    Return the user a chat turn runs as.
+    
+    In development, a mock user is used when the request is not authenticated.
+    
+    Raises:
+        HTTPException: If the request is not authenticated outside development
+    """
+    if current_user:
+        return current_user
+    
+    if get_config().ENVIRONMENT == "development":
+        return UserInDB(
+            id=1,
+            username="dev_user",
+            email="dev@example.com",
+            hashed_password="",
+            full_name="Development User",
+            is_active=True,
+            is_superuser=False
+        )
+    
+    # In production, require authentication
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Authentication required",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _admission_priority(request: ChatRequest, current_user: Optional[User]) -> str:
+    """
+    Pick the admission priority class of a chat turn.
+    
+    Only server-side signals are used, so clients cannot move themselves up
+    the queue. Anonymous traffic always comes last. Authenticated turns come
+    first when their session has an open escalation or the message is likely
+    to need a human, then retries of turns this worker shed, then the rest.
+    
+    Args:
+        request: The chat request
+        current_user: The user from the request's credentials, if any
+        
+    Returns:
+        A key of ADMISSION_PRIORITIES
+    """
+    if not _is_authenticated(current_user):
+        return "anonymous"
+    escalation_agent = orchestrator.agents.get("escalation")
+    if escalation_agent is not None and (
+        escalation_agent.has_open_escalation(request.session_id)
+        or escalation_agent.is_escalation_prone(request.message)
+    ):
+        return "escalation"
+    key = _turn_key(str(current_user.id), request)
+    if key is not None and shed_turns.pop(key, None) is not None:
+        return "retry"
+    return "authenticated"
+
+def _is_authenticated(current_user: Optional[User]) -> bool:
+    """Whether a user came from real credentials rather than the development mock."""
+    return current_user is not None and current_user is not MOCK_USER
+
+def _turn_key(user_id: str, request: ChatRequest) -> Optional[Tuple[str, str, str]]:
+    """Key of a chat turn for idempotency and retry tracking, if it has a message_id."""
+    return (user_id, request.session_id, request.message_id) if request.message_id else None
+
+def _record_shed_turn(user_id: str, request: ChatRequest) -> None:
+    """Remember a shed turn so its retry (same message_id) is admitted as a retry."""
+    key = _turn_key(user_id, request)
+    if key is None:
+        return
+    now = datetime.utcnow()
+    shed_turns[key] = now
+    shed_turns.move_to_end(key)
+    cutoff = now - timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    while shed_turns and (
+        len(shed_turns) > settings.IDEMPOTENCY_MAX_ENTRIES or next(iter(shed_turns.values())) < cutoff
+    ):
+        shed_turns.popitem(last=False)
+
+def _request_budget(http_request: Request) -> float:
+    """
+    Time budget of a chat turn in seconds.
+    
+    Clients may ask for a shorter budget with the X-Request-Timeout header;
+    the configured budget is the maximum and CHAT_MIN_REQUEST_BUDGET_SECONDS
+    the minimum, so a client cannot make its turns time out on purpose.
+    """
+    budget = settings.CHAT_REQUEST_BUDGET_SECONDS
+    try:
+        requested = float(http_request.headers.get(DEADLINE_HEADER, budget))
+    except ValueError:
+        return budget
+    if not requested > 0:
+        return budget
+    return max(min(requested, budget), min(settings.CHAT_MIN_REQUEST_BUDGET_SECONDS, budget))
+
+def _overloaded_exception(exc: Overloaded) -> HTTPException:
+    """Build the 503 response for a shed request."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=exc.reason,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+async def _run_chat_turn(
+    request: ChatRequest,
+    user_id: str,
+    priority: str,
+    budget: Optional[float] = None
+) -> Tuple[ChatResponsePayload, bool]:
+    """
+    Run one chat turn, at most once per client ``message_id``.
+    
+    Requests carrying a ``message_id`` are keyed on (user, session, message_id):
+    retries within the idempotency window get the first response back, and
+    duplicates that arrive while the first request is still running wait for it.
+    Error responses are not kept, so a retry after a failure runs again.
+    Turns that are actually processed go through admission control first and
+    run under a deadline of ``budget`` seconds (time spent queued included).
+    
+    Returns:
+        Tuple of (response, replayed)
+        
+    Raises:
+        SessionNotFound: If the session belongs to another user
+        Overloaded: If the turn was shed by admission control
+    """
+    if not orchestrator.claim_session(request.session_id, user_id):
+        raise SessionNotFound(request.session_id)
+    
+    async def process() -> ChatResponsePayload:
+        with deadline_scope(budget):
+            async with admission.admit(priority):
+                response = await orchestrator.process_message(
+                    message=request.message,
+                    session_id=request.session_id,
+                    user_id=user_id,
+                    metadata=request.metadata or {}
+                )
+        logger.debug(f"Generated response of {len(response.get('response') or '')} chars")
+        return build_chat_response_payload(request.session_id, response)
+    
+    if not request.message_id:
+        return await process(), False
+    
+    return await idempotency_cache.run(
+        (user_id, request.session_id, request.message_id),
+        process,
+        cacheable=_is_cacheable
+    )
+
+def _is_cacheable(response: ChatResponsePayload) -> bool:
+    """Whether a turn's response may answer retries (error responses are not kept)."""
+    return response["intent"] != "error"
+
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
+    http_request: Request,
     current_user: Optional[User] = Depends(get_optional_user)
-) -> ChatResponse:
+) -> FastJSONResponse:
     """
     Process a chat message and return a response from the appropriate agent.
     
     In development mode, this endpoint can be accessed without authentication.
     In production, a valid JWT token is required.
     
+    Retries that reuse a ``message_id`` are answered with the original response
+    and an ``Idempotent-Replayed: true`` header instead of being processed again.
+    When the server is overloaded the request is rejected with 503 and a
+    ``Retry-After`` header; an authenticated retry that reuses the shed turn's
+    ``message_id`` is admitted ahead of new traffic.
+    ``X-Request-Timeout`` (seconds) lowers the turn's time budget; stages that
+    run out of time degrade instead of failing.
+    
+    The response is built already in the shape of ``ChatResponse`` and encoded
+    once, so FastAPI does not validate it against the model again.
+    
     Args:
         request: The chat request containing the user's message and metadata
+        http_request: The incoming HTTP request (used to read the timeout header)
         current_user: The authenticated user, or None if not authenticated
         
     Returns:
-        ChatResponse containing the agent's response
-    """
-    # Get config
-    config = get_config()
-    
-    # In development, use a mock user if not authenticated
-    if not current_user:
-        if config.ENVIRONMENT == "development":
-            current_user = UserInDB(
-                id=1,
-                username="dev_user",
-                email="dev@example.com",
-                hashed_password="",
-                full_name="Development User",
-                is_active=True,
-                is_superuser=False
-            )
-        else:
-            # In production, require authentication
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        The ChatResponse containing the agent's response
+    """
+    priority = _admission_priority(request, current_user)
+    current_user = _resolve_chat_user(current_user)
     
-    # Log the incoming request
-    logger.info(f"Processing chat request from user {current_user.id}")
-    logger.info(f"Message: {request.message}")
-    logger.info(f"Session ID: {request.session_id}")
+    # Log the incoming request (message content is not logged)
+    logger.info(f"Processing chat request from user {current_user.id}, session {request.session_id}")
     
     try:
         # Process the message using the orchestrator
-        response = await orchestrator.process_message(
-            message=request.message,
-            session_id=request.session_id,
-            user_id=str(current_user.id),
-            metadata=request.metadata or {}
+        response, replayed = await _run_chat_turn(
+            request, str(current_user.id), priority, _request_budget(http_request)
         )
+        headers = None
+        if replayed:
+            logger.info(f"Replaying response for duplicate message {request.message_id}")
+            headers = {"Idempotent-Replayed": "true"}
         
-        # Log the response
-        logger.info(f"Generated response: {response.get('response')}")
-        
-        # Return the response with all required fields
-        return ChatResponse(
-            message_id=str(uuid.uuid4()),
-            session_id=request.session_id,
-            timestamp=datetime.utcnow(),
-            response=response.get('response', 'No response generated'),
-            intent=response.get('intent', 'general_query'),
-            confidence=float(response.get('confidence', 0.8)),
-            source=response.get('source', 'knowledge_base'),
-            metadata=response.get('metadata', {}) or {},
-            requires_follow_up=response.get('requires_follow_up', False),
-            suggested_responses=response.get('suggested_responses', []),
-            sources=response.get('sources', []),
-            escalation=response.get('escalation')
-        )
+        return FastJSONResponse(response, headers=headers)
         
+    except SessionNotFound:
+        raise _session_not_found()
+    except Overloaded as e:
+        logger.warning(f"Shedding chat request ({priority}): {e.reason}")
+        _record_shed_turn(str(current_user.id), request)
+        raise _overloaded_exception(e)
     except Exception as e:
         logger.error(f"Error processing chat message: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -121,34 +345,460 @@ async def chat(
             detail="An error occurred while processing your message"
         )
 
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_optional_user)
+) -> StreamingResponse:
+    """
+    Process a chat message and stream progress as server-sent events.
+    
+    Events are sent as the turn progresses through the agent pipeline:
+    ``escalation`` (escalation decision), ``intent`` (detected intent),
+    ``sources`` (knowledge base sources), ``response`` (the final personalized
+    answer, same shape as ``POST /chat``) and finally ``done``. If the client
+    disconnects, the remaining stages are cancelled. Overloaded servers answer
+    503 with ``Retry-After`` before the stream starts.
+    
+    Requests with a ``message_id`` are idempotent like ``POST /chat``: a retry
+    gets only the ``response`` and ``done`` events of the first run (waiting
+    for it if it is still running) and an ``Idempotent-Replayed: true`` header.
+    Such turns run to completion even if their client disconnects, so that
+    the retry can be answered.
+    
+    Args:
+        request: The chat request containing the user's message and metadata
+        http_request: The incoming HTTP request (used to detect disconnects)
+        current_user: The authenticated user, or None if not authenticated
+        
+    Returns:
+        An event stream for the chat turn
+    """
+    priority = _admission_priority(request, current_user)
+    current_user = _resolve_chat_user(current_user)
+    logger.info(f"Processing streamed chat request from user {current_user.id}")
+    if not orchestrator.claim_session(request.session_id, str(current_user.id)):
+        raise _session_not_found()
+    
+    key = _turn_key(str(current_user.id), request)
+    replayed = key is not None and key in idempotency_cache
+    if not replayed:
+        try:
+            await admission.acquire(priority)
+        except Overloaded as e:
+            logger.warning(f"Shedding streamed chat request ({priority}): {e.reason}")
+            _record_shed_turn(str(current_user.id), request)
+            raise _overloaded_exception(e)
+    
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def emit(event: str, data: Dict[str, Any]) -> None:
+        await events.put((event, data))
+    
+    budget = _request_budget(http_request)
+    
+    async def process() -> ChatResponsePayload:
+        start = asyncio.get_running_loop().time()
+        succeeded = False
+        try:
+            with deadline_scope(budget):
+                response = await orchestrator.process_message(
+                    message=request.message,
+                    session_id=request.session_id,
+                    user_id=str(current_user.id),
+                    metadata=request.metadata or {},
+                    emit=emit
+                )
+            succeeded = True
+        finally:
+            admission.release(asyncio.get_running_loop().time() - start, succeeded)
+        return build_chat_response_payload(request.session_id, response)
+    
+    # Started here rather than in the stream so the admission slot is always released
+    if key is None:
+        result = asyncio.ensure_future(process())
+    else:
+        result, replayed_now = idempotency_cache.start(key, process, cacheable=_is_cacheable)
+        if replayed_now and not replayed:
+            # A duplicate started while this request waited for admission
+            admission.release(0.0, observe=False)
+        replayed = replayed_now
+    
+    async def run_turn() -> None:
+        try:
+            # Idempotent turns are shielded so they complete for retries
+            response = await (asyncio.shield(result) if key is not None else result)
+            await events.put(("response", response))
+        except Exception as e:
+            logger.error(f"Error processing streamed chat message: {str(e)}", exc_info=True)
+            await events.put(("error", {"detail": "An error occurred while processing your message"}))
+        finally:
+            await events.put(None)
+    
+    turn = asyncio.create_task(run_turn())
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    break
+                if await http_request.is_disconnected():
+                    logger.info(f"Client disconnected from chat stream for session {request.session_id}")
+                    break
+                yield _format_sse(*item)
+            yield _format_sse("done", {"session_id": request.session_id})
+        finally:
+            # Cancels the remaining stages if the client went away mid-turn
+            if not turn.done():
+                turn.cancel()
+    
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if replayed:
+        logger.info(f"Replaying streamed response for duplicate message {request.message_id}")
+        headers["Idempotent-Replayed"] = "true"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+
+async def _read_body(http_request: Request, max_bytes: int) -> bytes:
+    """
+    Read a request body of at most ``max_bytes`` bytes.
+    
+    A declared Content-Length over the limit is rejected before anything is
+    read; bodies without one (chunked uploads) are counted as they stream in.
+    
+    Raises:
+        HTTPException: 413 if the body is larger than ``max_bytes``
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request body exceeds {max_bytes} bytes"
+    )
+    try:
+        declared = int(http_request.headers.get("content-length", "0"))
+    except ValueError:
+        declared = 0
+    if declared > max_bytes:
+        raise too_large
+    
+    chunks = []
+    size = 0
+    async for chunk in http_request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def _iterate_ndjson(body: bytes) -> AsyncIterator[bytes]:
+    """Yield the non-empty lines of an NDJSON body one at a time."""
+    start = 0
+    while start < len(body):
+        end = body.find(b"\n", start)
+        if end == -1:
+            end = len(body)
+        line = body[start:end]
+        start = end + 1
+        if line.strip():
+            yield line
+
+async def _to_batch_items(
+    entries: AsyncIterator[Any],
+    user_id: str,
+    max_items: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Turn raw bulk request entries into orchestrator batch items.
+    
+    Entries that fail validation become error items so the rest of the batch
+    still runs. Entries beyond ``max_items`` are rejected with a single error item.
+    """
+    index = 0
+    async for entry in entries:
+        if index >= max_items:
+            logger.warning(f"Batch truncated at {max_items} items")
+            yield {"correlation_id": str(index), "error": f"Batch limit of {max_items} items exceeded"}
+            return
+        try:
+            if isinstance(entry, bytes):
+                entry = json.loads(entry)
+            request = ChatRequest(**entry)
+        except Exception as e:
+            yield {"correlation_id": str(index), "error": f"Invalid chat request: {str(e)}"}
+        else:
+            if not orchestrator.claim_session(request.session_id, user_id):
+                yield {"correlation_id": request.message_id or str(index), "error": "Session not found"}
+                index += 1
+                continue
+            yield {
+                "correlation_id": request.message_id or str(index),
+                "user_id": user_id,
+                "session_id": request.session_id,
+                "message": request.message,
+                "metadata": request.metadata or {}
+            }
+        index += 1
+
+@router.post("/batch")
+async def chat_batch(
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_optional_user)
+) -> StreamingResponse:
+    """
+    Process many chat messages in one request.
+    
+    The body is a JSON array of chat requests (same shape as ``POST /chat``) or
+    an ``application/x-ndjson`` body with one chat request per line, parsed
+    one line at a time as the batch progresses. Messages are processed with bounded concurrency;
+    messages of the same session run in input order. Results are streamed back
+    as NDJSON in completion order, one line per message with its
+    ``correlation_id`` (the request's ``message_id``, or its zero-based position
+    in the batch), a ``status`` of ``ok`` or ``error`` and either the
+    ``response`` or the ``error``. Bodies larger than ``BATCH_MAX_BODY_BYTES``
+    are rejected with 413.
+    
+    Args:
+        http_request: The incoming HTTP request
+        current_user: The authenticated user, or None if not authenticated
+        
+    Returns:
+        An NDJSON stream of results
+        
+    Raises:
+        HTTPException: If the body exceeds BATCH_MAX_BODY_BYTES, or a non-NDJSON
+            body is not a JSON array
+    """
+    current_user = _resolve_chat_user(current_user)
+    logger.info(f"Processing batch chat request from user {current_user.id}")
+    
+    # The body is read before the response starts: once it streams, Starlette
+    # listens on the same channel for client disconnects
+    body = await _read_body(http_request, settings.BATCH_MAX_BODY_BYTES)
+    content_type = http_request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        entries = _iterate_ndjson(body)
+    else:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array or an NDJSON stream of chat requests"
+            )
+        
+        async def iterate_payload() -> AsyncIterator[Any]:
+            for entry in payload:
+                yield entry
+        entries = iterate_payload()
+    
+    async def result_stream() -> AsyncIterator[str]:
+        async for result in orchestrator.process_batch(
+            _to_batch_items(entries, str(current_user.id), settings.BATCH_MAX_ITEMS),
+            max_concurrency=settings.BATCH_MAX_CONCURRENCY,
+            classify_batch_size=settings.BATCH_CLASSIFY_SIZE,
+            classify_max_wait=settings.BATCH_CLASSIFY_WAIT_MS / 1000
+        ):
+            if result["status"] == "ok":
+                result["response"] = build_chat_response_payload(result["session_id"], result["response"])
+            yield dumps_str(result) + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+@router.websocket("/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    session_id: Optional[str] = Query(None, max_length=MAX_SESSION_ID_LENGTH)
+) -> None:
+    """
+    Chat over a persistent WebSocket connection.
+    
+    The connection authenticates once (``token`` query parameter or an
+    ``Authorization: Bearer`` header) and is pinned to a single session.
+    Clients send ``{"type": "message", "message": ..., "message_id": ...}``
+    frames and may pipeline several messages; each is answered in order with a
+    ``response`` frame (same shape as ``POST /chat``) carrying the
+    ``message_id`` as ``correlation_id``. Proactive engagements for the session
+    are pushed as ``engagement`` frames. The server sends ``ping`` frames and
+    closes connections that stop answering.
+    
+    Args:
+        websocket: The incoming WebSocket
+        token: Optional JWT access token
+        session_id: Optional session ID to resume (only the session's owner may;
+            others are closed with 1008); a new one is created otherwise
+    """
+    if token is None:
+        authorization = websocket.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+    
+    current_user = resolve_user_from_token(token)
+    if current_user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    session_id = session_id or str(uuid.uuid4())
+    if not orchestrator.claim_session(session_id, str(current_user.id)):
+        logger.warning(f"Rejecting chat WebSocket of user {current_user.id}: session belongs to another user")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    if not ws_connections.register(websocket):
+        logger.warning("Rejecting chat WebSocket: connection limit reached")
+        await websocket.close(code=WS_1013_TRY_AGAIN_LATER)
+        return
+    
+    async def handle_message(payload: Dict[str, Any]) -> Dict[str, Any]:
+        request = ChatRequest(
+            message=payload.get("message", ""),
+            session_id=session_id,
+            message_id=payload.get("message_id"),
+            metadata=payload.get("metadata") or {}
+        )
+        priority = _admission_priority(request, current_user)
+        try:
+            response, replayed = await _run_chat_turn(request, str(current_user.id), priority)
+        except SessionNotFound:
+            return {
+                "type": "error",
+                "detail": "Session not found",
+                "correlation_id": payload.get("message_id"),
+                "retryable": False
+            }
+        except Overloaded as e:
+            _record_shed_turn(str(current_user.id), request)
+            return {
+                "type": "error",
+                "detail": e.reason,
+                "correlation_id": payload.get("message_id"),
+                "retryable": True,
+                "retry_after": e.retry_after
+            }
+        return {
+            "type": "response",
+            "correlation_id": payload.get("message_id"),
+            "replayed": replayed,
+            **response
+        }
+    
+    connection = ChatConnection(
+        websocket,
+        handle_message,
+        heartbeat_interval=settings.WS_HEARTBEAT_SECONDS,
+        max_pending_messages=settings.WS_MAX_PENDING_MESSAGES,
+        dumps=dumps_str
+    )
+    
+    try:
+        await websocket.accept()
+        await websocket.send_text(json.dumps({"type": "session", "session_id": session_id}))
+        orchestrator.add_session_listener(session_id, connection.push)
+        logger.info(f"Chat WebSocket opened for user {current_user.id}, session {session_id}")
+        await connection.run()
+    finally:
+        orchestrator.remove_session_listener(session_id, connection.push)
+        ws_connections.unregister(websocket)
+        logger.info(f"Chat WebSocket closed for session {session_id}")
+
+# Messages per page when a session's history is exported as NDJSON
+HISTORY_EXPORT_PAGE_SIZE = 500
+
+def _history_position(cursor: Optional[str]) -> Optional[HistoryKey]:
+    """
+    Decode a history cursor.
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    if cursor is None:
+        return None
+    try:
+        micros, message_id = decode_cursor(cursor, 2)
+    except ValueError:
+        micros = message_id = None
+    if not isinstance(micros, int) or not isinstance(message_id, str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return micros, message_id
+
 @router.get("/history/{session_id}", response_model=List[ChatMessage])
 async def get_chat_history(
     session_id: str,
-    limit: int = 20,
+    http_request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     current_user: Optional[User] = Depends(get_optional_user)
-) -> List[ChatMessage]:
+) -> Response:
     """
-    Retrieve chat history for a specific session.
+    Retrieve chat history for a specific session, oldest message first.
+    
+    Recent messages come from the session store; older ones from the
+    interactions logged to Firestore. Pages are addressed with opaque cursors:
+    pass the ``X-Next-Cursor`` header of a response as ``cursor`` to get the
+    messages after it (a ``Link: rel="next"`` header is set while more are
+    known to exist). Polling with the last cursor and ``If-None-Match`` set to
+    the last ``ETag`` returns 304 until new messages arrive.
+    
+    ``format=ndjson`` streams every message after ``cursor`` as
+    newline-delimited JSON instead, for exporting long sessions.
     
     Args:
         session_id: The session ID to retrieve history for
+        http_request: The incoming HTTP request (used for conditional headers)
         limit: Maximum number of messages to return
+        cursor: Cursor of the last message already seen
+        export_format: 'json' for a page, 'ndjson' for a streamed export
         current_user: The authenticated user (from JWT token)
         
     Returns:
         List of chat messages in the session
     """
-    try:
-        # In a real implementation, this would fetch from a database
-        # For now, return an empty list as a placeholder
-        return []
+    user_id = str(_resolve_chat_user(current_user).id)
+    owner = orchestrator.get_session_owner(session_id)
+    if owner is not None and owner != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    after = _history_position(cursor)
+    
+    if export_format == "ndjson":
+        async def export() -> AsyncIterator[str]:
+            position = after
+            while True:
+                page = await orchestrator.get_history_page(
+                    session_id, user_id, HISTORY_EXPORT_PAGE_SIZE, position
+                )
+                for message in page.messages:
+                    yield dumps_str(message) + "\n"
+                if not page.has_more:
+                    break
+                position = page.last_key
         
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+    
+    try:
+        page = await orchestrator.get_history_page(session_id, user_id, limit, after)
     except Exception as e:
         logger.error(f"Error retrieving chat history: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while retrieving chat history"
         )
+    
+    body = dumps(page.messages)
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    next_cursor = encode_cursor(page.last_key) if page.last_key else cursor
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if page.has_more:
+        headers["Link"] = f'<{http_request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.post("/escalate", response_model=Dict[str, Any], tags=["escalation"])
 async def escalate_conversation(
@@ -204,6 +854,116 @@ async def escalate_conversation(
             detail="An error occurred while processing your escalation request"
         )
 
+@router.get("/escalations", response_model=List[Dict[str, Any]], tags=["escalation"])
+async def list_escalations(
+    status_filter: str = "pending",
+    priority: Optional[str] = None,
+    limit: int = 50,
+    current_user: User = Depends(agent_required)
+) -> List[Dict[str, Any]]:
+    """
+    List escalations for the human agent dashboard.
+    
+    Pending escalations are returned from the in-memory priority queue,
+    highest priority and oldest first.
+    
+    Args:
+        status_filter: Escalation status to list (default: 'pending')
+        priority: Optional priority filter
+        limit: Maximum number of escalations to return
+        current_user: The authenticated agent (from JWT token)
+        
+    Returns:
+        List of escalation records
+    """
+    return await orchestrator.agents["escalation"].get_active_escalations(
+        status=status_filter,
+        priority=priority,
+        limit=limit
+    )
+
+@router.post("/escalations/claim", response_model=Dict[str, Any], tags=["escalation"])
+async def claim_escalation(
+    request: Dict[str, Any],
+    current_user: User = Depends(agent_required)
+) -> Dict[str, Any]:
+    """
+    Claim a pending escalation for the current human agent.
+    
+    Args:
+        request: Optional ``escalation_id`` to claim a specific ticket and
+            optional ``priority`` to restrict which ticket is claimed next
+        current_user: The authenticated agent (from JWT token)
+        
+    Returns:
+        The claimed escalation record
+        
+    Raises:
+        HTTPException: If there is no escalation left to claim
+    """
+    escalation = await orchestrator.agents["escalation"].claim_escalation(
+        agent_id=current_user.user_id,
+        escalation_id=request.get("escalation_id"),
+        priority=request.get("priority")
+    )
+    if escalation is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No pending escalation available to claim"
+        )
+    return escalation
+
+@router.get("/escalations/feed", tags=["escalation"])
+async def escalation_feed(
+    request: Request,
+    current_user: User = Depends(agent_required)
+) -> StreamingResponse:
+    """
+    Stream escalation queue changes as server-sent events.
+    
+    Args:
+        request: The incoming request (used to detect client disconnects)
+        current_user: The authenticated agent (from JWT token)
+        
+    Returns:
+        An event stream of queue change events
+    """
+    queue = orchestrator.agents["escalation"].queue
+    feed = queue.subscribe()
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            yield _format_sse("snapshot", {"depth": len(queue)})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(feed.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment frames keep proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event["event"], event)
+        finally:
+            queue.unsubscribe(feed)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+def readiness_report() -> Dict[str, Any]:
+    """
+    Report whether this worker should receive chat traffic.
+    
+    Returns:
+        The orchestrator health report (see AgentOrchestrator.health_report)
+    """
+    required_agents = None
+    if settings.READINESS_REQUIRED_AGENTS is not None:
+        required_agents = [
+            agent.strip() for agent in settings.READINESS_REQUIRED_AGENTS.split(",") if agent.strip()
+        ]
+    return orchestrator.health_report(
+        required_agents=required_agents,
+        max_error_rate=settings.READINESS_MAX_ERROR_RATE
+    )
+
 @router.get("/status", response_model=Dict[str, Any], tags=["health"])
 async def get_system_status() -> Dict[str, Any]:
     """
@@ -213,18 +973,15 @@ async def get_system_status() -> Dict[str, Any]:
         Dictionary with system status information
     """
     try:
-        # In a real implementation, this would check the status of all agents
-        # For now, return a simple status
+        health = readiness_report()
         return {
-            "status": "operational",
+            "status": health["status"],
+            "ready": health["ready"],
             "timestamp": datetime.utcnow().isoformat(),
-            "agents": {
-                "intent_classifier": "operational",
-                "knowledge_base": "operational",
-                "personalization": "operational",
-                "proactive_engagement": "operational",
-                "escalation": "operational"
-            },
+            "agents": health["agents"],
+            "circuit_breakers": circuit_breaker_states(),
+            "hedging": hedging_stats(),
+            "admission": admission.stats(),
             "version": "1.0.0"
         }
     except Exception as e:
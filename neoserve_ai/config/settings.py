@@ -43,6 +43,101 @@ class AppSettings(BaseSettings):
     max_history_size: int = int(os.getenv("MAX_HISTORY_SIZE", "20"))  # Alias for compatibility
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # WebSocket chat transport
+    WS_MAX_CONNECTIONS: int = int(os.getenv("WS_MAX_CONNECTIONS", "1000"))
+    WS_HEARTBEAT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+    WS_MAX_PENDING_MESSAGES: int = int(os.getenv("WS_MAX_PENDING_MESSAGES", "16"))
+    
+    # Idempotent chat turns (keyed on session_id + client message_id)
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+    
+    # Total time budget of a chat turn; clients may lower it with X-Request-Timeout,
+    # but not below the minimum
+    CHAT_REQUEST_BUDGET_SECONDS: float = float(os.getenv("CHAT_REQUEST_BUDGET_SECONDS", "15"))
+    CHAT_MIN_REQUEST_BUDGET_SECONDS: float = float(os.getenv("CHAT_MIN_REQUEST_BUDGET_SECONDS", "2"))
+    
+    # Admission control for chat turns
+    ADMISSION_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_INITIAL_LIMIT", "32"))
+    ADMISSION_MIN_LIMIT: int = int(os.getenv("ADMISSION_MIN_LIMIT", "4"))
+    ADMISSION_MAX_LIMIT: int = int(os.getenv("ADMISSION_MAX_LIMIT", "256"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+    ADMISSION_TARGET_LATENCY_SECONDS: float = float(os.getenv("ADMISSION_TARGET_LATENCY_SECONDS", "2"))
+    
+    # Bulk chat processing
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "10000"))
+    BATCH_MAX_BODY_BYTES: int = int(os.getenv("BATCH_MAX_BODY_BYTES", str(8 * 1024 * 1024)))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    BATCH_CLASSIFY_SIZE: int = int(os.getenv("BATCH_CLASSIFY_SIZE", "32"))
+    BATCH_CLASSIFY_WAIT_MS: float = float(os.getenv("BATCH_CLASSIFY_WAIT_MS", "5"))
+    
+    # Circuit breakers around Vertex AI, Discovery Engine, Firestore and Pub/Sub
+    CIRCUIT_WINDOW_SIZE: int = int(os.getenv("CIRCUIT_WINDOW_SIZE", "20"))
+    CIRCUIT_MIN_CALLS: int = int(os.getenv("CIRCUIT_MIN_CALLS", "10"))
+    CIRCUIT_FAILURE_RATE: float = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+    CIRCUIT_SLOW_CALL_SECONDS: float = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+    CIRCUIT_SLOW_CALL_RATE: float = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+    CIRCUIT_OPEN_SECONDS: float = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+    CIRCUIT_HALF_OPEN_CALLS: int = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "3"))
+    
+    # Hedged reads (opt-in): a second attempt is sent once the first outlives the quantile
+    HEDGING_ENABLED: bool = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+    HEDGE_QUANTILE: float = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+    HEDGE_BUDGET_RATIO: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+    HEDGE_MIN_DELAY_MS: float = float(os.getenv("HEDGE_MIN_DELAY_MS", "10"))
+    
+    # Span tracing of chat turns ('log' or 'otel' exporter)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "log")
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+    
+    # Readiness: agents that must be operational (comma separated) for /health/ready;
+    # unset requires every agent without a local fallback
+    READINESS_REQUIRED_AGENTS: Optional[str] = os.getenv("READINESS_REQUIRED_AGENTS")
+    READINESS_MAX_ERROR_RATE: float = float(os.getenv("READINESS_MAX_ERROR_RATE", "0.5"))
+    
+    # Logging pipeline: records are written by a background thread from a bounded queue
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_MAX_MESSAGE_CHARS: int = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+    # Per-category sampling of records below WARNING, e.g. "vertex_ai=0.1,neoserve_ai.agents=0.5"
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+    
+    # Vertex AI call telemetry, batched to local Parquet / compressed NDJSON files
+    TELEMETRY_ENABLED: bool = os.getenv("TELEMETRY_ENABLED", "false").lower() == "true"
+    TELEMETRY_DIR: str = os.getenv("TELEMETRY_DIR", "telemetry")
+    TELEMETRY_FLUSH_SECONDS: float = float(os.getenv("TELEMETRY_FLUSH_SECONDS", "30"))
+    TELEMETRY_BATCH_SIZE: int = int(os.getenv("TELEMETRY_BATCH_SIZE", "500"))
+    TELEMETRY_MAX_FILES: int = int(os.getenv("TELEMETRY_MAX_FILES", "200"))
+    TELEMETRY_FORMAT: str = os.getenv("TELEMETRY_FORMAT", "auto")
+    
+    # Password hashing pool: bcrypt runs on these threads instead of the event loop
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    
+    # Verified-token cache: repeat requests with the same bearer token skip JWT verification
+    JWT_CACHE_MAX_ENTRIES: int = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+    # Longest time a cached token is trusted before it is verified (and the user looked up) again
+    JWT_CACHE_MAX_TTL_SECONDS: float = float(os.getenv("JWT_CACHE_MAX_TTL_SECONDS", "300"))
+    # Longest time a logout handled by another worker goes unnoticed (revocations are shared via DATABASE_URL)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "1"))
+    
+    # User repository (SQLite at DATABASE_URL): connections per worker and in-process user cache
+    USER_DB_POOL_SIZE: int = int(os.getenv("USER_DB_POOL_SIZE", "4"))
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "1024"))
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    
+    # Messages folded into a session's rolling summary at once when its history exceeds MAX_HISTORY_SIZE
+    HISTORY_FOLD_SIZE: int = int(os.getenv("HISTORY_FOLD_SIZE", "10"))
+    
+    # Session store snapshot: written periodically and on shutdown, mapped and restored lazily on startup
+    SESSION_SNAPSHOT_ENABLED: bool = os.getenv("SESSION_SNAPSHOT_ENABLED", "false").lower() == "true"
+    SESSION_SNAPSHOT_PATH: str = os.getenv("SESSION_SNAPSHOT_PATH", "data/sessions.snapshot")
+    SESSION_SNAPSHOT_INTERVAL_SECONDS: float = float(os.getenv("SESSION_SNAPSHOT_INTERVAL_SECONDS", "300"))
+    # Sessions inactive for longer than this are left out of the snapshot
+    SESSION_SNAPSHOT_MAX_AGE_SECONDS: float = float(os.getenv("SESSION_SNAPSHOT_MAX_AGE_SECONDS", "86400"))
+    
     # Intent Classifier settings
     INTENT_CLASSIFIER_ENDPOINT_ID: str = os.getenv("INTENT_CLASSIFIER_ENDPOINT_ID", "")
     INTENT_CONFIDENCE_THRESHOLD: float = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.5"))
@@ -121,6 +216,12 @@ ESCALATION_CONFIG: Dict[str, Any] = {
     "max_wait_time": int(os.getenv("MAX_ESCALATION_WAIT_MINUTES", "30")),
     "support_team_email": os.getenv("SUPPORT_TEAM_EMAIL", "support@example.com"),
     "enable_auto_escalation": os.getenv("ENABLE_AUTO_ESCALATION", "true").lower() == "true",
+    "queue_refresh_seconds": int(os.getenv("ESCALATION_QUEUE_REFRESH_SECONDS", "60")),
+    "snapshot_max_messages": int(os.getenv("ESCALATION_SNAPSHOT_MAX_MESSAGES", "10")),
+    "snapshot_max_message_chars": int(os.getenv("ESCALATION_SNAPSHOT_MAX_MESSAGE_CHARS", "500")),
+    "snapshot_max_bytes": int(os.getenv("ESCALATION_SNAPSHOT_MAX_BYTES", "16384")),
+    "sentiment_threshold": float(os.getenv("ESCALATION_SENTIMENT_THRESHOLD", "-0.6")),
+    "open_escalation_cache_size": int(os.getenv("ESCALATION_OPEN_CACHE_SIZE", "10000")),
 }
 
 # API configuration
@@ -276,5 +377,19 @@ def get_agent_config(agent_name: str) -> Dict[str, Any]:
             "max_engagement_attempts": int(os.getenv("MAX_ENGAGEMENT_ATTEMPTS", "3")),
             "enable_proactive_engagement": os.getenv("ENABLE_PROACTIVE_ENGAGEMENT", "true").lower() == "true",
         }
+    elif agent_name == "escalation_agent":
+        return {
+            "project_id": config.project_id,
+            "escalation_collection": "escalations",
+            "interaction_collection": config.INTERACTION_COLLECTION,
+            "max_unsuccessful_attempts": int(os.getenv("MAX_UNSUCCESSFUL_ATTEMPTS", "3")),
+            "max_wait_time": int(os.getenv("MAX_ESCALATION_WAIT_MINUTES", "30")),
+            "queue_refresh_seconds": int(os.getenv("ESCALATION_QUEUE_REFRESH_SECONDS", "60")),
+            "snapshot_max_messages": int(os.getenv("ESCALATION_SNAPSHOT_MAX_MESSAGES", "10")),
+            "snapshot_max_message_chars": int(os.getenv("ESCALATION_SNAPSHOT_MAX_MESSAGE_CHARS", "500")),
+            "snapshot_max_bytes": int(os.getenv("ESCALATION_SNAPSHOT_MAX_BYTES", "16384")),
+            "sentiment_threshold": float(os.getenv("ESCALATION_SENTIMENT_THRESHOLD", "-0.6")),
+            "open_escalation_cache_size": int(os.getenv("ESCALATION_OPEN_CACHE_SIZE", "10000")),
+        }
     else:
         raise ValueError(f"Unknown agent: {agent_name}")
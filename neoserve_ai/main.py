@@ -1,6 +1,7 @@
 """
 Main FastAPI application for NeoServe AI.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import List
@@ -8,12 +9,19 @@ from typing import List
 from fastapi import FastAPI, APIRouter, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from neoserve_ai.config.settings import get_config, init_config
 from neoserve_ai.api.api_v1.api import api_router
+from neoserve_ai.api.api_v1.endpoints.chat import orchestrator, readiness_report
+from neoserve_ai.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_prometheus
+from neoserve_ai.utils.logging_pipeline import configure_logging_pipeline, parse_sample_rates
+from neoserve_ai.utils.tracing import configure_tracing
+from neoserve_ai.utils.telemetry import TelemetrySink
+from neoserve_ai.utils.vertex_ai_logger import vertex_ai_logger
+from neoserve_ai.utils.auth import password_hasher, revoked_tokens
 
 # Initialize configuration
 settings = get_config()
@@ -25,21 +33,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Log formatting and I/O move off the event loop at startup (see lifespan)
+logging_pipeline = None
+
+# Configure span tracing (no-op unless enabled)
+configure_tracing(
+    enabled=settings.TRACING_ENABLED,
+    exporter=settings.TRACING_EXPORTER,
+    sample_rate=settings.TRACING_SAMPLE_RATE
+)
+
+# Batch Vertex AI call telemetry to local files (see utils.telemetry_report)
+telemetry_sink = TelemetrySink(
+    directory=settings.TELEMETRY_DIR,
+    flush_interval=settings.TELEMETRY_FLUSH_SECONDS,
+    batch_size=settings.TELEMETRY_BATCH_SIZE,
+    max_files=settings.TELEMETRY_MAX_FILES,
+    file_format=settings.TELEMETRY_FORMAT
+) if settings.TELEMETRY_ENABLED else None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
-    # Startup: Initialize resources
+    global logging_pipeline
+    
+    # Startup: Initialize resources. Everything that starts a thread or opens a
+    # connection happens here, in the worker, rather than at import time: with
+    # gunicorn's preload_app the module is imported by the master before fork.
+    if settings.LOG_ASYNC:
+        logging_pipeline = configure_logging_pipeline(
+            queue_size=settings.LOG_QUEUE_SIZE,
+            sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
+            max_message_chars=settings.LOG_MAX_MESSAGE_CHARS
+        )
+    
     logger.info("Starting NeoServe AI application...")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     
-    # Add any initialization code here
+    # Router startup handlers do not run when a lifespan is set, so initialize
+    # the agents here; readiness reports unavailable until this has succeeded
+    await orchestrator.initialize()
+    
+    # Sessions from the last snapshot are restored on first use
+    checkpoint_task = None
+    if settings.SESSION_SNAPSHOT_ENABLED:
+        orchestrator.load_session_snapshot()
+        checkpoint_task = asyncio.create_task(
+            orchestrator.run_checkpoints(settings.SESSION_SNAPSHOT_INTERVAL_SECONDS)
+        )
+    
+    if telemetry_sink is not None:
+        telemetry_sink.start()
+        vertex_ai_logger.telemetry = telemetry_sink
+    
+    # Logouts handled by other workers are pulled from the user store in the
+    # background, so authentication only reads memory
+    revocation_sync_task = asyncio.create_task(revoked_tokens.run_sync())
     
     yield
     
     # Shutdown: Clean up resources
     logger.info("Shutting down NeoServe AI application...")
-    # Add any cleanup code here
+    revocation_sync_task.cancel()
+    if checkpoint_task is not None:
+        checkpoint_task.cancel()
+        try:
+            await orchestrator.checkpoint_sessions()
+        except Exception as e:
+            logger.error(f"Error checkpointing sessions on shutdown: {str(e)}", exc_info=True)
+        orchestrator.close_session_snapshot()
+    password_hasher.shutdown()
+    if telemetry_sink is not None:
+        vertex_ai_logger.telemetry = None
+        telemetry_sink.stop()
+    if logging_pipeline is not None:
+        # Flush queued records before the process exits
+        logging_pipeline.stop()
+        logging_pipeline = None
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -112,13 +183,34 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 # Health check endpoint
 @app.get("/health", tags=["health"])
 async def health_check():
-    """Health check endpoint to verify the API is running."""
-    return {
-        "status": "ok",
-        "environment": settings.ENVIRONMENT,
-        "debug": settings.DEBUG,
-        "version": "0.1.0"
-    }
+    """Legacy health check; answers like the readiness probe."""
+    return await readiness_check()
+
+@app.get("/health/live", tags=["health"])
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/health/ready", tags=["health"])
+async def readiness_check():
+    """
+    Readiness probe: whether this worker should receive chat traffic.
+    
+    Returns 503 while the agents are not initialized or a required agent
+    (READINESS_REQUIRED_AGENTS, by default those without a local fallback)
+    is down, so load balancers route around it.
+    """
+    health = readiness_report()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if health["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=health
+    )
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Export process metrics in the Prometheus text format."""
+    return Response(content=render_prometheus(), media_type=METRICS_CONTENT_TYPE)
 
 from fastapi.responses import RedirectResponse
 
@@ -1,5 +1,6 @@
+import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, TypedDict, Union
 from pydantic import BaseModel, Field, HttpUrl
 
 class ChatMessage(BaseModel):
@@ -11,10 +12,13 @@ class ChatMessage(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="When the message was sent")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata about the message")
 
+# Longest accepted session ID; session IDs are stored as snapshot record keys
+MAX_SESSION_ID_LENGTH = 256
+
 class ChatRequest(BaseModel):
     """Request model for sending a chat message."""
     message: str = Field(..., description="The user's message")
-    session_id: str = Field(..., description="ID of the chat session")
+    session_id: str = Field(..., max_length=MAX_SESSION_ID_LENGTH, description="ID of the chat session")
     message_id: Optional[str] = Field(None, description="Optional client-generated message ID")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional context or metadata")
 
@@ -48,6 +52,89 @@ class ChatResponse(BaseModel):
     sources: List[SourceDocument] = Field(default_factory=list, description="Source documents used for the response")
     escalation: Optional[EscalationDetails] = Field(None, description="Details about any escalation")
 
+class SourcePayload(TypedDict):
+    """Encoded form of :class:`SourceDocument`."""
+    title: str
+    url: Optional[str]
+    snippet: Optional[str]
+    confidence: Optional[float]
+
+class EscalationPayload(TypedDict):
+    """Encoded form of :class:`EscalationDetails`."""
+    escalated: bool
+    reason: Optional[str]
+    priority: Optional[str]
+    timestamp: Optional[Union[datetime, str]]
+    estimated_wait_time: Optional[int]
+
+class ChatResponsePayload(TypedDict):
+    """
+    A :class:`ChatResponse` as plain values, ready to be encoded as JSON.
+    
+    Built by :func:`build_chat_response_payload`, which coerces every field to
+    the type the model declares, so the payload can be sent without validating
+    it against the model again.
+    """
+    message_id: str
+    session_id: str
+    timestamp: datetime
+    response: str
+    intent: str
+    confidence: float
+    source: str
+    metadata: Dict[str, Any]
+    requires_follow_up: bool
+    suggested_responses: List[str]
+    sources: List[SourcePayload]
+    escalation: Optional[EscalationPayload]
+
+def _optional(value: Any, cast: Any) -> Any:
+    return None if value is None else cast(value)
+
+def _source_payload(source: Dict[str, Any]) -> SourcePayload:
+    return {
+        "title": str(source.get("title", "")),
+        "url": _optional(source.get("url"), str),
+        "snippet": _optional(source.get("snippet"), str),
+        "confidence": _optional(source.get("confidence"), float)
+    }
+
+def _escalation_payload(escalation: Dict[str, Any]) -> EscalationPayload:
+    return {
+        "escalated": bool(escalation.get("escalated", False)),
+        "reason": _optional(escalation.get("reason"), str),
+        "priority": _optional(escalation.get("priority"), str),
+        "timestamp": escalation.get("timestamp"),
+        "estimated_wait_time": _optional(escalation.get("estimated_wait_time"), int)
+    }
+
+def build_chat_response_payload(session_id: str, result: Dict[str, Any]) -> ChatResponsePayload:
+    """
+    Build the response of a chat turn from an orchestrator result.
+    
+    Args:
+        session_id: ID of the chat session
+        result: Dictionary returned by ``AgentOrchestrator.process_message``
+        
+    Returns:
+        The response in the shape of :class:`ChatResponse`
+    """
+    escalation = result.get('escalation')
+    return {
+        "message_id": str(uuid.uuid4()),
+        "session_id": session_id,
+        "timestamp": datetime.utcnow(),
+        "response": str(result.get('response', 'No response generated')),
+        "intent": str(result.get('intent', 'general_query')),
+        "confidence": float(result.get('confidence', 0.8)),
+        "source": str(result.get('source', 'knowledge_base')),
+        "metadata": dict(result.get('metadata') or {}),
+        "requires_follow_up": bool(result.get('requires_follow_up', False)),
+        "suggested_responses": [str(s) for s in result.get('suggested_responses') or []],
+        "sources": [_source_payload(s) for s in result.get('sources') or []],
+        "escalation": _escalation_payload(escalation) if escalation else None
+    }
+
 class ConversationHistory(BaseModel):
     """Represents a conversation history with multiple messages."""
     session_id: str = Field(..., description="ID of the chat session")
@@ -0,0 +1,223 @@
+"""
+Admission control and load shedding for chat turns.
+
+Each chat turn holds a slot while it runs through the agent pipeline. The number of
+slots adapts to observed latency (additive increase, multiplicative decrease), so
+when a downstream dependency such as Vertex AI slows down, fewer turns run at once
+and the rest wait in a bounded, prioritized queue. Requests that cannot be admitted
+within their deadline, or that arrive when the queue is full, are rejected quickly
+with :class:`Overloaded` so the API can answer 503 with a Retry-After hint instead
+of piling up work until the worker runs out of memory.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_REJECTIONS = counter("neoserve_admission_rejections_total", "Chat turns shed by admission control")
+
+# Admission priority classes; lower rank is admitted first
+ADMISSION_PRIORITIES: Dict[str, int] = {
+    "escalation": 0,     # sessions with an open escalation or likely to need a human
+    "retry": 1,          # retries of turns that were shed
+    "authenticated": 2,
+    "anonymous": 3,
+}
+DEFAULT_ADMISSION_PRIORITY = "anonymous"
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, retry_after: int, reason: str = "Server is overloaded"):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Adaptive concurrency limiter with a bounded priority wait queue.
+
+    The limit grows by roughly one slot per round trip while turns complete within
+    ``target_latency`` and the limit is saturated, and shrinks by ``backoff`` (at
+    most once per observed round trip) when turns are slow or fail.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 32,
+        min_limit: int = 4,
+        max_limit: int = 256,
+        max_queue_size: int = 128,
+        queue_timeout: float = 5.0,
+        target_latency: float = 2.0,
+        backoff: float = 0.9
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial_limit: Concurrent turns allowed at startup
+            min_limit: Lower bound for the adaptive limit
+            max_limit: Upper bound for the adaptive limit
+            max_queue_size: Maximum number of requests waiting for a slot
+            queue_timeout: Seconds a request may wait for a slot before it is shed
+            target_latency: Turn latency (seconds) above which the limit is reduced
+            backoff: Multiplicative decrease applied to the limit on slow turns
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Number of requests currently waiting for a slot."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the controller state for status endpoints."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "latency_seconds": round(self._latency, 3) if self._latency is not None else None,
+        }
+
+    @asynccontextmanager
+    async def admit(self, priority: str = DEFAULT_ADMISSION_PRIORITY) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the ``async with`` block.
+
+        Args:
+            priority: Admission priority class (see ADMISSION_PRIORITIES)
+
+        Raises:
+            Overloaded: If the request is shed instead of admitted
+        """
+        await self.acquire(priority)
+        start = time.monotonic()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            self.release(time.monotonic() - start, succeeded)
+
+    async def acquire(self, priority: str = DEFAULT_ADMISSION_PRIORITY) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            priority: Admission priority class (see ADMISSION_PRIORITIES)
+
+        Raises:
+            Overloaded: If the queue is full or no slot frees up within queue_timeout
+        """
+        if self.in_flight < int(self.limit) and not self.queued:
+            self.in_flight += 1
+            return
+
+        rank = ADMISSION_PRIORITIES.get(priority, ADMISSION_PRIORITIES[DEFAULT_ADMISSION_PRIORITY])
+        if self.queued >= self.max_queue_size and not self._shed_lower_priority(rank):
+            self.rejected += 1
+            ADMISSION_REJECTIONS.inc()
+            raise Overloaded(self.retry_after(), "Request queue is full")
+
+        if len(self._waiters) > 2 * self.max_queue_size:
+            # Drop entries of requests that already timed out or were shed
+            self._waiters = [entry for entry in self._waiters if not entry[2].done()]
+            heapq.heapify(self._waiters)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._counter), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Granted a slot just as the deadline passed
+                return
+            future.cancel()
+            self.rejected += 1
+            ADMISSION_REJECTIONS.inc()
+            raise Overloaded(self.retry_after(), "Timed out waiting for capacity")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(0.0, True, observe=False)
+            else:
+                future.cancel()
+            raise
+
+    def release(self, latency: float, succeeded: bool = True, observe: bool = True) -> None:
+        """
+        Return a slot and adapt the limit to the observed turn latency.
+
+        Args:
+            latency: Seconds the turn held its slot
+            succeeded: Whether the turn completed without raising
+            observe: Whether the latency should feed the limit adaptation
+        """
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight = max(0, self.in_flight - 1)
+
+        if observe:
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            now = time.monotonic()
+            if not succeeded or latency > self.target_latency:
+                # Decrease at most once per round trip so one slow burst is not over-penalized
+                if now - self._last_decrease >= (self._latency or 0.0):
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+                    logger.info(f"Admission limit decreased to {int(self.limit)} (latency {latency:.2f}s)")
+            elif saturated:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+        self._grant()
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds when capacity is likely to be available."""
+        latency = self._latency if self._latency is not None else self.target_latency
+        backlog = (self.queued + 1) / max(int(self.limit), 1)
+        return max(1, math.ceil(latency * backlog))
+
+    def _grant(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _shed_lower_priority(self, rank: int) -> bool:
+        # Make room for a higher priority request by rejecting the lowest priority,
+        # newest waiter
+        candidates = [entry for entry in self._waiters if not entry[2].done()]
+        if not candidates:
+            return False
+        victim = max(candidates, key=lambda entry: (entry[0], entry[1]))
+        if victim[0] <= rank:
+            return False
+        victim[2].set_exception(Overloaded(self.retry_after(), "Shed for higher priority traffic"))
+        self.rejected += 1
+        ADMISSION_REJECTIONS.inc()
+        return True
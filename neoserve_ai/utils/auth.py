@@ -1,6 +1,7 @@
 """
 Authentication and authorization utilities for the NeoServe AI API.
 """
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
@@ -16,6 +17,9 @@ from passlib.context import CryptContext
 
 from ..schemas.user import User, UserInDB, TokenData, UserRole
 from ..config.settings import get_config
+from .password_hashing import PasswordHasher
+from .token_cache import VerifiedTokenCache, revoked_tokens
+from .user_repository import create_user_repository
 
 # Get configuration
 settings = get_config()
@@ -23,6 +27,13 @@ settings = get_config()
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Runs bcrypt off the event loop for the async request handlers
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/token",
@@ -34,15 +45,22 @@ JWT_SECRET_KEY = settings.SECRET_KEY
 JWT_ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Mock user database (in a real app, this would be a database)
-# This is just for demonstration purposes
-fake_users_db = {
+# Users resolved from verified tokens, so repeat requests skip JWT verification
+verified_token_cache: VerifiedTokenCache[User] = VerifiedTokenCache(
+    name="jwt",
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+    max_ttl_seconds=settings.JWT_CACHE_MAX_TTL_SECONDS
+)
+
+# Demo accounts seeded into the user repository. The hashes are precomputed
+# (password123, password123, admin123) so importing the module does not run bcrypt.
+DEMO_USERS = {
     "customer1@example.com": {
         "user_id": "user_123",
         "email": "customer1@example.com",
         "first_name": "John",
         "last_name": "Doe",
-        "hashed_password": pwd_context.hash("password123"),
+        "hashed_password": "$2b$12$fnpzg24KqmW1Hbe6sK/YNuT/QsUu1dsmqPYcQEMcE4u/QUgDsXQyC",
         "roles": ["customer"],
         "status": "active",
         "created_at": "2023-01-01T00:00:00",
@@ -54,7 +72,7 @@ fake_users_db = {
         "email": "agent1@example.com",
         "first_name": "Jane",
         "last_name": "Smith",
-        "hashed_password": pwd_context.hash("password123"),
+        "hashed_password": "$2b$12$sVKh0Jw2obW9yemZP2UaG.tBhWk9nF3/JzhHEr/1LPXCkXJYKPvhq",
         "roles": ["agent"],
         "status": "active",
         "created_at": "2023-01-01T00:00:00",
@@ -66,7 +84,7 @@ fake_users_db = {
         "email": "admin@example.com",
         "first_name": "Admin",
         "last_name": "User",
-        "hashed_password": pwd_context.hash("admin123"),
+        "hashed_password": "$2b$12$/gEiDoAYkRnCk82B5bJu1e2ydT1i8OWkY8FZk5b4JTcjC1NN7Hn/m",
         "roles": ["admin"],
         "status": "active",
         "created_at": "2023-01-01T00:00:00",
@@ -75,6 +93,17 @@ fake_users_db = {
     }
 }
 
+# User store (SQLite at DATABASE_URL); connections are opened per process on first use
+user_repository = create_user_repository(
+    settings.DATABASE_URL,
+    pool_size=settings.USER_DB_POOL_SIZE,
+    cache_size=settings.USER_CACHE_SIZE,
+    cache_ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+# Revocations are shared with the other workers through the user store
+revoked_tokens.attach_store(user_repository, settings.TOKEN_REVOCATION_SYNC_SECONDS)
+_demo_users_seeded = False
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
@@ -100,6 +129,37 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash without blocking the event loop.
+    
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password to compare against
+        
+    Returns:
+        bool: True if the password matches, False otherwise
+        
+    Raises:
+        Overloaded: If too many hashing operations are already pending
+    """
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop.
+    
+    Args:
+        password: The plain text password to hash
+        
+    Returns:
+        str: The hashed password
+        
+    Raises:
+        Overloaded: If too many hashing operations are already pending
+    """
+    return await password_hasher.hash(password)
+
 def get_user(email: str) -> Optional[UserInDB]:
     """
     Get a user by email.
@@ -110,14 +170,34 @@ def get_user(email: str) -> Optional[UserInDB]:
     Returns:
         Optional[UserInDB]: The user if found, None otherwise
     """
-    if email in fake_users_db:
-        user_dict = fake_users_db[email]
-        return UserInDB(**user_dict)
-    return None
+    _seed_demo_users()
+    return user_repository.get_by_email(email)
+
+async def get_user_async(email: str) -> Optional[UserInDB]:
+    """
+    Get a user by email without blocking the event loop on the database.
+    
+    Args:
+        email: The user's email address
+        
+    Returns:
+        Optional[UserInDB]: The user if found, None otherwise
+    """
+    if not _demo_users_seeded:
+        await asyncio.to_thread(_seed_demo_users)
+    return await user_repository.get_by_email_async(email)
 
-def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
+def _seed_demo_users() -> None:
+    global _demo_users_seeded
+    if not _demo_users_seeded:
+        # Seeded on first lookup rather than at import (which may happen in a
+        # preloading gunicorn master); existing accounts are left untouched
+        user_repository.seed(UserInDB(**user) for user in DEMO_USERS.values())
+        _demo_users_seeded = True
+
+async def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
     """
-    Authenticate a user.
+    Authenticate a user, verifying the password off the event loop.
     
     Args:
         email: The user's email address
@@ -125,11 +205,14 @@ def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
         
     Returns:
         Optional[UserInDB]: The authenticated user if successful, None otherwise
+        
+    Raises:
+        Overloaded: If too many hashing operations are already pending
     """
-    user = get_user(email)
+    user = await get_user_async(email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -157,6 +240,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     Get the current authenticated user from the JWT token.
     
+    Tokens that were verified recently are answered from ``verified_token_cache``
+    until they expire or are revoked. The returned user object is shared by
+    those requests and must not be modified.
+    
     Args:
         token: The JWT token
         
@@ -164,7 +251,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         User: The authenticated user
         
     Raises:
-        HTTPException: If the token is invalid or the user is not found
+        HTTPException: If the token is invalid, revoked or the user is not found
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -176,11 +263,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         logger.error("No token provided")
         raise credentials_exception
     
-    # Log token prefix for debugging (don't log full token for security)
-    token_prefix = token[:10] if len(token) > 10 else token
-    logger.debug(f"Attempting to verify token: {token_prefix}...")
-    logger.debug(f"Using JWT secret key: {JWT_SECRET_KEY[:5]}...")
-    logger.debug(f"Using algorithm: {JWT_ALGORITHM}")
+    cached_user = verified_token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
+    if revoked_tokens.is_revoked(token):
+        logger.info("Rejected revoked token")
+        raise credentials_exception
     
     try:
         # Decode the token with verification
@@ -191,8 +280,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             options={"verify_signature": True}
         )
         
-        logger.debug(f"Successfully decoded token payload: {payload}")
-        
         email: str = payload.get("sub")
         if not email:
             logger.error("No 'sub' claim found in token")
@@ -204,8 +291,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             roles=payload.get("roles", [])
         )
         
-        logger.debug(f"Extracted token data: {token_data}")
-        
     except jwt.ExpiredSignatureError:
         logger.error("Token has expired")
         raise HTTPException(
@@ -224,11 +309,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         logger.error(f"JWT Error: {str(e)}", exc_info=True)
         raise credentials_exception
     
-    user = get_user(email=token_data.email)
+    user = await get_user_async(email=token_data.email)
     if user is None:
         raise credentials_exception
     
-    return User(
+    current_user = User(
         user_id=user.user_id,
         email=user.email,
         first_name=user.first_name,
@@ -242,6 +327,26 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         last_login=user.last_login,
         metadata=user.metadata
     )
+    verified_token_cache.put(token, current_user, payload.get("exp"))
+    return current_user
+
+def revoke_access_token(token: str) -> None:
+    """
+    Revoke a token (e.g. on logout) until it expires.
+    
+    The revocation is written to the user store, so call this off the event loop.
+    
+    Args:
+        token: The JWT token, already verified by the caller
+    """
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        expires_at = payload.get("exp")
+    except jwt.InvalidTokenError:
+        # Expired or invalid tokens are rejected anyway
+        expires_at = None
+    revoked_tokens.revoke(token, expires_at)
+    verified_token_cache.invalidate(token)
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
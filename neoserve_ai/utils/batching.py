@@ -0,0 +1,163 @@
+"""
+Batching helpers for bulk chat processing.
+
+``MicroBatcher`` coalesces concurrent single-item calls into one call of a batch
+function, so the turns of a bulk request share model round trips.
+``SingleFlightCache`` memoizes async lookups and lets concurrent callers with the
+same key share one in-flight call.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, Tuple, TypeVar
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = counter(
+    "neoserve_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"]
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items submitted by concurrent callers and processes them in batches.
+
+    A batch is dispatched once it reaches ``max_batch_size`` items or ``max_wait``
+    seconds after its first item arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            func: Coroutine processing a list of items and returning one result per item
+            max_batch_size: Maximum number of items per call of ``func``
+            max_wait: Seconds to wait for more items before dispatching a partial batch
+        """
+        self.func = func
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Submit one item and wait for its result.
+
+        Args:
+            item: The item to process
+
+        Returns:
+            The result for this item
+
+        Raises:
+            Exception: Whatever the batch function raised for the batch holding the item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            results = await self.func([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.error(f"Error processing micro-batch of {len(batch)} items: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Callers that were cancelled no longer wait for their result
+            if not future.done():
+                future.set_result(result)
+
+
+class SingleFlightCache(Generic[R]):
+    """
+    Bounded memo of async lookups with in-flight de-duplication.
+
+    Failed lookups are not cached, so the next caller retries them.
+    """
+
+    def __init__(self, max_entries: int = 1024, name: str = "single_flight"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept (least recently used are evicted)
+            name: Cache name used in metrics
+        """
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: "OrderedDict[Hashable, asyncio.Future]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[R]]) -> R:
+        """
+        Return the cached result for a key, loading it on first use.
+
+        Args:
+            key: Cache key
+            loader: Coroutine factory producing the value on a miss
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        future = self._entries.get(key)
+        if future is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            future = asyncio.ensure_future(loader())
+            self._entries[key] = future
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            self._entries.move_to_end(key)
+
+        try:
+            # Shielded so one cancelled caller does not cancel the shared lookup
+            return await asyncio.shield(future)
+        except Exception:
+            if self._entries.get(key) is future:
+                del self._entries[key]
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for logging."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
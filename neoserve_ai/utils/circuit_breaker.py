@@ -0,0 +1,269 @@
+"""
+Circuit breakers for external dependencies.
+
+Each dependency (Vertex AI, Discovery Engine, Firestore, Pub/Sub) gets a breaker that
+watches a rolling window of recent calls. When too many of them fail or are slow the
+breaker opens and callers go straight to their local fallback instead of paying for
+another timeout. After a cool-down the breaker lets a few trial calls through
+(half-open) and closes again once they succeed.
+"""
+import asyncio
+import inspect
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar, Union
+
+from .metrics import counter, gauge, histogram
+from .tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEPENDENCY_CALL_DURATION = histogram(
+    "neoserve_dependency_call_duration_seconds",
+    "Duration of calls to external dependencies",
+    ["dependency", "outcome"]
+)
+CIRCUIT_REJECTIONS = counter(
+    "neoserve_circuit_rejections_total",
+    "Calls sent straight to the local fallback because the breaker was open",
+    ["dependency"]
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a count-based rolling window.
+
+    The breaker opens when at least ``minimum_calls`` outcomes are in the window and
+    either the failure rate or the slow-call rate reaches its threshold.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 3
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Dependency name, used in logs and status output
+            window_size: Number of recent calls considered
+            minimum_calls: Calls needed in the window before the breaker can open
+            failure_rate_threshold: Fraction of failed calls that opens the breaker
+            slow_call_seconds: Latency above which a call counts as slow
+            slow_call_rate_threshold: Fraction of slow calls that opens the breaker
+            open_seconds: Cool-down before trial calls are let through
+            half_open_max_calls: Trial calls that must succeed to close the breaker
+        """
+        self.name = name
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        # (failed, slow, latency) per call
+        self._window: Deque[Tuple[bool, bool, float]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._trial_successes = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the cool-down is over."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+            self._trial_successes = 0
+            logger.info(f"Circuit '{self.name}' half-open, allowing trial calls")
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go to the dependency, reserving a trial slot if half-open.
+
+        Every allowed call must be followed by :meth:`record_success`,
+        :meth:`record_failure` or :meth:`release`.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+            self._trial_calls += 1
+            return True
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        """Record a completed call and its latency."""
+        slow = latency >= self.slow_call_seconds
+        if self._state == HALF_OPEN:
+            if slow:
+                self._trip(f"slow trial call ({latency:.2f}s)")
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_max_calls:
+                self._window.clear()
+                self._state = CLOSED
+                logger.info(f"Circuit '{self.name}' closed")
+            return
+        self._record(False, slow, latency)
+
+    def record_failure(self, latency: float) -> None:
+        """Record a failed call and its latency."""
+        if self._state == HALF_OPEN:
+            self._trip("failed trial call")
+            return
+        self._record(True, latency >= self.slow_call_seconds, latency)
+
+    def release(self) -> None:
+        """Give back a call's trial slot without recording an outcome (the call was abandoned)."""
+        if self._state == HALF_OPEN and self._trial_calls > self._trial_successes:
+            self._trial_calls -= 1
+
+    async def call(self, func: Callable[[], Union[T, Awaitable[T]]]) -> T:
+        """
+        Call a dependency through the breaker.
+
+        Args:
+            func: Zero-argument callable performing the call; may return an awaitable
+
+        Returns:
+            The call's result
+
+        Raises:
+            CircuitOpenError: If the breaker is open and the call was not attempted
+            asyncio.CancelledError: If the caller was cancelled (not recorded)
+            Exception: Whatever the call raised (recorded as a failure)
+        """
+        if not self.allow_request():
+            CIRCUIT_REJECTIONS.inc(dependency=self.name)
+            raise CircuitOpenError(self.name)
+
+        start = time.monotonic()
+        with start_span(f"dependency.{self.name}"):
+            try:
+                result = func()
+                if inspect.isawaitable(result):
+                    result = await result
+            except asyncio.CancelledError:
+                # The caller gave up (client disconnect, expired request deadline): says
+                # nothing about the dependency, so no outcome is recorded
+                self.release()
+                DEPENDENCY_CALL_DURATION.observe(
+                    time.monotonic() - start, dependency=self.name, outcome="cancelled"
+                )
+                raise
+            except Exception:
+                latency = time.monotonic() - start
+                self.record_failure(latency)
+                DEPENDENCY_CALL_DURATION.observe(latency, dependency=self.name, outcome="error")
+                raise
+        latency = time.monotonic() - start
+        self.record_success(latency)
+        DEPENDENCY_CALL_DURATION.observe(latency, dependency=self.name, outcome="ok")
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the breaker state for status endpoints."""
+        calls = len(self._window)
+        failures = sum(1 for failed, _, _ in self._window if failed)
+        slow = sum(1 for _, is_slow, _ in self._window if is_slow)
+        latencies = sorted(latency for _, _, latency in self._window)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(slow / calls, 3) if calls else 0.0,
+            "latency_p50_seconds": _percentile(latencies, 0.50),
+            "latency_p95_seconds": _percentile(latencies, 0.95),
+            "latency_p99_seconds": _percentile(latencies, 0.99),
+            "rejected_calls": self.rejected_calls,
+        }
+
+    def _record(self, failed: bool, slow: bool, latency: float) -> None:
+        self._window.append((failed, slow, latency))
+        calls = len(self._window)
+        if self._state != CLOSED or calls < self.minimum_calls:
+            return
+        failure_rate = sum(1 for f, _, _ in self._window if f) / calls
+        slow_rate = sum(1 for _, s, _ in self._window if s) / calls
+        if failure_rate >= self.failure_rate_threshold:
+            self._trip(f"failure rate {failure_rate:.0%}")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._trip(f"slow call rate {slow_rate:.0%}")
+
+    def _trip(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(f"Circuit '{self.name}' opened: {reason}")
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))], 4)
+
+
+# Per-process registry, one breaker per dependency
+_breakers: Dict[str, CircuitBreaker] = {}
+_breaker_defaults: Dict[str, Any] = {}
+
+
+def configure_circuit_breakers(**defaults: Any) -> None:
+    """
+    Set the defaults used for breakers created after this call.
+
+    Args:
+        **defaults: Keyword arguments of CircuitBreaker (window_size, open_seconds, ...)
+    """
+    _breaker_defaults.update(defaults)
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the breaker for a dependency, creating it on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, **_breaker_defaults)
+    return breaker
+
+
+def circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Return a snapshot of every breaker, keyed by dependency name."""
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
+
+
+gauge(
+    "neoserve_circuit_open",
+    "Whether the dependency's breaker is open or half-open (1) or closed (0)",
+    ["dependency"],
+    callback=lambda: {
+        (name,): float(breaker.state != CLOSED) for name, breaker in _breakers.items()
+    }
+)
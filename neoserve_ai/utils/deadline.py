@@ -0,0 +1,165 @@
+"""
+Request deadlines propagated through the agent pipeline.
+
+A chat request gets a total time budget. The deadline is stored in a context
+variable, so it follows the request into every coroutine and task it starts without
+being threaded through call signatures. Pipeline stages run with the remaining
+budget and fall back to their degraded path when it runs out; clients pass
+:func:`remaining_timeout` to the ``timeout`` argument of Google Cloud calls.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+from .metrics import counter, histogram
+from .tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Header clients may send to shorten the server-side budget (seconds)
+DEADLINE_HEADER = "X-Request-Timeout"
+
+STAGE_DURATION = histogram(
+    "neoserve_stage_duration_seconds", "Duration of orchestrator pipeline stages", ["stage"]
+)
+STAGE_FALLBACKS = counter(
+    "neoserve_stage_fallbacks_total", "Pipeline stages that fell back because the deadline expired", ["stage"]
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of calling a dependency once the request deadline has passed."""
+
+
+class Deadline:
+    """Absolute point in time by which a request must complete."""
+
+    def __init__(self, budget_seconds: float):
+        """
+        Start a deadline.
+
+        Args:
+            budget_seconds: Total time budget from now
+        """
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        # Stages that fell back to their degraded path
+        self.degraded_stages: List[str] = []
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (negative once it has passed)."""
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("neoserve_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the request being processed, if any."""
+    return _current_deadline.get()
+
+
+def remaining_timeout(default: float) -> float:
+    """
+    Timeout to pass to a client call made on behalf of the current request.
+
+    Call it before the call is made (outside circuit breakers), so a request
+    that has run out of time skips the call instead of recording it as a
+    dependency failure.
+
+    Args:
+        default: The dependency's own timeout; used when the request has no
+            deadline and never exceeded otherwise
+
+    Returns:
+        The smaller of ``default`` and the seconds left on the current deadline
+
+    Raises:
+        DeadlineExceeded: If the current deadline has already passed
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline has passed")
+    return min(remaining, default)
+
+
+@contextmanager
+def deadline_scope(budget_seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Run the enclosed code under a deadline.
+
+    A nested scope never extends an enclosing deadline: the earlier of the two wins.
+
+    Args:
+        budget_seconds: Time budget from now, or None to keep the current deadline
+
+    Yields:
+        The deadline in effect inside the scope
+    """
+    outer = _current_deadline.get()
+    if budget_seconds is None or (outer is not None and outer.remaining() <= budget_seconds):
+        yield outer
+        return
+
+    token = _current_deadline.set(Deadline(budget_seconds))
+    try:
+        yield _current_deadline.get()
+    finally:
+        _current_deadline.reset(token)
+
+
+async def run_stage(
+    stage: str,
+    awaitable: Awaitable[T],
+    fallback: Callable[[], T]
+) -> T:
+    """
+    Await a pipeline stage within the remaining budget of the current deadline.
+
+    Args:
+        stage: Stage name, used for logging and the degraded-stage record
+        awaitable: The stage's coroutine
+        fallback: Produces the degraded result when the budget runs out
+
+    Returns:
+        The stage result, or the fallback result if the deadline expired
+    """
+    start = time.monotonic()
+    with start_span(f"stage.{stage}") as span:
+        try:
+            deadline = _current_deadline.get()
+            if deadline is None:
+                return await awaitable
+
+            remaining = deadline.remaining()
+            if remaining > 0:
+                try:
+                    return await asyncio.wait_for(awaitable, remaining)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Stage '{stage}' exceeded the request deadline; using its fallback")
+            else:
+                if inspect.iscoroutine(awaitable):
+                    # Never started, so close it to avoid a "never awaited" warning
+                    awaitable.close()
+                logger.warning(f"Request deadline already expired before stage '{stage}'; using its fallback")
+
+            deadline.degraded_stages.append(stage)
+            STAGE_FALLBACKS.inc(stage=stage)
+            span.set_attribute("degraded", True)
+            return fallback()
+        finally:
+            STAGE_DURATION.observe(time.monotonic() - start, stage=stage)
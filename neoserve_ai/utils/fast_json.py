@@ -0,0 +1,71 @@
+"""
+Single-pass JSON encoding for API responses.
+
+Returning a pydantic model from an endpoint with ``response_model`` makes
+FastAPI dump the model to a dictionary, validate that dictionary against the
+model again, convert it to JSON-compatible values and finally encode it with the
+``json`` module. For payloads the service builds itself, all of that is repeated
+work. :class:`FastJSONResponse` encodes the content once with ``orjson`` when it
+is installed (plain ``json`` otherwise); endpoints that return it directly skip
+FastAPI's response validation, while ``response_model`` still documents the
+shape in the OpenAPI schema.
+"""
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # Optional dependency
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    """Encode values neither encoder handles natively (models, URLs, enums)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Args:
+        value: Dictionaries, lists, scalars, datetimes and pydantic models
+
+    Returns:
+        The encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON produced by :func:`dumps` (or any other encoder)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_str(value: Any) -> str:
+    """Encode a value as JSON text (for SSE, NDJSON and WebSocket frames)."""
+    return dumps(value).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered in one pass by :func:`dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
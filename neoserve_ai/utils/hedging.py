@@ -0,0 +1,231 @@
+"""
+Hedged requests for idempotent reads.
+
+A hedged call sends its first attempt as usual. If that attempt has not answered
+by the dependency's observed p95 latency, a second, identical attempt is sent and
+whichever answers first wins. Only a small fraction of calls are slow, so hedging
+them cuts the tail at the cost of a few percent of extra load; a token budget caps
+that extra load even when a dependency slows down as a whole.
+
+Only use this for reads that are safe to send twice (searches, predictions,
+document fetches). Attempts can only overlap if they do not block the event
+loop, so calls to synchronous clients should be wrapped in ``asyncio.to_thread``.
+"""
+import asyncio
+import inspect
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar, Union
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+HEDGES = counter("neoserve_hedges_total", "Backup attempts sent for slow reads", ["dependency"])
+HEDGE_WINS = counter("neoserve_hedge_wins_total", "Hedged reads answered by the backup attempt", ["dependency"])
+
+T = TypeVar("T")
+
+
+def _quantile(samples: Deque[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+async def _invoke(func: Callable[[], Union[T, Awaitable[T]]]) -> T:
+    result = func()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class Hedger:
+    """
+    Sends a backup attempt for calls that are slower than a latency quantile.
+
+    Every call earns ``budget_ratio`` hedge tokens (up to ``max_tokens``) and every
+    hedge spends one, so hedges never exceed roughly ``budget_ratio`` of traffic.
+    The losing attempt is not cancelled: it finishes in the background and its
+    latency feeds the window, which keeps the quantile estimate (and the reported
+    unhedged tail) unbiased.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = True,
+        quantile: float = 0.95,
+        window_size: int = 200,
+        min_samples: int = 20,
+        min_delay: float = 0.01,
+        budget_ratio: float = 0.1,
+        max_tokens: float = 10.0
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            name: Dependency name, used in logs and status output
+            enabled: Whether hedges are sent at all
+            quantile: Attempt latency quantile after which a hedge is sent
+            window_size: Number of recent latencies kept per series
+            min_samples: Attempts observed before hedging starts
+            min_delay: Lower bound for the hedge delay, in seconds
+            budget_ratio: Hedge tokens earned per call
+            max_tokens: Maximum number of banked hedge tokens
+        """
+        self.name = name
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget_ratio = budget_ratio
+        self.max_tokens = max_tokens
+
+        self._attempt_latencies: Deque[float] = deque(maxlen=window_size)
+        self._response_latencies: Deque[float] = deque(maxlen=window_size)
+        self._tokens = max_tokens
+        self._background: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while too few attempts were seen."""
+        if not self._attempt_latencies or len(self._attempt_latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, _quantile(self._attempt_latencies, self.quantile))
+
+    async def call(self, func: Callable[[], Union[T, Awaitable[T]]]) -> T:
+        """
+        Run an idempotent read, hedging it if the first attempt is slow.
+
+        Args:
+            func: Zero-argument callable performing one attempt; may return an
+                awaitable (a new one per attempt)
+
+        Returns:
+            The result of the first attempt to succeed
+
+        Raises:
+            Exception: What the last attempt raised, if every attempt failed
+        """
+        if not self.enabled:
+            return await _invoke(func)
+
+        self.calls += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget_ratio)
+        start = time.monotonic()
+        primary = self._attempt(func)
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done:
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.hedges += 1
+                    HEDGES.inc(dependency=self.name)
+                    logger.debug(f"Hedging '{self.name}' call after {delay:.3f}s")
+                    return await self._race(primary, self._attempt(func), start)
+                self.budget_exhausted += 1
+
+        try:
+            return await primary
+        finally:
+            self._response_latencies.append(time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge counters and tail latencies for status endpoints."""
+        attempt_p99 = _quantile(self._attempt_latencies, 0.99)
+        response_p99 = _quantile(self._response_latencies, 0.99)
+        delay = self.hedge_delay()
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+            "budget_exhausted": self.budget_exhausted,
+            "hedge_delay_seconds": round(delay, 4) if delay is not None else None,
+            "unhedged_p99_seconds": round(attempt_p99, 4) if attempt_p99 is not None else None,
+            "p99_seconds": round(response_p99, 4) if response_p99 is not None else None,
+            "p99_improvement_seconds": (
+                round(attempt_p99 - response_p99, 4)
+                if attempt_p99 is not None and response_p99 is not None else None
+            ),
+        }
+
+    def _attempt(self, func: Callable[[], Union[T, Awaitable[T]]]) -> "asyncio.Task[T]":
+        start = time.monotonic()
+        task = asyncio.ensure_future(_invoke(func))
+
+        def _record(done: asyncio.Future) -> None:
+            self._background.discard(done)
+            if not done.cancelled() and done.exception() is None:
+                self._attempt_latencies.append(time.monotonic() - start)
+
+        self._background.add(task)
+        task.add_done_callback(_record)
+        return task
+
+    async def _race(self, primary: asyncio.Task, hedge: asyncio.Task, start: float) -> Any:
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                            HEDGE_WINS.inc(dependency=self.name)
+                        return task.result()
+                    error = task.exception()
+            if error is None:
+                raise asyncio.CancelledError()
+            raise error
+        except asyncio.CancelledError:
+            # The caller gave up, so neither attempt is needed any more
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            self._response_latencies.append(time.monotonic() - start)
+
+
+# Per-process registry, one hedger per dependency
+_hedgers: Dict[str, Hedger] = {}
+_hedger_defaults: Dict[str, Any] = {"enabled": False}
+
+
+def configure_hedging(**defaults: Any) -> None:
+    """
+    Set the defaults used for hedgers created after this call.
+
+    Hedging is opt-in: hedgers are created disabled unless ``enabled=True`` is set.
+
+    Args:
+        **defaults: Keyword arguments of Hedger (enabled, quantile, budget_ratio, ...)
+    """
+    _hedger_defaults.update(defaults)
+
+
+def get_hedger(name: str) -> Hedger:
+    """Return the hedger for a dependency, creating it on first use."""
+    hedger = _hedgers.get(name)
+    if hedger is None:
+        hedger = _hedgers[name] = Hedger(name, **_hedger_defaults)
+    return hedger
+
+
+def hedging_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the stats of every hedger, keyed by dependency name."""
+    return {name: hedger.stats() for name, hedger in sorted(_hedgers.items())}
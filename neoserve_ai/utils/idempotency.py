@@ -0,0 +1,153 @@
+"""
+Idempotency cache for client-retried requests.
+
+Clients that retry on flaky networks send the same ``message_id`` again. The cache
+remembers the result of the first request for each key for a limited window, answers
+retries from memory and lets duplicates that arrive while the first request is still
+running wait for it instead of running the request a second time.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = counter(
+    "neoserve_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"]
+)
+
+R = TypeVar("R")
+
+
+class IdempotencyCache(Generic[R]):
+    """
+    Per-process cache of request results keyed by an idempotency key.
+
+    Entries hold an asyncio future, so in-flight and completed requests are looked
+    up the same way. Failed requests are forgotten so a retry runs them again.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a completed result answers retries
+            max_entries: Maximum number of remembered keys (oldest completed are evicted first)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._expire()
+        return key in self._entries
+
+    async def run(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[R]],
+        cacheable: Optional[Callable[[R], bool]] = None
+    ) -> Tuple[R, bool]:
+        """
+        Run a request once per key, answering duplicates with the first result.
+
+        Args:
+            key: Idempotency key of the request
+            factory: Coroutine factory that performs the request
+            cacheable: Optional predicate; results it rejects are returned but not
+                kept for later retries
+
+        Returns:
+            Tuple of (result, replayed) where ``replayed`` is True if the result
+            came from an earlier or concurrent request with the same key
+
+        Raises:
+            Exception: Whatever the request raised; failed requests are not cached
+        """
+        future, replayed = self.start(key, factory, cacheable)
+        # Shielded so a retry that gives up does not cancel the original request, and
+        # if the first caller goes away, the request still completes for its retries
+        return await asyncio.shield(future), replayed
+
+    def start(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[R]],
+        cacheable: Optional[Callable[[R], bool]] = None
+    ) -> Tuple["asyncio.Future[R]", bool]:
+        """
+        Start a request unless one with the same key is remembered, without waiting for it.
+
+        Args:
+            key: Idempotency key of the request
+            factory: Coroutine factory that performs the request
+            cacheable: Optional predicate; results it rejects are not kept for later retries
+
+        Returns:
+            Tuple of (future of the result, replayed) where ``replayed`` is True if
+            the future belongs to an earlier or concurrent request with the same key
+        """
+        self._expire()
+        entry = self._entries.get(key)
+        if entry is not None:
+            CACHE_REQUESTS.inc(cache="idempotency", result="hit")
+            return entry[1], True
+
+        CACHE_REQUESTS.inc(cache="idempotency", result="miss")
+        future = asyncio.ensure_future(factory())
+        self._entries[key] = (time.monotonic(), future)
+        future.add_done_callback(lambda done: self._on_done(key, done, cacheable))
+        self._evict()
+        return future, False
+
+    def _on_done(
+        self,
+        key: Hashable,
+        future: asyncio.Future,
+        cacheable: Optional[Callable[[R], bool]]
+    ) -> None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] is not future:
+            return
+        if (
+            future.cancelled()
+            or future.exception() is not None
+            or (cacheable is not None and not cacheable(future.result()))
+        ):
+            del self._entries[key]
+            return
+        # The retry window starts when the result is available
+        self._entries[key] = (time.monotonic(), future)
+        self._entries.move_to_end(key)
+
+    def _evict(self) -> None:
+        # Oldest completed entries go first. In-flight requests are kept even over
+        # the limit: forgetting one would let its retry run the request a second time.
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        victims = []
+        for key, (_, future) in self._entries.items():
+            if len(victims) >= excess:
+                break
+            if future.done():
+                victims.append(key)
+        for key in victims:
+            del self._entries[key]
+
+    def _expire(self) -> None:
+        # Entries are ordered by completion time, so expired ones are at the front
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            stored_at, future = next(iter(self._entries.values()))
+            if stored_at >= cutoff or not future.done():
+                break
+            self._entries.popitem(last=False)
@@ -0,0 +1,136 @@
+"""
+Import-time profile of the application.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+turns its output into a table of the slowest imports and of the time spent per
+top-level package, to check what a worker loads at boot.
+
+Usage:
+    python -m neoserve_ai.utils.import_profile [module] [--top 25]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+# "import time:       361 |     186755 |                 starlette.concurrency"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportTiming(NamedTuple):
+    """Time spent importing one module, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parse the stderr of ``python -X importtime``.
+
+    Args:
+        output: Text written by the interpreter
+
+    Returns:
+        One entry per imported module, in import order
+    """
+    timings: List[ImportTiming] = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # Nesting is shown as two spaces per level after one separator space
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def profile_imports(module: str, python: Optional[str] = None) -> List[ImportTiming]:
+    """
+    Import a module in a new interpreter and collect its import timings.
+
+    Args:
+        module: Module to import (e.g. 'neoserve_ai.main')
+        python: Interpreter to run (default: the current one)
+
+    Returns:
+        Import timings of the module and everything it imported
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """
+    Sum the self time of imports per top-level package.
+
+    Args:
+        timings: Parsed import timings
+
+    Returns:
+        Microseconds per package, slowest first
+    """
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split(".")[0]] += timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(timings: List[ImportTiming], top: int = 25) -> str:
+    """
+    Format the slowest imports and the per-package totals as text tables.
+
+    Args:
+        timings: Parsed import timings
+        top: Number of rows per table
+
+    Returns:
+        The report
+    """
+    total_us = sum(t.self_us for t in timings)
+    lines = [f"Total import time: {total_us / 1000:.1f} ms over {len(timings)} modules", ""]
+
+    lines.append(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(
+            f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  "
+            f"{'  ' * timing.depth}{timing.module}"
+        )
+
+    lines.extend(["", f"{'self ms':>9} {'share':>6}  package"])
+    for package, self_us in list(by_package(timings).items())[:top]:
+        share = self_us / total_us if total_us else 0.0
+        lines.append(f"{self_us / 1000:>9.1f} {share:>6.1%}  {package}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """Print the import-time report; returns the process exit code."""
+    parser = argparse.ArgumentParser(description="Profile the import time of a module")
+    parser.add_argument("module", nargs="?", default="neoserve_ai.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    args = parser.parse_args(argv)
+
+    try:
+        timings = profile_imports(args.module)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(format_report(timings, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Asynchronous, sampled logging pipeline.
+
+Log calls on the request path only filter, trim and enqueue their record; a
+background listener thread does the formatting (including JSON payloads of
+:mod:`vertex_ai_logger`) and the I/O through the handlers that were configured
+before. The queue is bounded: when it is full, records are dropped and counted
+rather than blocking the event loop.
+
+Records below WARNING can be sampled per category (logger name prefix), and
+long messages and payload fields are truncated before they are queued.
+"""
+import copy
+import json
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterable, List, Optional
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+LOG_RECORDS_DROPPED = counter(
+    "neoserve_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+LOG_RECORDS_SAMPLED_OUT = counter(
+    "neoserve_log_records_sampled_out_total", "Log records skipped by sampling", ["category"]
+)
+
+# Record attributes (passed via ``extra``) that may carry user or model payloads
+PAYLOAD_FIELDS = ("prompt", "message", "message_preview", "response", "instances")
+
+
+class LazyJson:
+    """
+    Log argument serialized to JSON only when the record is formatted.
+
+    Use as ``logger.info("%s", LazyJson(data))``: the dump is skipped for records
+    that are filtered out, and happens on the listener thread otherwise.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, default=str)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    Parse sampling rates from a setting such as ``"vertex_ai=0.1,neoserve_ai.agents=0.5"``.
+
+    Args:
+        value: Comma-separated ``category=rate`` pairs
+
+    Returns:
+        Mapping of logger name prefix to the fraction of records kept
+    """
+    rates: Dict[str, float] = {}
+    for pair in value.split(","):
+        if "=" not in pair:
+            continue
+        category, rate = pair.split("=", 1)
+        try:
+            rates[category.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            logger.warning(f"Ignoring invalid log sample rate: {pair.strip()}")
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records below WARNING for each category."""
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Initialize the filter.
+
+        Args:
+            rates: Mapping of logger name prefix to the fraction of records kept;
+                the longest matching prefix wins
+        """
+        super().__init__()
+        # Longest prefix first so the most specific category wins
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for category, rate in self.rates:
+            if record.name == category or record.name.startswith(category + "."):
+                if rate >= 1.0 or random.random() < rate:
+                    return True
+                LOG_RECORDS_SAMPLED_OUT.inc(category=category)
+                return False
+        return True
+
+
+def _truncate(value: str, limit: int) -> str:
+    if len(value) <= limit:
+        return value
+    return f"{value[:limit]}... [truncated {len(value) - limit} chars]"
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that trims records and drops them when the queue is full."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]", max_message_chars: int = 2000):
+        """
+        Initialize the handler.
+
+        Args:
+            log_queue: Bounded queue read by the listener thread
+            max_message_chars: Longest message or payload field kept per record
+        """
+        super().__init__(log_queue)
+        self.max_message_chars = max_message_chars
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, leave formatting to the listener thread.
+        # Messages with ordinary args are resolved now so later mutation of the
+        # args cannot change them; LazyJson args are left for the listener.
+        # The record is copied because other handlers may still see the original.
+        record = copy.copy(record)
+        if record.args and not all(isinstance(arg, LazyJson) for arg in record.args):
+            record.msg = record.getMessage()
+            record.args = None
+        if isinstance(record.msg, str) and len(record.msg) > self.max_message_chars:
+            record.msg = _truncate(record.msg, self.max_message_chars)
+        for field in PAYLOAD_FIELDS:
+            value = record.__dict__.get(field)
+            if isinstance(value, str) and len(value) > self.max_message_chars:
+                record.__dict__[field] = _truncate(value, self.max_message_chars)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class LoggingPipeline:
+    """Moves the handlers of a set of loggers behind bounded queues and listener threads."""
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        sample_rates: Optional[Dict[str, float]] = None,
+        max_message_chars: int = 2000
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            queue_size: Maximum number of records waiting to be written
+            sample_rates: Fraction of records below WARNING kept per category
+            max_message_chars: Longest message or payload field kept per record
+        """
+        self.queue_size = queue_size
+        self.sample_rates = sample_rates or {}
+        self.max_message_chars = max_message_chars
+        self._installed: List[tuple] = []
+
+    def install(self, loggers: Iterable[logging.Logger]) -> None:
+        """
+        Route the given loggers through the pipeline.
+
+        Each logger's current handlers move to a listener thread; the logger keeps
+        a single queue handler. Loggers without handlers are left alone.
+        """
+        for target in loggers:
+            handlers = [h for h in target.handlers if not isinstance(h, QueueHandler)]
+            if not handlers:
+                continue
+            log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=self.queue_size)
+            queue_handler = BoundedQueueHandler(log_queue, self.max_message_chars)
+            if self.sample_rates:
+                queue_handler.addFilter(SamplingFilter(self.sample_rates))
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            for handler in handlers:
+                target.removeHandler(handler)
+            target.addHandler(queue_handler)
+            listener.start()
+            self._installed.append((target, queue_handler, listener, handlers))
+
+    def stop(self) -> None:
+        """Flush queued records and restore the original handlers."""
+        while self._installed:
+            target, queue_handler, listener, handlers = self._installed.pop()
+            listener.stop()
+            target.removeHandler(queue_handler)
+            for handler in handlers:
+                target.addHandler(handler)
+
+
+def configure_logging_pipeline(
+    queue_size: int = 10000,
+    sample_rates: Optional[Dict[str, float]] = None,
+    max_message_chars: int = 2000,
+    logger_names: Iterable[Optional[str]] = (None, "vertex_ai")
+) -> LoggingPipeline:
+    """
+    Route the root logger (and other loggers with their own handlers) through a queue.
+
+    Args:
+        queue_size: Maximum number of records waiting to be written per logger
+        sample_rates: Fraction of records below WARNING kept per category
+        max_message_chars: Longest message or payload field kept per record
+        logger_names: Loggers to route; None is the root logger
+
+    Returns:
+        The installed pipeline; call ``stop()`` at shutdown to flush it
+    """
+    pipeline = LoggingPipeline(queue_size, sample_rates, max_message_chars)
+    pipeline.install(logging.getLogger(name) for name in logger_names)
+    return pipeline
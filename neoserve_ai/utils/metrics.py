@@ -0,0 +1,252 @@
+"""
+In-process metrics exported in the Prometheus text format.
+
+Modules declare their metrics once at import time with :func:`counter`,
+:func:`gauge` and :func:`histogram` and update them on the hot path; ``/metrics``
+renders the whole registry with :func:`render_prometheus`. Updates are plain
+dictionary operations, so instrumenting a call costs well under a microsecond.
+Gauges may be backed by a callback that is read at scrape time, which avoids
+keeping a second copy of state such as queue depths.
+"""
+import bisect
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Prometheus text exposition format (the framework appends the charset)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Latency buckets in seconds, from a cache hit to a request that ran out of budget
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelValues = Tuple[str, ...]
+GaugeCallback = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return f"{int(value)}"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        try:
+            return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError as e:
+            raise ValueError(f"Metric '{self.name}' requires label {e}") from None
+
+    def _labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter for the given label values."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for the given label values."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        if not self._values and not self.labelnames:
+            yield f"{self.name} 0"
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[GaugeCallback] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge for the given label values."""
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the gauge for the given label values."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Decrease the gauge for the given label values."""
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[str]:
+        values = self._values
+        if self.callback is not None:
+            try:
+                result = self.callback()
+            except Exception as e:
+                logger.error(f"Error reading gauge {self.name}: {str(e)}")
+                return
+            values = result if isinstance(result, dict) else {(): float(result)}
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for the given label values."""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        """Number of observations for the given label values."""
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = ("le", _format_value(bound) if math.isinf(bound) else repr(float(bound)))
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total[0])}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric, or return the existing one with the same name.
+
+        Raises:
+            ValueError: If a metric of another type is registered under the name
+        """
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric '{metric.name}' is already registered differently")
+            if isinstance(metric, Gauge) and metric.callback is not None:
+                existing.callback = metric.callback
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        return "\n".join(metric.render() for _, metric in sorted(self._metrics.items())) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Declare (or look up) a counter in the process registry."""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    callback: Optional[GaugeCallback] = None
+) -> Gauge:
+    """
+    Declare (or look up) a gauge in the process registry.
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Label names of the gauge
+        callback: Optional function read at scrape time; returns a value, or a dict
+            from label value tuples to values for labelled gauges
+    """
+    return REGISTRY.register(Gauge(name, documentation, labelnames, callback))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+) -> Histogram:
+    """Declare (or look up) a histogram in the process registry."""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_prometheus() -> str:
+    """Render the process registry for the ``/metrics`` endpoint."""
+    return REGISTRY.render()
@@ -0,0 +1,77 @@
+"""
+Keyset cursors and entity tags for paginated endpoints.
+
+A cursor is the position of the last item a client has seen, encoded as an
+opaque URL-safe token. Unlike an offset, it keeps pointing at the same place
+when items are added, and the store can seek to it through an index instead of
+skipping rows. Entity tags let polling clients send ``If-None-Match`` and get
+an empty 304 response while the page has not changed.
+"""
+import base64
+import binascii
+import hashlib
+from typing import Any, Optional, Tuple
+
+from .fast_json import dumps, loads
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(key: Tuple[Any, ...]) -> str:
+    """
+    Encode a position as an opaque cursor.
+
+    Args:
+        key: The position (JSON-serializable values)
+
+    Returns:
+        The cursor
+    """
+    return base64.urlsafe_b64encode(dumps([CURSOR_VERSION, *key])).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Args:
+        cursor: The cursor
+        size: Number of values the position must have
+
+    Returns:
+        The position
+
+    Raises:
+        ValueError: If the cursor is malformed or from another version
+    """
+    try:
+        data = loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(data, list) or len(data) != size + 1 or data[0] != CURSOR_VERSION:
+        raise ValueError("Malformed cursor")
+    return tuple(data[1:])
+
+
+def compute_etag(body: bytes) -> str:
+    """Weak entity tag of a response body."""
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an ``If-None-Match`` header matches an entity tag.
+
+    Comparison is weak (the ``W/`` prefix is ignored), as RFC 9110 requires
+    for ``If-None-Match``.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
@@ -0,0 +1,96 @@
+"""
+Password hashing off the event loop.
+
+A bcrypt hash or verification takes a few hundred milliseconds of CPU. Run on
+the event loop, a burst of logins stalls every chat turn on the worker. The
+:class:`PasswordHasher` runs them on a small thread pool instead (bcrypt
+releases the GIL while it works) and caps the number of operations waiting for
+it: beyond ``max_pending`` new requests are rejected at once with
+:class:`~neoserve_ai.utils.admission.Overloaded`, which the API turns into 503
+with a Retry-After hint.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .admission import Overloaded
+from .metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PASSWORD_HASH_REJECTIONS = counter(
+    "neoserve_password_hash_rejections_total", "Password hash/verify requests rejected because the pool was full"
+)
+PASSWORD_HASH_DURATION = histogram(
+    "neoserve_password_hash_duration_seconds",
+    "Time from submitting a password hash/verify request to its result",
+    ["operation"]
+)
+
+
+class PasswordHasher:
+    """Runs password hashing and verification on a bounded thread pool."""
+
+    def __init__(self, context: Any, max_workers: int = 2, max_pending: int = 32, retry_after: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            context: passlib ``CryptContext`` (anything with ``hash`` and ``verify``)
+            max_workers: Threads hashing concurrently
+            max_pending: Operations running or queued before new ones are rejected
+            retry_after: Seconds clients are told to wait when rejected
+        """
+        self.context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so a preloading gunicorn master forks no threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            PASSWORD_HASH_REJECTIONS.inc()
+            raise Overloaded(self.retry_after, "Too many concurrent authentication requests")
+        self.pending += 1
+        start = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+            PASSWORD_HASH_DURATION.observe(time.monotonic() - start, operation=operation)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password on the pool.
+
+        Raises:
+            Overloaded: If too many operations are already pending
+        """
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Verify a password against a hash on the pool.
+
+        Raises:
+            Overloaded: If too many operations are already pending
+        """
+        return await self._run("verify", self.context.verify, password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the pool's threads once the running operations finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
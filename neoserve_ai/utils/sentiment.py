@@ -0,0 +1,235 @@
+"""
+Lexicon-based sentiment scoring for customer messages.
+
+Messages are tokenized (words, emoji and emoticons) and scored against a weighted
+lexicon with negation and intensifier handling, in the spirit of VADER. The lexicon
+is compiled into a single hash map at construction time, so scoring a message is a
+regex scan plus one dictionary lookup per token. ``score_batch`` scores many messages
+at once with NumPy for offline replay and produces the same scores as ``score``.
+"""
+import math
+import re
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Valence of sentiment-bearing terms, roughly on VADER's -4..+4 scale
+DEFAULT_LEXICON: Dict[str, float] = {
+    # Negative
+    "angry": -2.4, "annoyed": -1.8, "annoying": -1.9, "awful": -3.0, "bad": -2.5,
+    "broken": -1.8, "disappointed": -2.2, "disappointing": -2.2, "disgusted": -2.8,
+    "fail": -2.0, "failed": -2.0, "fails": -2.0, "failure": -2.3, "frustrated": -2.2,
+    "frustrating": -2.3, "furious": -3.1, "garbage": -2.6, "hate": -2.9, "hated": -2.9,
+    "horrible": -3.0, "incompetent": -2.5, "joke": -1.2, "lied": -2.4, "lousy": -2.5,
+    "mad": -2.2, "mess": -1.8, "miserable": -2.9, "nightmare": -2.9, "pathetic": -2.8,
+    "poor": -2.0, "rage": -2.9, "ridiculous": -2.1, "rip-off": -2.7, "rubbish": -2.4,
+    "scam": -2.9, "stupid": -2.4, "sucks": -2.4, "terrible": -3.0, "unacceptable": -2.6,
+    "unhappy": -2.1, "upset": -2.2, "useless": -2.4, "waste": -2.0, "wasted": -2.1,
+    "worse": -2.1, "worst": -3.1, "wrong": -2.0,
+    # Positive
+    "amazing": 2.8, "appreciate": 2.0, "awesome": 3.1, "excellent": 3.2, "fantastic": 3.0,
+    "fine": 0.8, "glad": 2.0, "good": 1.9, "great": 3.1, "happy": 2.7, "helpful": 1.9,
+    "love": 3.2, "nice": 1.8, "perfect": 2.7, "pleased": 2.2, "resolved": 1.2,
+    "satisfied": 1.8, "thank": 1.5, "thanks": 1.9, "wonderful": 2.7, "works": 0.8,
+    # Emoticons
+    ":(": -1.9, ":-(": -1.9, ";(": -1.9, ":)": 2.0, ":-)": 2.0, ";)": 1.5, ":d": 2.3,
+}
+
+DEFAULT_EMOJI: Dict[str, float] = {
+    "\U0001F620": -2.8,  # angry face
+    "\U0001F621": -3.0,  # pouting face
+    "\U0001F92C": -3.2,  # face with symbols on mouth
+    "\U0001F61E": -2.0,  # disappointed face
+    "\U0001F622": -2.0,  # crying face
+    "\U0001F62D": -2.3,  # loudly crying face
+    "\U0001F612": -1.6,  # unamused face
+    "\U0001F624": -2.0,  # face with steam from nose
+    "\U0001F44E": -1.8,  # thumbs down
+    "\U0001F642": 1.5,   # slightly smiling face
+    "\U0001F600": 2.0,   # grinning face
+    "\U0001F60A": 2.2,   # smiling face with smiling eyes
+    "\U0001F60D": 2.8,   # smiling face with heart-eyes
+    "\U0001F44D": 1.8,   # thumbs up
+    "\U0001F64F": 1.2,   # folded hands
+    "❤": 2.6,       # red heart
+}
+
+NEGATORS = frozenset({
+    "not", "no", "never", "none", "nothing", "neither", "nor", "cannot", "cant", "can't",
+    "dont", "don't", "doesnt", "doesn't", "didnt", "didn't", "isnt", "isn't", "wasnt",
+    "wasn't", "arent", "aren't", "wont", "won't", "wouldnt", "wouldn't", "hardly",
+})
+
+# Multipliers applied to the term that immediately follows the intensifier
+INTENSIFIERS: Dict[str, float] = {
+    "absolutely": 1.4, "completely": 1.4, "extremely": 1.5, "incredibly": 1.5,
+    "really": 1.3, "so": 1.3, "super": 1.3, "too": 1.2, "totally": 1.4, "very": 1.3,
+    "utterly": 1.5, "barely": 0.7, "kinda": 0.8, "slightly": 0.7, "somewhat": 0.8,
+}
+
+# A negated term flips and dampens its valence
+NEGATION_SCALAR = -0.74
+# How many preceding tokens a negator reaches
+NEGATION_WINDOW = 3
+# Each exclamation mark (up to the cap) adds emphasis in the direction of the score
+EXCLAMATION_BOOST = 0.292
+MAX_EXCLAMATIONS = 4
+# Normalization constant mapping the raw sum into (-1, 1)
+NORMALIZATION_ALPHA = 15.0
+
+TOKEN_PATTERN = re.compile(
+    r"[a-z]+(?:['-][a-z]+)*"          # words, contractions, hyphenated words
+    r"|[:;]-?[()dp]"                  # emoticons
+    r"|[\U0001F300-\U0001FAFF☀-➿]"  # emoji
+)
+
+
+class _Term(NamedTuple):
+    valence: float
+    intensity: float
+    negator: bool
+
+
+class LexiconSentimentScorer:
+    """
+    Tokenized, lexicon-weighted sentiment scorer.
+
+    Scores are in (-1, 1): negative values indicate negative sentiment.
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Mapping[str, float]] = None,
+        emoji: Optional[Mapping[str, float]] = None,
+        negators: Optional[Iterable[str]] = None,
+        intensifiers: Optional[Mapping[str, float]] = None
+    ):
+        """
+        Compile the lexicon into a single term lookup table.
+
+        Args:
+            lexicon: Word and emoticon valences (defaults to DEFAULT_LEXICON)
+            emoji: Emoji valences (defaults to DEFAULT_EMOJI)
+            negators: Words that negate the following terms (defaults to NEGATORS)
+            intensifiers: Word multipliers for the following term (defaults to INTENSIFIERS)
+        """
+        terms: Dict[str, _Term] = {}
+        for word in (NEGATORS if negators is None else negators):
+            terms[word.lower()] = _Term(0.0, 1.0, True)
+        for word, multiplier in (INTENSIFIERS if intensifiers is None else intensifiers).items():
+            terms[word.lower()] = _Term(0.0, multiplier, False)
+        for source in (DEFAULT_LEXICON if lexicon is None else lexicon,
+                       DEFAULT_EMOJI if emoji is None else emoji):
+            for term, valence in source.items():
+                terms[term.lower()] = _Term(valence, 1.0, False)
+        self._terms = terms
+
+        # Parallel arrays for batch scoring; index 0 is the neutral unknown term
+        self._term_ids: Dict[str, int] = {term: i + 1 for i, term in enumerate(terms)}
+        values = list(terms.values())
+        self._valences = np.array([0.0] + [t.valence for t in values], dtype=np.float64)
+        self._intensities = np.array([1.0] + [t.intensity for t in values], dtype=np.float64)
+        self._negators = np.array([False] + [t.negator for t in values], dtype=bool)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split a message into lowercase words, emoticons and emoji."""
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def score(self, text: str) -> float:
+        """
+        Score the sentiment of a single message.
+
+        Args:
+            text: The message text
+
+        Returns:
+            Compound sentiment score in (-1, 1)
+        """
+        if not text:
+            return 0.0
+
+        terms = self._terms
+        total = 0.0
+        previous_intensity = 1.0
+        last_negator = -NEGATION_WINDOW - 1
+        for position, token in enumerate(self.tokenize(text)):
+            term = terms.get(token)
+            if term is None:
+                previous_intensity = 1.0
+                continue
+            if term.valence:
+                valence = term.valence * previous_intensity
+                if position - last_negator <= NEGATION_WINDOW:
+                    valence *= NEGATION_SCALAR
+                total += valence
+            if term.negator:
+                last_negator = position
+            previous_intensity = term.intensity
+
+        exclamations = min(text.count("!"), MAX_EXCLAMATIONS)
+        if total and exclamations:
+            total += math.copysign(exclamations * EXCLAMATION_BOOST, total)
+
+        return total / math.sqrt(total * total + NORMALIZATION_ALPHA)
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Score many messages at once.
+
+        Tokens of all messages are flattened into one array and the negation,
+        intensifier and per-message aggregation steps run as NumPy operations.
+
+        Args:
+            texts: Message texts
+
+        Returns:
+            Array of compound sentiment scores, one per message
+        """
+        count = len(texts)
+        if count == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        term_ids = self._term_ids
+        ids: List[int] = []
+        lengths = np.empty(count, dtype=np.int64)
+        for i, text in enumerate(texts):
+            tokens = self.tokenize(text) if text else []
+            ids.extend(term_ids.get(token, 0) for token in tokens)
+            lengths[i] = len(tokens)
+
+        token_ids = np.asarray(ids, dtype=np.int64)
+        message_index = np.repeat(np.arange(count), lengths)
+
+        valences = self._valences[token_ids]
+        if token_ids.size > 1:
+            intensities = self._intensities[token_ids]
+            negators = self._negators[token_ids]
+
+            # Intensifier of the previous token within the same message
+            multiplier = np.ones_like(valences)
+            same_message = message_index[1:] == message_index[:-1]
+            multiplier[1:] = np.where(same_message, intensities[:-1], 1.0)
+
+            # Any negator among the previous NEGATION_WINDOW tokens of the same message
+            negated = np.zeros(token_ids.size, dtype=bool)
+            for offset in range(1, min(NEGATION_WINDOW, token_ids.size - 1) + 1):
+                negated[offset:] |= negators[:-offset] & (
+                    message_index[offset:] == message_index[:-offset]
+                )
+
+            valences = valences * multiplier * np.where(negated, NEGATION_SCALAR, 1.0)
+
+        totals = np.bincount(message_index, weights=valences, minlength=count)
+
+        exclamations = np.minimum(
+            np.fromiter((text.count("!") if text else 0 for text in texts), dtype=np.float64, count=count),
+            MAX_EXCLAMATIONS
+        )
+        totals = totals + np.sign(totals) * exclamations * EXCLAMATION_BOOST
+
+        return totals / np.sqrt(totals * totals + NORMALIZATION_ALPHA)
+
+
+# Shared scorer instance; the compiled lexicon is immutable after construction
+sentiment_scorer = LexiconSentimentScorer()
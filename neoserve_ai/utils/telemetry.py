@@ -0,0 +1,189 @@
+"""
+Batched telemetry sink for Vertex AI calls.
+
+Model-call and prediction records (latency, payload size, status, endpoint) are
+buffered in memory and written in batches by a background thread, one file per
+batch, so the request path only appends a dictionary to a list. Files are Parquet
+when ``pyarrow`` is installed and gzip-compressed NDJSON otherwise; the oldest
+files are deleted once ``max_files`` is exceeded.
+
+Summarize the files with ``python -m neoserve_ai.utils.telemetry_report``.
+"""
+import gzip
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401  (used by pandas.DataFrame.to_parquet)
+    PARQUET_AVAILABLE = True
+except ImportError:  # Optional dependency
+    PARQUET_AVAILABLE = False
+
+FILE_PREFIX = "vertex_calls"
+
+
+class TelemetrySink:
+    """Buffers call records and writes them to rotating local files."""
+
+    def __init__(
+        self,
+        directory: str,
+        flush_interval: float = 30.0,
+        batch_size: int = 500,
+        max_buffer: int = 50000,
+        max_files: int = 200,
+        file_format: str = "auto"
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            directory: Directory the batch files are written to
+            flush_interval: Seconds between background flushes
+            batch_size: Buffered records that trigger an early flush
+            max_buffer: Records kept when writing falls behind (oldest are dropped)
+            max_files: Batch files kept before the oldest are deleted
+            file_format: 'parquet', 'ndjson' or 'auto' (Parquet when pyarrow is installed)
+        """
+        if file_format == "auto":
+            file_format = "parquet" if PARQUET_AVAILABLE else "ndjson"
+        elif file_format == "parquet" and not PARQUET_AVAILABLE:
+            logger.warning("pyarrow is not installed; writing telemetry as compressed NDJSON")
+            file_format = "ndjson"
+
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.max_files = max_files
+        self.file_format = file_format
+        self.dropped = 0
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is still buffered."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def record(
+        self,
+        kind: str,
+        model: str,
+        latency_seconds: Optional[float],
+        status: str,
+        endpoint: Optional[str] = None,
+        payload_bytes: int = 0,
+        response_bytes: int = 0,
+        error_type: Optional[str] = None
+    ) -> None:
+        """
+        Buffer one call record.
+
+        Args:
+            kind: 'model_call' or 'prediction'
+            model: Model or agent name
+            latency_seconds: Duration of the call, if measured
+            status: 'success' or 'error'
+            endpoint: Endpoint resource name
+            payload_bytes: Size of the request payload
+            response_bytes: Size of the response
+            error_type: Exception class name for failed calls
+        """
+        entry = {
+            "timestamp": time.time(),
+            "kind": kind,
+            "model": model,
+            "endpoint": endpoint,
+            "status": status,
+            "error_type": error_type,
+            "latency_ms": round(latency_seconds * 1000, 3) if latency_seconds is not None else None,
+            "payload_bytes": payload_bytes,
+            "response_bytes": response_bytes,
+        }
+        with self._lock:
+            self._buffer.append(entry)
+            if len(self._buffer) > self.max_buffer:
+                overflow = len(self._buffer) - self.max_buffer
+                del self._buffer[:overflow]
+                self.dropped += overflow
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> Optional[str]:
+        """
+        Write buffered records to a new batch file.
+
+        Returns:
+            Path of the written file, or None if nothing was buffered
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return None
+
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        extension = "parquet" if self.file_format == "parquet" else "ndjson.gz"
+        path = os.path.join(
+            self.directory, f"{FILE_PREFIX}-{stamp}-{os.getpid()}-{next(self._sequence):06d}.{extension}"
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if self.file_format == "parquet":
+                import pandas as pd
+                pd.DataFrame.from_records(batch).to_parquet(path, index=False)
+            else:
+                with gzip.open(path, "wt", encoding="utf-8") as f:
+                    for entry in batch:
+                        f.write(json.dumps(entry))
+                        f.write("\n")
+        except Exception as e:
+            logger.error(f"Error writing telemetry batch of {len(batch)} records: {str(e)}")
+            return None
+
+        self._rotate()
+        return path
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def _rotate(self) -> None:
+        files = sorted(
+            name for name in os.listdir(self.directory) if name.startswith(FILE_PREFIX + "-")
+        )
+        for name in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                logger.warning(f"Could not remove old telemetry file {name}: {str(e)}")
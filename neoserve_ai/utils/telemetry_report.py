@@ -0,0 +1,92 @@
+"""
+Summarize Vertex AI call telemetry written by :mod:`neoserve_ai.utils.telemetry`.
+
+Usage:
+    python -m neoserve_ai.utils.telemetry_report [--dir telemetry] [--by model|hour|both]
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import List
+
+import pandas as pd
+
+from neoserve_ai.utils.telemetry import FILE_PREFIX
+
+
+def load_telemetry(directory: str) -> pd.DataFrame:
+    """
+    Load every telemetry batch file in a directory.
+
+    Args:
+        directory: Directory the telemetry sink writes to
+
+    Returns:
+        One row per recorded call, with ``timestamp`` as a UTC datetime
+    """
+    frames: List[pd.DataFrame] = []
+    for path in sorted(glob.glob(os.path.join(directory, f"{FILE_PREFIX}-*"))):
+        if path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path))
+        elif path.endswith(".ndjson.gz"):
+            frames.append(pd.read_json(path, lines=True, compression="gzip"))
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+    return df
+
+
+def summarize(df: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """
+    Compute call counts, error rate, payload size and latency percentiles per group.
+
+    Args:
+        df: Telemetry rows from :func:`load_telemetry`
+        by: Grouping columns ('model', 'hour')
+
+    Returns:
+        One row per group
+    """
+    df = df.assign(
+        hour=df["timestamp"].dt.floor("h"),
+        is_error=df["status"] == "error",
+    )
+    grouped = df.groupby(by)
+    summary = pd.DataFrame({
+        "calls": grouped.size(),
+        "error_rate": grouped["is_error"].mean().round(4),
+        "payload_bytes_mean": grouped["payload_bytes"].mean().round(1),
+        "p50_ms": grouped["latency_ms"].quantile(0.50),
+        "p95_ms": grouped["latency_ms"].quantile(0.95),
+        "p99_ms": grouped["latency_ms"].quantile(0.99),
+    })
+    return summary.round({"p50_ms": 1, "p95_ms": 1, "p99_ms": 1})
+
+
+def main(argv: List[str] = None) -> int:
+    """Print the latency report; returns the process exit code."""
+    parser = argparse.ArgumentParser(description="Summarize Vertex AI call telemetry")
+    parser.add_argument("--dir", default=os.getenv("TELEMETRY_DIR", "telemetry"),
+                        help="Directory containing telemetry batch files")
+    parser.add_argument("--by", choices=["model", "hour", "both"], default="both",
+                        help="Group by model, by hour, or print both reports")
+    args = parser.parse_args(argv)
+
+    df = load_telemetry(args.dir)
+    if df.empty:
+        print(f"No telemetry found in {args.dir}")
+        return 1
+
+    groupings = {"model": [["model"]], "hour": [["hour"]], "both": [["model"], ["hour", "model"]]}
+    with pd.option_context("display.width", 200, "display.max_rows", 500):
+        for by in groupings[args.by]:
+            print(f"\nVertex AI calls by {' and '.join(by)}")
+            print(summarize(df, by).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Cache of verified bearer tokens.
+
+Decoding and verifying a JWT and rebuilding the user model costs more than the
+rest of the authentication dependency. Clients send the same token on every
+request, so :class:`VerifiedTokenCache` remembers the result of verifying it.
+Entries are keyed by a SHA-256 digest of the token, so raw tokens are not kept
+in memory. An entry lives until the token's ``exp`` claim or ``max_ttl_seconds``,
+whichever comes first, and the least recently used entries are evicted past
+``max_entries``.
+
+Revoked tokens (e.g. on logout) are recorded in a :class:`TokenRevocationList`
+until they expire. A cache lookup checks that list first, so revoking a token
+takes effect on the next request even while the token is still cached. With a
+shared store attached (the user repository), revocations are also written
+there, and every worker pulls the ones it has not seen yet every
+``sync_interval_seconds`` from a background task (:meth:`TokenRevocationList.run_sync`),
+so a logout on one worker applies to all of them. Lookups only read memory.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Generic, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from .user_repository import UserRepository
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = counter(
+    "neoserve_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"]
+)
+
+V = TypeVar("V")
+
+
+def token_digest(token: str) -> bytes:
+    """Key under which a token is cached or revoked."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenRevocationList:
+    """Digests of revoked tokens, each kept until the token would have expired."""
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        store: Optional["UserRepository"] = None,
+        sync_interval_seconds: float = 1.0
+    ):
+        """
+        Initialize the list.
+
+        Args:
+            max_entries: Maximum number of revoked tokens remembered (the ones
+                expiring soonest are dropped first)
+            store: Shared store revocations are written to and read from
+            sync_interval_seconds: Longest time a revocation made by another
+                worker goes unnoticed
+        """
+        self.max_entries = max_entries
+        self.store = store
+        self.sync_interval_seconds = sync_interval_seconds
+        self._revoked: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def attach_store(self, store: "UserRepository", sync_interval_seconds: float = 1.0) -> None:
+        """
+        Share revocations with other workers through a store.
+
+        Args:
+            store: Shared store revocations are written to and read from
+            sync_interval_seconds: Longest time a revocation made by another
+                worker goes unnoticed
+        """
+        with self._lock:
+            self.store = store
+            self.sync_interval_seconds = sync_interval_seconds
+            self._cursor = 0
+
+    def revoke(self, token: str, expires_at: Optional[float] = None) -> None:
+        """
+        Revoke a token. With a store attached this writes to it, so call it off
+        the event loop.
+
+        Args:
+            token: The bearer token
+            expires_at: Unix time of the token's ``exp`` claim; tokens without one
+                stay revoked for a day
+        """
+        now = time.time()
+        digest = token_digest(token)
+        expires_at = expires_at if expires_at else now + 86400
+        self._remember(digest, expires_at, now)
+        if self.store is not None:
+            try:
+                self.store.revoke_token(digest, expires_at)
+            except Exception as e:
+                logger.error(f"Error storing token revocation: {str(e)}", exc_info=True)
+
+    def is_revoked(self, token: str, digest: Optional[bytes] = None) -> bool:
+        """Whether the token has been revoked and has not expired yet."""
+        digest = digest or token_digest(token)
+        expires_at = self._revoked.get(digest)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            with self._lock:
+                self._revoked.pop(digest, None)
+            return False
+        return True
+
+    def _remember(self, digest: bytes, expires_at: float, now: float) -> None:
+        with self._lock:
+            self._revoked[digest] = expires_at
+            if len(self._revoked) > self.max_entries:
+                self._prune(now)
+
+    def sync(self) -> None:
+        """
+        Pull revocations made by other workers since the last sync.
+
+        This reads the store, so call it off the event loop.
+        """
+        if self.store is None:
+            return
+        try:
+            revocations = self.store.revoked_tokens_after(self._cursor)
+        except Exception as e:
+            logger.error(f"Error reading token revocations: {str(e)}", exc_info=True)
+            return
+        now = time.time()
+        for position, digest, expires_at in revocations:
+            self._remember(digest, expires_at, now)
+            self._cursor = max(self._cursor, position)
+
+    async def run_sync(self) -> None:
+        """Pull revocations from the store every ``sync_interval_seconds`` until cancelled."""
+        while True:
+            await asyncio.to_thread(self.sync)
+            await asyncio.sleep(self.sync_interval_seconds)
+
+    def _prune(self, now: float) -> None:
+        for digest in [d for d, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[digest]
+        overflow = len(self._revoked) - self.max_entries
+        if overflow > 0:
+            for digest, _ in sorted(self._revoked.items(), key=lambda item: item[1])[:overflow]:
+                del self._revoked[digest]
+
+
+# Process-wide revocation list shared by every token cache
+revoked_tokens = TokenRevocationList()
+
+
+class VerifiedTokenCache(Generic[V]):
+    """Expiry-aware LRU of values (e.g. user objects) built from verified tokens."""
+
+    def __init__(
+        self,
+        name: str = "jwt",
+        max_entries: int = 10000,
+        max_ttl_seconds: float = 300.0,
+        revocations: Optional[TokenRevocationList] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Cache name used in metrics
+            max_entries: Maximum number of cached tokens (least recently used are evicted)
+            max_ttl_seconds: Longest time an entry is trusted, even if the token
+                expires later; bounds how long changes to the user go unnoticed
+            revocations: Revocation list consulted on every lookup
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.revocations = revocations if revocations is not None else revoked_tokens
+        self._entries: "OrderedDict[bytes, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[V]:
+        """
+        Return the cached value for a token that is still valid.
+
+        Args:
+            token: The bearer token
+
+        Returns:
+            The cached value, or None if the token is not cached, expired or revoked
+        """
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time() and not self.revocations.is_revoked(token, digest):
+                self._entries.move_to_end(digest)
+                CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                return value
+            del self._entries[digest]
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        return None
+
+    def put(self, token: str, value: V, expires_at: Optional[float] = None) -> None:
+        """
+        Cache the value built from a verified token.
+
+        Args:
+            token: The bearer token
+            value: Value to return for later requests with the token
+            expires_at: Unix time of the token's ``exp`` claim, if any
+        """
+        now = time.time()
+        deadline = now + self.max_ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, float(expires_at))
+        if deadline <= now:
+            return
+        digest = token_digest(token)
+        self._entries[digest] = (deadline, value)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        """Drop a token from the cache."""
+        self._entries.pop(token_digest(token), None)
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after changing user roles)."""
+        self._entries.clear()
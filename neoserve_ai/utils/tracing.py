@@ -0,0 +1,182 @@
+"""
+Lightweight span tracing for chat turns.
+
+Each chat turn may open a trace with :func:`start_trace`; code running inside it
+opens child spans with :func:`start_span` (pipeline stages and dependency calls do
+this already). Spans follow the request through context variables like the
+request deadline does.
+
+Tracing is off by default. While it is off, or for turns that are not sampled,
+both functions return a shared no-op span and cost one flag or context variable
+lookup. Finished traces are either logged as one summary line per turn
+(``exporter="log"``) or handed to OpenTelemetry (``exporter="otel"``) when the
+``opentelemetry-api`` package is installed and configured by the deployment.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional dependency
+    otel_trace = None
+
+
+class Span:
+    """A timed operation within a chat turn."""
+
+    __slots__ = ("name", "attributes", "start", "end", "children")
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    @property
+    def duration(self) -> float:
+        """Seconds the span has been (or was) open."""
+        return (self.end if self.end is not None else time.monotonic()) - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span tree as plain data."""
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration * 1000, 2),
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled or the turn is not sampled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Any]] = ContextVar("neoserve_span", default=None)
+
+_enabled = False
+_sample_rate = 1.0
+_otel_tracer = None
+
+
+def configure_tracing(enabled: bool, exporter: str = "log", sample_rate: float = 1.0) -> None:
+    """
+    Turn tracing on or off for the process.
+
+    Args:
+        enabled: Whether traces are recorded at all
+        exporter: 'log' to log a summary per turn, 'otel' to use OpenTelemetry
+        sample_rate: Fraction of chat turns that are traced
+    """
+    global _enabled, _sample_rate, _otel_tracer
+    _sample_rate = sample_rate
+    _otel_tracer = None
+    if enabled and exporter == "otel":
+        if otel_trace is None:
+            logger.warning("TRACING_EXPORTER=otel but opentelemetry is not installed; logging traces instead")
+        else:
+            _otel_tracer = otel_trace.get_tracer("neoserve_ai")
+    _enabled = enabled
+
+
+def current_span() -> Optional[Any]:
+    """Return the span of the operation being traced, if any."""
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Open the root span of a trace, subject to sampling.
+
+    Args:
+        name: Span name (e.g. 'chat_turn')
+        **attributes: Span attributes
+
+    Yields:
+        The root span, or a no-op span if the trace is not recorded
+    """
+    if not _enabled or (_sample_rate < 1.0 and random.random() >= _sample_rate):
+        yield _NOOP_SPAN
+        return
+    with _open_span(name, attributes) as span:
+        try:
+            yield span
+        finally:
+            if isinstance(span, Span):
+                span.end = time.monotonic()
+                _log_trace(span)
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Open a child span of the current trace.
+
+    Args:
+        name: Span name (e.g. 'stage.intent')
+        **attributes: Span attributes
+
+    Yields:
+        The span, or a no-op span when there is no trace to attach it to
+    """
+    if _current_span.get() is None:
+        yield _NOOP_SPAN
+        return
+    with _open_span(name, attributes) as span:
+        yield span
+
+
+@contextmanager
+def _open_span(name: str, attributes: Dict[str, Any]) -> Iterator[Any]:
+    if _otel_tracer is not None:
+        with _otel_tracer.start_as_current_span(name, attributes=attributes) as otel_span:
+            token = _current_span.set(otel_span)
+            try:
+                yield otel_span
+            finally:
+                _current_span.reset(token)
+        return
+
+    span = Span(name, attributes)
+    parent = _current_span.get()
+    if isinstance(parent, Span):
+        parent.children.append(span)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_attribute("error", type(e).__name__)
+        raise
+    finally:
+        span.end = time.monotonic()
+        _current_span.reset(token)
+
+
+def _log_trace(span: Span) -> None:
+    def _flatten(node: Span, depth: int) -> List[str]:
+        parts = [f"{'  ' * depth}{node.name} {node.duration * 1000:.1f}ms"]
+        for child in node.children:
+            parts.extend(_flatten(child, depth + 1))
+        return parts
+
+    logger.info(
+        f"trace {span.name} {span.duration * 1000:.1f}ms\n" + "\n".join(_flatten(span, 1)[1:]),
+        extra={"trace": span.to_dict()}
+    )
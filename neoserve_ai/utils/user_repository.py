@@ -0,0 +1,354 @@
+"""
+User storage for the authentication layer.
+
+:class:`UserRepository` is the interface the auth utilities use to look up and
+create users. :class:`SQLiteUserRepository` stores them in an embedded SQLite
+database (``DATABASE_URL``). Every worker process opens its own small connection
+pool, and SQLite's file locking keeps concurrent writers from different workers
+consistent. ``email`` and ``user_id`` have unique indexes, so a lookup is an
+index probe, and two registrations of the same email cannot both succeed. User
+IDs are random rather than derived from the number of users.
+
+Recently read users are kept in a small in-process cache, so repeat logins and
+token resolutions do not touch the database at all. Misses are not cached,
+which means a user registered by another worker is visible immediately.
+
+The repository also stores revoked access tokens (by digest), so a logout
+handled by one worker is seen by the others (see ``utils.token_cache``).
+"""
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..schemas.user import UserInDB
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = counter(
+    "neoserve_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"]
+)
+
+
+class UserAlreadyExistsError(Exception):
+    """Raised when creating a user whose email or user_id is already taken."""
+
+
+def new_user_id() -> str:
+    """Generate a collision-free user ID."""
+    return f"user_{uuid.uuid4().hex}"
+
+
+class UserRepository(ABC):
+    """Lookup and creation of users by email or user ID."""
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[UserInDB]:
+        """Return the user with the given email, if any."""
+
+    @abstractmethod
+    def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        """Return the user with the given ID, if any."""
+
+    @abstractmethod
+    def create(self, user: UserInDB) -> UserInDB:
+        """
+        Store a new user.
+
+        Raises:
+            UserAlreadyExistsError: If the email or user_id is already taken
+        """
+
+    async def get_by_email_async(self, email: str) -> Optional[UserInDB]:
+        """Like :meth:`get_by_email`, with database I/O off the event loop."""
+        return await asyncio.to_thread(self.get_by_email, email)
+
+    async def create_async(self, user: UserInDB) -> UserInDB:
+        """Like :meth:`create`, with database I/O off the event loop."""
+        return await asyncio.to_thread(self.create, user)
+
+    @abstractmethod
+    def revoke_token(self, digest: bytes, expires_at: float) -> None:
+        """
+        Record a revoked token until it expires.
+
+        Args:
+            digest: Digest of the token (see ``token_cache.token_digest``)
+            expires_at: Unix time after which the token is rejected anyway
+        """
+
+    @abstractmethod
+    def revoked_tokens_after(self, cursor: int) -> List[Tuple[int, bytes, float]]:
+        """
+        Return tokens revoked after a cursor, oldest first.
+
+        Args:
+            cursor: Position of the last revocation already seen (0 for all)
+
+        Returns:
+            List of ``(position, digest, expires_at)`` for unexpired revocations
+        """
+
+    def seed(self, users: Iterable[UserInDB]) -> None:
+        """Create the given users unless they already exist."""
+        for user in users:
+            try:
+                self.create(user)
+            except UserAlreadyExistsError:
+                pass
+
+
+class InMemoryUserRepository(UserRepository):
+    """Dictionary-backed repository for tests and single-process development."""
+
+    def __init__(self):
+        self._by_email: Dict[str, UserInDB] = {}
+        self._by_id: Dict[str, UserInDB] = {}
+        self._revocations: List[Tuple[int, bytes, float]] = []
+        self._lock = threading.Lock()
+
+    def get_by_email(self, email: str) -> Optional[UserInDB]:
+        return self._by_email.get(email.lower())
+
+    def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        return self._by_id.get(user_id)
+
+    async def get_by_email_async(self, email: str) -> Optional[UserInDB]:
+        return self.get_by_email(email)
+
+    async def create_async(self, user: UserInDB) -> UserInDB:
+        return self.create(user)
+
+    def create(self, user: UserInDB) -> UserInDB:
+        with self._lock:
+            if user.email.lower() in self._by_email or user.user_id in self._by_id:
+                raise UserAlreadyExistsError(f"User {user.email} already exists")
+            self._by_email[user.email.lower()] = user
+            self._by_id[user.user_id] = user
+        return user
+
+    def revoke_token(self, digest: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._revocations.append((len(self._revocations) + 1, digest, expires_at))
+
+    def revoked_tokens_after(self, cursor: int) -> List[Tuple[int, bytes, float]]:
+        now = time.time()
+        with self._lock:
+            return [entry for entry in self._revocations[cursor:] if entry[2] > now]
+
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the prepared form instead of parsing them again on every call
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id TEXT NOT NULL,
+        email TEXT NOT NULL,
+        data TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_user_id ON users (user_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email)",
+    # The autoincrement id orders revocations across workers without relying on clocks
+    """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        digest BLOB NOT NULL UNIQUE,
+        expires_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS revoked_tokens_expires_at ON revoked_tokens (expires_at)",
+)
+_SELECT_BY_EMAIL = "SELECT data FROM users WHERE email = ?"
+_SELECT_BY_ID = "SELECT data FROM users WHERE user_id = ?"
+_INSERT = "INSERT INTO users (user_id, email, data, created_at) VALUES (?, ?, ?, ?)"
+_REVOKE = "INSERT OR REPLACE INTO revoked_tokens (digest, expires_at) VALUES (?, ?)"
+_PURGE_REVOKED = "DELETE FROM revoked_tokens WHERE expires_at <= ?"
+_SELECT_REVOKED = "SELECT id, digest, expires_at FROM revoked_tokens WHERE id > ? AND expires_at > ? ORDER BY id"
+
+
+class SQLiteUserRepository(UserRepository):
+    """User repository backed by an embedded SQLite database."""
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = 4,
+        cache_size: int = 1024,
+        cache_ttl_seconds: float = 60.0,
+        busy_timeout_seconds: float = 5.0
+    ):
+        """
+        Initialize the repository. Connections are opened on first use.
+
+        Args:
+            path: Database file (':memory:' for a private in-memory database)
+            pool_size: Connections kept open per process
+            cache_size: Users kept in the in-process cache
+            cache_ttl_seconds: How long a cached user is served before it is read again
+            busy_timeout_seconds: How long a writer waits for another process's lock
+        """
+        self.path = path
+        self.pool_size = pool_size if path != ":memory:" else 1
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.busy_timeout_seconds = busy_timeout_seconds
+
+        self._pool: "Optional[queue.Queue[sqlite3.Connection]]" = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+        # (kind, key) -> (expires_at, user)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, UserInDB]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_seconds,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=32
+        )
+        if self.path != ":memory:":
+            # Readers do not block the writer (and vice versa) across workers
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _get_pool(self) -> "queue.Queue[sqlite3.Connection]":
+        # Connections must not be shared with a forked child, so a new process
+        # (e.g. a gunicorn worker forked from a preloading master) opens its own
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    if self.path != ":memory:":
+                        directory = os.path.dirname(os.path.abspath(self.path))
+                        os.makedirs(directory, exist_ok=True)
+                    pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+                    for _ in range(self.pool_size):
+                        pool.put(self._connect())
+                    conn = pool.get()
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    pool.put(conn)
+                    self._cache.clear()
+                    self._pool, self._pool_pid = pool, os.getpid()
+        return self._pool
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        pool = self._get_pool()
+        conn = pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    def _cache_get(self, kind: str, key: str) -> Optional[UserInDB]:
+        with self._cache_lock:
+            entry = self._cache.get((kind, key))
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end((kind, key))
+                CACHE_REQUESTS.inc(cache="users", result="hit")
+                return entry[1]
+        CACHE_REQUESTS.inc(cache="users", result="miss")
+        return None
+
+    def _cache_put(self, user: UserInDB) -> None:
+        expires_at = time.monotonic() + self.cache_ttl_seconds
+        with self._cache_lock:
+            for key in (("email", user.email.lower()), ("id", user.user_id)):
+                self._cache[key] = (expires_at, user)
+                self._cache.move_to_end(key)
+            # Each user has an entry per key
+            while len(self._cache) > self.cache_size * 2:
+                self._cache.popitem(last=False)
+
+    def _fetch(self, kind: str, key: str, statement: str) -> Optional[UserInDB]:
+        user = self._cache_get(kind, key)
+        if user is not None:
+            return user
+        return self._query(statement, key)
+
+    async def _fetch_async(self, kind: str, key: str, statement: str) -> Optional[UserInDB]:
+        # Cache hits are answered inline; only database reads go to a thread
+        user = self._cache_get(kind, key)
+        if user is not None:
+            return user
+        return await asyncio.to_thread(self._query, statement, key)
+
+    def _query(self, statement: str, key: str) -> Optional[UserInDB]:
+        with self._connection() as conn:
+            row = conn.execute(statement, (key,)).fetchone()
+        if row is None:
+            return None
+        user = UserInDB.model_validate_json(row[0])
+        self._cache_put(user)
+        return user
+
+    def get_by_email(self, email: str) -> Optional[UserInDB]:
+        return self._fetch("email", email.lower(), _SELECT_BY_EMAIL)
+
+    def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        return self._fetch("id", user_id, _SELECT_BY_ID)
+
+    async def get_by_email_async(self, email: str) -> Optional[UserInDB]:
+        return await self._fetch_async("email", email.lower(), _SELECT_BY_EMAIL)
+
+    def create(self, user: UserInDB) -> UserInDB:
+        try:
+            with self._connection() as conn:
+                conn.execute(_INSERT, (user.user_id, user.email.lower(), user.model_dump_json(), time.time()))
+        except sqlite3.IntegrityError as e:
+            raise UserAlreadyExistsError(f"User {user.email} already exists") from e
+        self._cache_put(user)
+        return user
+
+    def revoke_token(self, digest: bytes, expires_at: float) -> None:
+        with self._connection() as conn:
+            conn.execute(_PURGE_REVOKED, (time.time(),))
+            conn.execute(_REVOKE, (digest, expires_at))
+
+    def revoked_tokens_after(self, cursor: int) -> List[Tuple[int, bytes, float]]:
+        with self._connection() as conn:
+            rows = conn.execute(_SELECT_REVOKED, (cursor, time.time())).fetchall()
+        return [(row[0], bytes(row[1]), row[2]) for row in rows]
+
+    def close(self) -> None:
+        """Close this process's connections."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        while pool is not None and not pool.empty():
+            pool.get_nowait().close()
+
+
+def create_user_repository(database_url: str, **options) -> UserRepository:
+    """
+    Build the repository for a ``DATABASE_URL``.
+
+    Args:
+        database_url: 'sqlite:///<path>' for SQLite or 'memory://' for an
+            in-process dictionary
+        **options: Passed to :class:`SQLiteUserRepository`
+
+    Returns:
+        The repository
+
+    Raises:
+        ValueError: For URLs of other databases
+    """
+    if database_url.startswith("memory://"):
+        return InMemoryUserRepository()
+    if database_url.startswith("sqlite:///"):
+        return SQLiteUserRepository(database_url[len("sqlite:///"):], **options)
+    raise ValueError(f"Unsupported DATABASE_URL for the user repository: {database_url}")
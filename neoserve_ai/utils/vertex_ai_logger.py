@@ -3,19 +3,25 @@ Logging utility for Vertex AI operations.
 Provides detailed logging for model interactions and API calls.
 """
 import logging
-import json
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from .logging_pipeline import LazyJson
+from .telemetry import TelemetrySink
+
 class VertexAILogger:
     """Enhanced logger for Vertex AI operations."""
     
-    def __init__(self, name: str = "vertex_ai"):
+    def __init__(self, name: str = "vertex_ai", max_prompt_chars: int = 200):
         """Initialize the logger.
         
         Args:
             name: Logger name
+            max_prompt_chars: Longest prompt excerpt included in a log record
         """
+        self.max_prompt_chars = max_prompt_chars
+        # Optional batched sink for call telemetry (see utils.telemetry)
+        self.telemetry: Optional[TelemetrySink] = None
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
         
@@ -36,6 +42,7 @@ class VertexAILogger:
         parameters: Dict[str, Any],
         response: Any = None,
         error: Optional[Exception] = None,
+        latency_seconds: Optional[float] = None,
         **kwargs
     ) -> None:
         """Log a model API call with details.
@@ -46,12 +53,31 @@ class VertexAILogger:
             parameters: Generation parameters
             response: Model response (if successful)
             error: Exception (if any)
+            latency_seconds: Duration of the call, recorded in telemetry
             **kwargs: Additional metadata
         """
+        if self.telemetry is not None:
+            metadata = kwargs.get("metadata") or {}
+            self.telemetry.record(
+                kind="model_call",
+                model=model_name,
+                latency_seconds=latency_seconds,
+                status="error" if error else "success",
+                endpoint=metadata.get("endpoint"),
+                payload_bytes=len(prompt.encode("utf-8")) if prompt else 0,
+                response_bytes=len(str(response)) if response else 0,
+                error_type=type(error).__name__ if error else None
+            )
+        
+        level = logging.ERROR if error else logging.INFO
+        if not self.logger.isEnabledFor(level):
+            return
+        
         log_data = {
             "timestamp": datetime.utcnow().isoformat(),
             "model": model_name,
-            "prompt": prompt,
+            "prompt": self._truncate(prompt),
+            "prompt_length": len(prompt) if prompt else 0,
             "parameters": parameters,
             **kwargs
         }
@@ -62,14 +88,15 @@ class VertexAILogger:
                 "error": str(error),
                 "error_type": error.__class__.__name__
             })
-            self.logger.error(json.dumps(log_data, default=str))
         else:
             log_data.update({
                 "status": "success",
                 "response_length": len(str(response)) if response else 0,
                 "response_type": type(response).__name__
             })
-            self.logger.info(json.dumps(log_data, default=str))
+        # Serialized when the record is written, off the event loop when the
+        # logging pipeline is installed
+        self.logger.log(level, "%s", LazyJson(log_data))
     
     def log_prediction(
         self,
@@ -78,6 +105,8 @@ class VertexAILogger:
         parameters: Dict[str, Any],
         response: Any = None,
         error: Optional[Exception] = None,
+        latency_seconds: Optional[float] = None,
+        model_name: Optional[str] = None,
         **kwargs
     ) -> None:
         """Log a prediction API call with details.
@@ -88,8 +117,27 @@ class VertexAILogger:
             parameters: Prediction parameters
             response: Prediction response (if successful)
             error: Exception (if any)
+            latency_seconds: Duration of the call, recorded in telemetry
+            model_name: Model or agent behind the endpoint, recorded in telemetry
             **kwargs: Additional metadata
         """
+        if self.telemetry is not None:
+            predictions = getattr(response, "predictions", None)
+            self.telemetry.record(
+                kind="prediction",
+                model=model_name or endpoint,
+                latency_seconds=latency_seconds,
+                status="error" if error else "success",
+                endpoint=endpoint,
+                payload_bytes=sum(len(str(instance)) for instance in instances),
+                response_bytes=len(str(predictions)) if predictions else 0,
+                error_type=type(error).__name__ if error else None
+            )
+        
+        level = logging.ERROR if error else logging.INFO
+        if not self.logger.isEnabledFor(level):
+            return
+        
         log_data = {
             "timestamp": datetime.utcnow().isoformat(),
             "endpoint": endpoint,
@@ -104,13 +152,18 @@ class VertexAILogger:
                 "error": str(error),
                 "error_type": error.__class__.__name__
             })
-            self.logger.error(json.dumps(log_data, default=str))
         else:
             log_data.update({
                 "status": "success",
                 "response_type": type(response).__name__
             })
-            self.logger.info(json.dumps(log_data, default=str))
+        self.logger.log(level, "%s", LazyJson(log_data))
+    
+    def _truncate(self, text: Optional[str]) -> Optional[str]:
+        """Trim a prompt to max_prompt_chars for logging."""
+        if text is None or len(text) <= self.max_prompt_chars:
+            return text
+        return text[:self.max_prompt_chars] + "..."
 
 # Create a default logger instance
 vertex_ai_logger = VertexAILogger()
@@ -0,0 +1,207 @@
+"""
+WebSocket connection handling for the chat transport.
+
+A connection authenticates once, then exchanges JSON messages with the client:
+pipelined chat messages are queued and answered in order, server-initiated
+pushes (such as proactive engagements) are sent as they happen, and a heartbeat
+closes connections whose client stopped responding.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+from starlette.websockets import WebSocketState
+
+logger = logging.getLogger(__name__)
+
+# Handles one inbound chat payload and returns the message to send back
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Close code sent when the server is at its connection limit ("try again later")
+WS_1013_TRY_AGAIN_LATER = 1013
+
+
+class WebSocketConnectionManager:
+    """Tracks open WebSocket connections and enforces a connection-count limit."""
+
+    def __init__(self, max_connections: int = 1000):
+        """
+        Initialize the connection manager.
+
+        Args:
+            max_connections: Maximum number of concurrently open connections
+        """
+        self.max_connections = max_connections
+        self._active: Set[WebSocket] = set()
+
+    @property
+    def count(self) -> int:
+        """Number of currently registered connections."""
+        return len(self._active)
+
+    def register(self, websocket: WebSocket) -> bool:
+        """
+        Register a new connection if the limit allows it.
+
+        Returns:
+            True if the connection was registered, False if the limit is reached
+        """
+        if len(self._active) >= self.max_connections:
+            return False
+        self._active.add(websocket)
+        return True
+
+    def unregister(self, websocket: WebSocket) -> None:
+        """Forget a closed connection."""
+        self._active.discard(websocket)
+
+
+class ChatConnection:
+    """
+    One accepted chat WebSocket.
+
+    Four tasks run for the lifetime of the connection: a receiver that reads
+    client frames into a bounded inbound queue, a worker that processes chat
+    messages in order, a sender that owns all writes to the socket and a
+    heartbeat that pings the client. Pushes
+    and responses go through a bounded outbound queue, so a client that stops
+    reading eventually stalls the worker instead of growing memory.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        handler: MessageHandler,
+        heartbeat_interval: float = 20.0,
+        max_pending_messages: int = 16,
+        max_outbound_messages: int = 64,
+        dumps: Callable[[Any], str] = json.dumps
+    ):
+        """
+        Initialize the connection.
+
+        Args:
+            websocket: The accepted WebSocket
+            handler: Coroutine that processes one chat payload
+            heartbeat_interval: Seconds between server pings; a client silent for two
+                intervals is disconnected
+            max_pending_messages: Pipelined chat messages buffered before new ones are rejected
+            max_outbound_messages: Messages buffered for a client that is slow to read
+            dumps: JSON encoder for outbound messages
+        """
+        self.websocket = websocket
+        self.handler = handler
+        self.heartbeat_interval = heartbeat_interval
+        self.dumps = dumps
+        self._inbound: asyncio.Queue = asyncio.Queue(maxsize=max_pending_messages)
+        self._outbound: asyncio.Queue = asyncio.Queue(maxsize=max_outbound_messages)
+        self._last_seen = time.monotonic()
+        self._close_code = status.WS_1000_NORMAL_CLOSURE
+
+    async def push(self, message: Dict[str, Any]) -> None:
+        """
+        Push a server-initiated message to the client without blocking.
+
+        Pushes are dropped if the client is not keeping up with its outbound queue.
+        """
+        try:
+            self._outbound.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping pushed '{message.get('type')}' message for a slow WebSocket client")
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects or times out."""
+        tasks = [
+            asyncio.create_task(self._receive_loop()),
+            asyncio.create_task(self._process_loop()),
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        try:
+            # Any task finishing means the connection is over
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() and not isinstance(
+                    task.exception(), WebSocketDisconnect
+                ):
+                    logger.error(f"WebSocket connection failed: {task.exception()}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if (
+                self.websocket.application_state == WebSocketState.CONNECTED
+                and self.websocket.client_state == WebSocketState.CONNECTED
+            ):
+                try:
+                    await self.websocket.close(code=self._close_code)
+                except RuntimeError:
+                    pass
+
+    async def _receive_loop(self) -> None:
+        while True:
+            try:
+                payload = await self.websocket.receive_json()
+            except WebSocketDisconnect:
+                return
+            except ValueError:
+                await self.push({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+
+            self._last_seen = time.monotonic()
+            if not isinstance(payload, dict):
+                await self.push({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+
+            message_type = payload.get("type", "message")
+            if message_type == "pong":
+                continue
+            if message_type == "ping":
+                await self.push({"type": "pong"})
+                continue
+            if message_type != "message":
+                await self.push({"type": "error", "detail": f"Unknown message type: {message_type}"})
+                continue
+
+            try:
+                self._inbound.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Backpressure: the client must wait for responses before pipelining more
+                await self.push({
+                    "type": "error",
+                    "detail": "Too many pending messages",
+                    "correlation_id": payload.get("message_id"),
+                    "retryable": True
+                })
+
+    async def _process_loop(self) -> None:
+        while True:
+            payload = await self._inbound.get()
+            try:
+                response = await self.handler(payload)
+            except Exception as e:
+                logger.error(f"Error processing WebSocket chat message: {str(e)}", exc_info=True)
+                response = {
+                    "type": "error",
+                    "detail": "An error occurred while processing your message",
+                    "correlation_id": payload.get("message_id")
+                }
+            # Blocks when the client is not reading its responses
+            await self._outbound.put(response)
+
+    async def _send_loop(self) -> None:
+        while True:
+            message = await self._outbound.get()
+            await self.websocket.send_text(self.dumps(message))
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if time.monotonic() - self._last_seen > 2 * self.heartbeat_interval:
+                logger.info("Closing WebSocket connection after missed heartbeats")
+                self._close_code = status.WS_1001_GOING_AWAY
+                return
+            await self.push({"type": "ping"})
@@ -11,6 +11,9 @@ from fastapi.testclient import TestClient
 # Add the project root to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Keep users in memory so tests do not create a database file in the working directory
+os.environ["DATABASE_URL"] = "memory://"
+
 from neoserve_ai.main import app
 from neoserve_ai.config.settings import init_config
 
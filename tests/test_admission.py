@@ -0,0 +1,126 @@
+"""
+Tests for admission control and load shedding.
+"""
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from neoserve_ai.api.api_v1.endpoints import chat as chat_endpoints
+from neoserve_ai.models.user import UserInDB
+from neoserve_ai.schemas.chat import ChatRequest
+from neoserve_ai.utils.admission import AdmissionController, Overloaded
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_the_limit_wait_for_a_slot():
+    """Queued requests are admitted as running ones finish."""
+    controller = AdmissionController(initial_limit=1, min_limit=1, queue_timeout=1.0)
+    order = []
+
+    async def turn(name):
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(turn("a"), turn("b"), turn("c"))
+
+    assert order == ["a", "b", "c"]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_with_retry_after():
+    """Requests arriving at a full queue are rejected immediately."""
+    controller = AdmissionController(initial_limit=1, min_limit=1, max_queue_size=1, queue_timeout=1.0)
+    await controller.acquire()
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as excinfo:
+        await controller.acquire()
+    assert excinfo.value.retry_after >= 1
+
+    controller.release(0.01)
+    await waiter
+    assert controller.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_requests_displace_lower_priority_waiters():
+    """Escalation-prone traffic is admitted ahead of anonymous traffic."""
+    controller = AdmissionController(initial_limit=1, min_limit=1, max_queue_size=1, queue_timeout=1.0)
+    await controller.acquire()
+    anonymous = asyncio.ensure_future(controller.acquire("anonymous"))
+    await asyncio.sleep(0)
+    escalation = asyncio.ensure_future(controller.acquire("escalation"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded):
+        await anonymous
+
+    controller.release(0.01)
+    await escalation
+    assert controller.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_time_out():
+    """A request that cannot be admitted before its deadline is shed."""
+    controller = AdmissionController(initial_limit=1, min_limit=1, queue_timeout=0.01)
+    await controller.acquire()
+
+    with pytest.raises(Overloaded):
+        await controller.acquire()
+    assert controller.queued == 0
+
+
+def test_limit_adapts_to_latency():
+    """Slow turns shrink the limit; fast turns at saturation grow it."""
+    controller = AdmissionController(initial_limit=10, min_limit=2, target_latency=1.0)
+
+    controller.in_flight = 10
+    controller.release(0.1)
+    assert controller.limit > 10
+
+    controller.in_flight = 1
+    controller._last_decrease = float("-inf")
+    controller.release(5.0)
+    assert controller.limit < 10
+
+
+class _EscalationHints:
+    def __init__(self, open_sessions):
+        self.open_sessions = open_sessions
+
+    def has_open_escalation(self, session_id):
+        return session_id in self.open_sessions
+
+    def is_escalation_prone(self, message):
+        return "human" in message
+
+
+def test_priority_comes_from_server_side_signals(monkeypatch):
+    """Client-supplied hints never raise a turn's priority; server-side state does."""
+    monkeypatch.setattr(
+        chat_endpoints, "orchestrator", SimpleNamespace(agents={"escalation": _EscalationHints({"open"})})
+    )
+    monkeypatch.setattr(chat_endpoints, "shed_turns", OrderedDict())
+    user = UserInDB(id=5, username="member", email="member@example.com", hashed_password="", is_active=True)
+
+    def priority(current_user, session_id="s1", message="hi", **fields):
+        request = ChatRequest(message=message, session_id=session_id, **fields)
+        return chat_endpoints._admission_priority(request, current_user)
+
+    assert priority(None, metadata={"force_escalation": True, "retry_attempt": 3}) == "anonymous"
+    assert priority(None, session_id="open", message="a human please") == "anonymous"
+    assert priority(user, metadata={"force_escalation": True, "retry_attempt": 3}) == "authenticated"
+    assert priority(user, session_id="open") == "escalation"
+    assert priority(user, message="let me talk to a human") == "escalation"
+
+    chat_endpoints._record_shed_turn("5", ChatRequest(message="hi", session_id="s1", message_id="m1"))
+    assert priority(None, message_id="m1") == "anonymous"
+    assert priority(user, message_id="m1") == "retry"
+    # The retry used up the record
+    assert priority(user, message_id="m1") == "authenticated"
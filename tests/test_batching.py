@@ -0,0 +1,72 @@
+"""
+Tests for the micro-batching and single-flight cache helpers.
+"""
+import asyncio
+
+import pytest
+
+from neoserve_ai.utils.batching import MicroBatcher, SingleFlightCache
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_coalesces_concurrent_calls():
+    """Concurrent submissions are processed in batches of at most max_batch_size."""
+    batches = []
+
+    async def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=4, max_wait=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert results == [i * 2 for i in range(10)]
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_propagates_errors_to_every_caller():
+    """A failing batch fails every submission it contained."""
+    async def fail(items):
+        raise RuntimeError("backend down")
+
+    batcher = MicroBatcher(fail, max_batch_size=8, max_wait=0.001)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cache_shares_in_flight_lookups():
+    """Concurrent callers with the same key share one lookup."""
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    cache = SingleFlightCache(max_entries=2)
+    results = await asyncio.gather(*(cache.get_or_load("q", load) for _ in range(5)))
+
+    assert results == ["answer"] * 5
+    assert calls == 1
+    assert cache.stats() == {"hits": 4, "misses": 1, "entries": 1}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cache_does_not_keep_failures():
+    """A failed lookup is retried by the next caller."""
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("transient")
+        return 42
+
+    cache = SingleFlightCache()
+    with pytest.raises(ValueError):
+        await cache.get_or_load("k", flaky)
+    assert await cache.get_or_load("k", flaky) == 42
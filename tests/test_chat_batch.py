@@ -0,0 +1,129 @@
+"""
+Tests for bulk chat processing.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.api.api_v1.deps import get_optional_user
+from neoserve_ai.api.api_v1.endpoints import chat as chat_endpoints
+from neoserve_ai.main import app
+from neoserve_ai.models.user import UserInDB
+
+
+def _orchestrator(delays, order):
+    """An orchestrator whose turns take ``delays[message]`` seconds."""
+    orchestrator = AgentOrchestrator(config={})
+    orchestrator.initialized = True
+    orchestrator.agents["intent_classifier"] = type("Classifier", (), {"classify_batch": None})()
+
+    async def process_message(user_id, session_id, message, metadata=None, batch=None):
+        order.append(message)
+        await asyncio.sleep(delays.get(message, 0))
+        if message == "boom":
+            raise RuntimeError("agent failure")
+        return {"response": f"re: {message}"}
+
+    orchestrator.process_message = process_message
+    return orchestrator
+
+
+def _item(correlation_id, session_id, message):
+    return {"correlation_id": correlation_id, "user_id": "u1", "session_id": session_id, "message": message}
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order_with_correlation_ids():
+    """Fast turns are not held back by slow ones; each result keeps its correlation ID."""
+    order = []
+    orchestrator = _orchestrator({"slow": 0.05}, order)
+    items = [
+        _item("a", "s1", "slow"),
+        _item("b", "s2", "fast"),
+        {"correlation_id": "c", "error": "Invalid chat request"},
+        _item("d", "s3", "boom"),
+    ]
+
+    results = [result async for result in orchestrator.process_batch(items, max_concurrency=4)]
+
+    assert [result["correlation_id"] for result in results][-1] == "a"
+    by_id = {result["correlation_id"]: result for result in results}
+    assert by_id["a"]["status"] == "ok" and by_id["a"]["response"]["response"] == "re: slow"
+    assert by_id["b"]["session_id"] == "s2"
+    assert by_id["c"] == {"correlation_id": "c", "status": "error", "error": "Invalid chat request"}
+    assert by_id["d"]["status"] == "error" and "agent failure" not in by_id["d"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_turns_of_one_session_run_in_input_order():
+    """A slow turn delays later turns of its session only."""
+    order = []
+    orchestrator = _orchestrator({"first": 0.03}, order)
+    items = [_item("1", "s1", "first"), _item("2", "s1", "second"), _item("3", "s2", "other")]
+
+    results = [result["correlation_id"] async for result in orchestrator.process_batch(items, max_concurrency=3)]
+
+    assert order.index("first") < order.index("second")
+    assert results.index("3") < results.index("1") < results.index("2")
+
+
+class _FakeBatchOrchestrator:
+    def claim_session(self, session_id, user_id):
+        return session_id != "foreign"
+
+    async def process_batch(self, items, **kwargs):
+        async for item in items:
+            if "error" in item:
+                yield {"correlation_id": item["correlation_id"], "status": "error", "error": item["error"]}
+            else:
+                yield {
+                    "correlation_id": item["correlation_id"], "session_id": item["session_id"],
+                    "status": "ok", "response": {"response": item["message"]}
+                }
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    monkeypatch.setattr(chat_endpoints, "orchestrator", _FakeBatchOrchestrator())
+    app.dependency_overrides[get_optional_user] = lambda: UserInDB(
+        id=7, username="bulk", email="bulk@example.com", hashed_password="", is_active=True
+    )
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_optional_user, None)
+
+
+def test_batch_endpoint_streams_ndjson_results(batch_client):
+    """Each line of an NDJSON body gets a result line with its correlation ID."""
+    body = "\n".join([
+        json.dumps({"message": "hi", "session_id": "s1", "message_id": "m1"}),
+        json.dumps({"message": "there", "session_id": "s1"}),
+        "{not json",
+        json.dumps({"message": "sneaky", "session_id": "foreign", "message_id": "m4"}),
+    ])
+
+    response = batch_client.post(
+        "/api/v1/chat/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert [(line["correlation_id"], line["status"]) for line in lines] == [
+        ("m1", "ok"), ("1", "ok"), ("2", "error"), ("m4", "error")
+    ]
+    assert lines[0]["response"]["response"] == "hi"
+    assert lines[3]["error"] == "Session not found"
+
+
+def test_batch_endpoint_rejects_oversized_bodies(batch_client, monkeypatch):
+    """Bodies over the byte cap are refused, whether or not they declare a length."""
+    monkeypatch.setattr(chat_endpoints.settings, "BATCH_MAX_BODY_BYTES", 64)
+    body = json.dumps([{"message": "x" * 100, "session_id": "s1"}]).encode()
+
+    declared = batch_client.post("/api/v1/chat/batch", content=body)
+    chunked = batch_client.post("/api/v1/chat/batch", content=iter([body[:50], body[50:]]))
+
+    assert declared.status_code == 413
+    assert chunked.status_code == 413
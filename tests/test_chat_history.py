@@ -0,0 +1,156 @@
+"""
+Tests for cursor-paginated chat history.
+"""
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from neoserve_ai.agents import personalization_agent as personalization_module
+from neoserve_ai.agents.conversation import MessageRecord
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.agents.personalization_agent import PersonalizationAgent
+from neoserve_ai.utils.circuit_breaker import CircuitBreaker
+from neoserve_ai.utils.pagination import compute_etag, decode_cursor, encode_cursor, etag_matches
+
+
+class FakeInteractions:
+    """Stands in for the personalization agent's Firestore interaction log."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.queries = []
+
+    async def get_session_interactions(self, session_id, user_id, limit, after=None, before=None):
+        self.queries.append((after, before))
+        matching = [
+            (key, message) for key, message in self.entries
+            if (after is None or key > after) and (before is None or key[0] < before)
+        ]
+        return matching[:limit]
+
+
+def _orchestrator(interactions):
+    orchestrator = AgentOrchestrator(config={"max_history_size": 10})
+    orchestrator.agents["personalization"] = interactions
+    history = orchestrator.conversation_history["s1"] = []
+    for i in range(3):
+        history.append(MessageRecord("user", f"recent {i}", timestamp=100.0 + i))
+    return orchestrator
+
+
+def test_cursors_round_trip_and_reject_garbage():
+    """Cursors are opaque tokens that decode back to the position."""
+    cursor = encode_cursor((100000000, "abc-user"))
+
+    assert decode_cursor(cursor, 2) == (100000000, "abc-user")
+    for bad in ("garbage", encode_cursor((1,)), "W10"):
+        with pytest.raises(ValueError):
+            decode_cursor(bad, 2)
+
+
+def test_etags_compare_weakly():
+    """If-None-Match matches the tag with or without the weak prefix, in lists, or '*'."""
+    etag = compute_etag(b"[]")
+
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag[2:]}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.asyncio
+async def test_pages_walk_firestore_then_memory_without_gaps():
+    """Older interactions come from the store, recent messages from memory."""
+    stored = [
+        ((50_000_000 + i, f"doc{i}"), {"message_id": f"doc{i}", "content": f"stored {i}"})
+        for i in range(3)
+    ]
+    interactions = FakeInteractions(stored)
+    orchestrator = _orchestrator(interactions)
+
+    contents, after, pages = [], None, 0
+    while True:
+        page = await orchestrator.get_history_page("s1", "u1", 2, after)
+        contents += [message["content"] for message in page.messages]
+        pages += 1
+        if not page.has_more:
+            break
+        after = page.last_key
+
+    assert contents == ["stored 0", "stored 1", "stored 2", "recent 0", "recent 1", "recent 2"]
+    assert pages == 3
+    # The last page starts inside the in-memory part and needs no store query
+    assert len(interactions.queries) == 2
+    assert all(before == 100_000_000 for _, before in interactions.queries)
+
+
+class FakeInteractionLog:
+    """Stands in for the Firestore client behind the interaction log."""
+
+    def __init__(self):
+        self.docs = {}
+        self.commits = 0
+        self._ids = itertools.count()
+
+    def collection(self, name):
+        return self
+
+    def document(self):
+        return f"doc{next(self._ids)}"
+
+    def batch(self):
+        log, writes = self, []
+        return SimpleNamespace(
+            set=lambda doc_id, data: writes.append((doc_id, data)),
+            commit=lambda: (log.docs.update(writes), setattr(log, "commits", log.commits + 1))
+        )
+
+    def where(self, filter=None):
+        return self
+
+    def order_by(self, field, direction=None):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def get(self, timeout=None):
+        # Firestore hands back timezone-aware timestamps whether or not they were written naive
+        ordered = sorted(
+            self.docs.items(), key=lambda item: (personalization_module._to_micros(item[1]["timestamp"]), item[0])
+        )
+        return [SimpleNamespace(id=doc_id, to_dict=lambda data=data: dict(data)) for doc_id, data in ordered]
+
+
+@pytest.mark.asyncio
+async def test_logged_interactions_include_the_users_turns(monkeypatch):
+    """A turn is logged as the user's message and the response, read back with their roles."""
+    monkeypatch.setattr(
+        personalization_module, "FieldFilter",
+        lambda field, op, value: SimpleNamespace(field_path=field, op_string=op, value=value)
+    )
+    agent = PersonalizationAgent(config={})
+    agent.db = FakeInteractionLog()
+    agent.interaction_collection = "interactions"
+    agent.circuit_breaker = CircuitBreaker("test_interactions")
+
+    await agent._log_interaction("u1", {
+        "session_id": "s1",
+        "message": "Your order ships tomorrow.",
+        "intent": "billing",
+        "user_message": "Where is my order?",
+        "user_message_timestamp": 1_700_000_000.5
+    })
+    agent.db.docs["legacy"] = {"timestamp": personalization_module._from_micros(1), "message": "old response"}
+
+    entries = await agent.get_session_interactions("s1", "u1", 10)
+    assert agent.db.commits == 1
+    assert [(message["role"], message["content"]) for _, message in entries] == [
+        ("assistant", "old response"),
+        ("user", "Where is my order?"),
+        ("assistant", "Your order ships tomorrow."),
+    ]
+    assert entries[1][0][0] == 1_700_000_000_500_000
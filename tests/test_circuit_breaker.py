@@ -0,0 +1,118 @@
+"""
+Tests for the per-dependency circuit breakers.
+"""
+import asyncio
+
+import pytest
+
+from neoserve_ai.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+async def _fail():
+    raise RuntimeError("dependency down")
+
+
+async def _ok():
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_failure_rate_and_rejects_calls():
+    """Once the failure rate reaches the threshold, calls are rejected without running."""
+    breaker = CircuitBreaker("firestore", window_size=4, minimum_calls=4, failure_rate_threshold=0.5)
+
+    for func in (_ok, _fail, _ok, _fail):
+        try:
+            await breaker.call(func)
+        except RuntimeError:
+            pass
+    assert breaker.state == OPEN
+
+    called = []
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(lambda: called.append(True))
+    assert called == []
+    assert breaker.snapshot()["rejected_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_stays_closed_below_minimum_calls():
+    """A few failures right after startup are not enough to open the breaker."""
+    breaker = CircuitBreaker("pubsub", minimum_calls=5)
+
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_trials_close_or_reopen_the_breaker():
+    """After the cool-down, successful trial calls close the breaker; a failed one reopens it."""
+    breaker = CircuitBreaker(
+        "vertex_ai", window_size=2, minimum_calls=2, open_seconds=0.01, half_open_max_calls=2
+    )
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    await asyncio.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    await asyncio.sleep(0.02)
+    assert await breaker.call(_ok) == "ok"
+    assert breaker.state == HALF_OPEN
+    assert await breaker.call(lambda: "sync ok") == "sync ok"
+    assert breaker.state == CLOSED
+
+
+def test_breaker_opens_on_slow_calls():
+    """Calls that succeed but are consistently slow also open the breaker."""
+    breaker = CircuitBreaker(
+        "discovery_engine", window_size=3, minimum_calls=3,
+        slow_call_seconds=1.0, slow_call_rate_threshold=0.6
+    )
+    breaker.record_success(0.1)
+    breaker.record_success(2.0)
+    assert breaker.state == CLOSED
+    breaker.record_success(3.0)
+    assert breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_are_not_failures():
+    """Callers that give up (disconnects, expired deadlines) never open the breaker."""
+    breaker = CircuitBreaker("vertex_ai")
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    for _ in range(breaker.minimum_calls * 2):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(breaker.call(hang), 0.001)
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["window_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_call_gives_back_its_slot():
+    """A cancelled half-open trial lets another trial through."""
+    breaker = CircuitBreaker("firestore", window_size=2, minimum_calls=2, open_seconds=0.0, half_open_max_calls=1)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert breaker.state == HALF_OPEN
+
+    task = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(10)))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert await breaker.call(_ok) == "ok"
+    assert breaker.state == CLOSED
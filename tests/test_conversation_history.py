@@ -0,0 +1,44 @@
+"""
+Tests for the compact conversation history records.
+"""
+from neoserve_ai.agents.conversation import MessageRecord
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+
+
+def test_records_intern_roles_and_skip_empty_metadata():
+    """Intents move out of the metadata, which is only kept when non-empty."""
+    user = MessageRecord.create("user", "hi", {})
+    answer = MessageRecord.create("assistant", "hello", {"intent": "billing"})
+    flagged = MessageRecord.create("system", "escalated", {"type": "escalation", "intent": "escalation"})
+
+    assert user.metadata is None and user.intent is None
+    assert answer.metadata is None and answer.intent == "billing"
+    assert flagged.metadata == {"type": "escalation"}
+    assert answer.role is MessageRecord.create("assistant", "again").role
+    assert not hasattr(user, "__dict__")
+
+
+def test_to_dict_restores_the_message_shape():
+    """Edges still see role, content, ISO timestamp and metadata with the intent."""
+    record = MessageRecord("assistant", "hello", timestamp=0.0, intent="billing")
+
+    assert record.to_dict() == {
+        "role": "assistant",
+        "content": "hello",
+        "timestamp": "1970-01-01T00:00:00",
+        "metadata": {"intent": "billing"}
+    }
+
+
+def test_orchestrator_caps_history_in_place():
+    """The session keeps its list object and only the newest messages."""
+    orchestrator = AgentOrchestrator(config={"max_history_size": 3})
+    orchestrator._add_to_history("s1", "user", "first")
+    history = orchestrator.conversation_history["s1"]
+    for i in range(4):
+        orchestrator._add_to_history("s1", "user", f"message {i}")
+
+    assert orchestrator.conversation_history["s1"] is history
+    assert [m["content"] for m in orchestrator._get_conversation_history("s1")] == [
+        "message 1", "message 2", "message 3"
+    ]
@@ -0,0 +1,60 @@
+"""
+Tests for the rolling conversation summarizer.
+"""
+from neoserve_ai.agents.conversation import MessageRecord
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.agents.summary import RollingSummarizer
+
+
+def test_fold_extracts_intents_entities_issues_and_sentiment():
+    """Folded messages leave their intents, entities, open issues and mood behind."""
+    summarizer = RollingSummarizer(max_messages=4)
+    summary = summarizer.fold([
+        MessageRecord("user", "Order #48213 arrived damaged. I want a refund of $59.99."),
+        MessageRecord("assistant", "Sorry to hear that.", intent="billing"),
+        MessageRecord("user", "This is terrible, the refund is still not fixed!"),
+        MessageRecord("assistant", "Let me check.", intent="billing"),
+    ])
+
+    data = summary.to_dict()
+    assert data["messages"] == 4
+    assert data["intents"] == {"billing": 2}
+    assert {"#48213", "$59.99"} <= set(data["entities"])
+    assert data["unresolved_issues"] == [
+        "Order #48213 arrived damaged.", "This is terrible, the refund is still not fixed!"
+    ]
+    assert data["sentiment"][0] < 0
+
+    summarizer.fold([MessageRecord("user", "Great, that works now, thanks!")], summary)
+    assert summary.to_dict()["unresolved_issues"] == []
+    assert summary.sentiment_trend == "improving"
+
+
+def test_summary_stays_bounded_over_long_sessions():
+    """However many messages are folded, every part of the summary is capped."""
+    summarizer = RollingSummarizer(max_messages=10, fold_size=5, max_entities=3, max_unresolved=2,
+                                   max_sentiment_points=4)
+    history, summary = [], None
+    for i in range(1000):
+        history.append(MessageRecord("user", f"Order {10000 + i} is still missing", intent=f"intent{i % 3}"))
+        summary = summarizer.compact(history, summary)
+        assert len(history) <= 10
+
+    assert summary.messages + len(history) == 1000
+    assert len(summary.entities) == 3
+    assert len(summary.unresolved) == 2
+    assert len(summary.sentiment) == 4
+    assert set(summary.intents) == {"intent0", "intent1", "intent2"}
+
+
+def test_orchestrator_folds_history_into_summary():
+    """Overflowing sessions keep recent raw messages plus a summary for the agents."""
+    orchestrator = AgentOrchestrator(config={"max_history_size": 6, "history_fold_size": 3})
+    for i in range(7):
+        orchestrator._add_to_history("s1", "user", f"message {i}")
+
+    assert [m.content for m in orchestrator.conversation_history["s1"]] == [
+        "message 3", "message 4", "message 5", "message 6"
+    ]
+    assert orchestrator._get_conversation_summary("s1")["messages"] == 3
+    assert orchestrator._get_conversation_summary("other") is None
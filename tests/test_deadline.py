@@ -0,0 +1,61 @@
+"""
+Tests for request deadlines and degraded pipeline stages.
+"""
+import asyncio
+
+import pytest
+
+from neoserve_ai.utils.deadline import (
+    DeadlineExceeded, current_deadline, deadline_scope, remaining_timeout, run_stage
+)
+
+
+@pytest.mark.asyncio
+async def test_stage_within_budget_returns_its_result():
+    """Stages that finish in time are not degraded."""
+    async def stage():
+        return "full"
+
+    with deadline_scope(1.0) as deadline:
+        assert await run_stage("intent", stage(), lambda: "fallback") == "full"
+    assert deadline.degraded_stages == []
+
+
+@pytest.mark.asyncio
+async def test_hung_stage_falls_back_when_budget_expires():
+    """A stage that outlives the remaining budget is cancelled and degraded."""
+    async def hung():
+        await asyncio.sleep(10)
+
+    with deadline_scope(0.01) as deadline:
+        assert await run_stage("knowledge_base", hung(), lambda: "fallback") == "fallback"
+        # Later stages degrade immediately
+        assert await run_stage("personalization", hung(), lambda: "plain") == "plain"
+    assert deadline.degraded_stages == ["knowledge_base", "personalization"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_propagates_to_tasks_and_never_extends():
+    """Tasks inherit the request deadline and nested scopes cannot extend it."""
+    with deadline_scope(0.5) as outer:
+        with deadline_scope(30) as inner:
+            assert inner is outer
+
+        async def child():
+            return current_deadline()
+
+        assert await asyncio.create_task(child()) is outer
+        assert 0 < remaining_timeout(7) <= 0.5
+        assert remaining_timeout(0.1) == 0.1
+
+    assert current_deadline() is None
+    assert remaining_timeout(7) == 7
+
+
+@pytest.mark.asyncio
+async def test_calls_are_skipped_once_the_deadline_has_passed():
+    """An expired deadline raises instead of handing out a zero timeout."""
+    with deadline_scope(0.001):
+        await asyncio.sleep(0.005)
+        with pytest.raises(DeadlineExceeded):
+            remaining_timeout(5)
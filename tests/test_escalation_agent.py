@@ -0,0 +1,273 @@
+"""
+Tests for escalation records, using an in-memory stand-in for Firestore.
+"""
+import asyncio
+import itertools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from neoserve_ai.agents import escalation_agent as escalation_module
+from neoserve_ai.agents.escalation_agent import EscalationAgent
+
+
+class PreconditionFailed(Exception):
+    """Raised by the fake store when a write precondition does not hold."""
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, update_time):
+        self.id = doc_id
+        self.exists = data is not None
+        self.update_time = update_time
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+def _result(collection, value):
+    """Return a value, or an awaitable of it when the store simulates network round-trips."""
+    if not collection.yields:
+        return value
+
+    async def later():
+        await asyncio.sleep(0)
+        return value
+    return later()
+
+
+class FakeDocument:
+    def __init__(self, collection, doc_id):
+        self.collection = collection
+        self.id = doc_id
+
+    def get(self, timeout=None):
+        self.collection.timeouts.append(timeout)
+        data = self.collection.docs.get(self.id)
+        return _result(self.collection, FakeSnapshot(self.id, data, self.collection.update_times.get(self.id)))
+
+    def set(self, data, timeout=None):
+        self.collection.timeouts.append(timeout)
+        self.collection.docs[self.id] = dict(data)
+        self.collection.touch(self.id)
+
+    def update(self, data, option=None, timeout=None):
+        self.collection.timeouts.append(timeout)
+        if self.id not in self.collection.docs:
+            raise KeyError(self.id)
+        if option is not None and option != self.collection.update_times[self.id]:
+            raise PreconditionFailed(self.id)
+        doc = self.collection.docs[self.id]
+        for key, value in data.items():
+            doc[key] = doc.get(key, 0) + value.value if isinstance(value, FakeIncrement) else value
+        self.collection.touch(self.id)
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=(), limit=None):
+        self.collection = collection
+        self.filters = filters
+        self._limit = limit
+
+    def where(self, field=None, op=None, value=None, filter=None):
+        condition = (filter.field_path, filter.op_string, filter.value) if filter else (field, op, value)
+        return FakeQuery(self.collection, self.filters + (condition,), self._limit)
+
+    def order_by(self, field, direction=None):
+        return self
+
+    def limit(self, count):
+        return FakeQuery(self.collection, self.filters, count)
+
+    def get(self, timeout=None):
+        self.collection.timeouts.append(timeout)
+        self.collection.queries += 1
+        matches = [
+            FakeSnapshot(doc_id, data, self.collection.update_times[doc_id])
+            for doc_id, data in self.collection.docs.items()
+            if all(
+                data.get(field) in value if op == "in" else data.get(field) == value
+                for field, op, value in self.filters
+            )
+        ]
+        return _result(self.collection, matches[:self._limit])
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self):
+        super().__init__(self)
+        self.docs = {}
+        self.update_times = {}
+        self.queries = 0
+        self.timeouts = []
+        self.yields = False
+        self._ids = itertools.count(1)
+        self._clock = itertools.count(1)
+
+    def document(self, doc_id=None):
+        return FakeDocument(self, doc_id or f"esc-{next(self._ids)}")
+
+    def touch(self, doc_id):
+        self.update_times[doc_id] = next(self._clock)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def write_option(self, last_update_time):
+        return last_update_time
+
+
+class FakeIncrement:
+    def __init__(self, value):
+        self.value = value
+
+
+@pytest.fixture(autouse=True)
+def fake_firestore_types(monkeypatch):
+    """Replace the Firestore helper types the agent builds queries with."""
+    monkeypatch.setattr(
+        escalation_module, "FieldFilter",
+        lambda field_path, op_string, value: SimpleNamespace(field_path=field_path, op_string=op_string, value=value)
+    )
+    monkeypatch.setattr(escalation_module, "firestore", SimpleNamespace(Increment=FakeIncrement))
+
+
+def _agent(db, **config):
+    agent = EscalationAgent(config)
+    agent.db = db
+    agent.escalation_collection = "escalations"
+    agent.interaction_collection = "interactions"
+    for key, value in config.items():
+        setattr(agent, key, value)
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_can_claim_an_escalation():
+    """Workers with their own queues cannot both claim the same ticket."""
+    db = FakeFirestore()
+    db.collection("escalations").document("esc-1").set({"status": "pending", "priority": "high"})
+    first, second = _agent(db), _agent(db)
+    await first.refresh_queue()
+    await second.refresh_queue()
+
+    assert (await first.claim_escalation("agent-a"))["id"] == "esc-1"
+    assert await second.claim_escalation("agent-b") is None
+    assert db.collection("escalations").docs["esc-1"]["assigned_agent"] == "agent-a"
+    assert "esc-1" not in second.queue
+
+
+def _escalate(agent, session_id="s1", priority="medium", history=None):
+    return agent._create_escalation_record(
+        user_id="u1", session_id=session_id, reason="test", priority=priority,
+        conversation_history=history or []
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeat_triggers_update_the_open_ticket():
+    """A session's open ticket is bumped instead of opening another one."""
+    db = FakeFirestore()
+    agent = _agent(db)
+
+    first = await _escalate(agent, priority="medium")
+    second = await _escalate(agent, priority="high")
+    third = await _escalate(agent, priority="low")
+
+    docs = db.collection("escalations").docs
+    assert first == second == third
+    assert list(docs) == [first]
+    assert docs[first]["trigger_count"] == 3
+    assert docs[first]["priority"] == "high"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_triggers_are_serialized_per_session():
+    """Triggers racing on one session open a single ticket; other sessions are independent."""
+    db = FakeFirestore()
+    db.collection("escalations").yields = True
+    agent = _agent(db)
+
+    ids = await asyncio.gather(*(_escalate(agent) for _ in range(5)), _escalate(agent, session_id="s2"))
+
+    assert len(set(ids[:5])) == 1
+    assert ids[5] != ids[0]
+    assert len(db.collection("escalations").docs) == 2
+    assert agent._session_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_ticket_closed_elsewhere_is_not_reused():
+    """A cached ticket resolved by another worker does not absorb new triggers."""
+    db = FakeFirestore()
+    agent = _agent(db)
+    first = await _escalate(agent)
+
+    db.collection("escalations").document(first).update({"status": "resolved"})
+    second = await _escalate(agent)
+
+    docs = db.collection("escalations").docs
+    assert second != first
+    assert docs[first]["trigger_count"] == 1
+    assert docs[second]["status"] == "pending"
+    assert agent._open_escalations == {"s1": second}
+
+
+@pytest.mark.asyncio
+async def test_open_ticket_cache_is_bounded():
+    """Only the most recently used sessions keep their cached ticket ID."""
+    agent = _agent(FakeFirestore(), open_escalation_cache_size=2)
+
+    for session_id in ("s1", "s2", "s3"):
+        await _escalate(agent, session_id=session_id)
+
+    assert list(agent._open_escalations) == ["s2", "s3"]
+    assert len(agent._open_escalation_sessions) == 2
+
+
+def test_conversation_snapshot_is_bounded():
+    """Snapshots keep the latest turns, truncate long ones and fit the byte budget."""
+    agent = _agent(
+        FakeFirestore(), snapshot_max_messages=3, snapshot_max_message_chars=20, snapshot_max_bytes=10_000
+    )
+    history = [{"id": f"t{i}", "role": "user", "message": f"turn {i}", "extra": "x"} for i in range(5)]
+    history[-1]["message"] = "y" * 100
+
+    snapshot, omitted = agent._build_conversation_snapshot(history)
+
+    assert [turn["id"] for turn in snapshot] == ["t2", "t3", "t4"]
+    assert omitted == ["t0", "t1"]
+    assert "extra" not in snapshot[0]
+    assert snapshot[-1]["message"] == "y" * 20 + "..." and snapshot[-1]["truncated"]
+
+    # Budget for the last two turns only
+    agent.snapshot_max_bytes = sum(len(json.dumps(turn)) for turn in snapshot[1:])
+    snapshot, omitted = agent._build_conversation_snapshot(history)
+    assert [turn["id"] for turn in snapshot] == ["t3", "t4"]
+    assert omitted == ["t0", "t1", "t2"]
+
+
+@pytest.mark.asyncio
+async def test_every_store_call_has_a_timeout():
+    """Reads and writes of escalation records carry the configured Firestore timeout."""
+    db = FakeFirestore()
+    agent = _agent(db, firestore_timeout=2.0)
+
+    await _escalate(agent)
+    await _escalate(agent, priority="high")
+    agent._open_escalations.clear()
+    await _escalate(agent)
+    await agent.refresh_queue()
+    record = await agent.claim_escalation("agent-a")
+    await agent.update_escalation_status(record["id"], "resolved")
+
+    timeouts = db.collection("escalations").timeouts
+    assert len(timeouts) >= 8
+    assert all(timeout is not None and 0 < timeout <= 2.0 for timeout in timeouts)
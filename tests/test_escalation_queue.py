@@ -0,0 +1,91 @@
+"""
+Tests for the in-process escalation priority queue.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from neoserve_ai.agents.escalation_queue import EscalationQueue
+
+
+def _record(escalation_id, priority, minutes_ago):
+    return {
+        "id": escalation_id,
+        "priority": priority,
+        "status": "pending",
+        "created_at": datetime.utcnow() - timedelta(minutes=minutes_ago),
+    }
+
+
+def test_peek_orders_by_priority_then_age():
+    """Higher priority escalations come first, oldest first within a priority."""
+    queue = EscalationQueue()
+    queue.push(_record("low-old", "low", 60))
+    queue.push(_record("high-new", "high", 1))
+    queue.push(_record("high-old", "high", 30))
+    queue.push(_record("critical", "critical", 0))
+
+    assert [r["id"] for r in queue.peek()] == ["critical", "high-old", "high-new", "low-old"]
+    assert [r["id"] for r in queue.peek(priority="high", limit=1)] == ["high-old"]
+
+
+def test_claim_is_exclusive():
+    """An escalation can only be claimed once."""
+    queue = EscalationQueue()
+    queue.push(_record("esc-1", "medium", 5))
+
+    first = queue.claim("esc-1", "agent-a")
+    second = queue.claim("esc-1", "agent-b")
+
+    assert first["assigned_agent"] == "agent-a"
+    assert second is None
+    assert len(queue) == 0
+
+
+def test_claim_next_skips_claimed_and_reranked_entries():
+    """Stale heap entries left by claims and re-ranking are never dispatched."""
+    queue = EscalationQueue()
+    queue.push(_record("a", "low", 10))
+    queue.push(_record("b", "medium", 10))
+    queue.push(_record("c", "medium", 5))
+    queue.claim("b", "agent-a")
+    queue.push({**_record("a", "critical", 10)})
+
+    assert queue.claim_next("agent-b")["id"] == "a"
+    assert queue.claim_next("agent-b")["id"] == "c"
+    assert queue.claim_next("agent-b") is None
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_queue_changes():
+    """Subscribers get a push event for every change to the queue."""
+    queue = EscalationQueue()
+    feed = queue.subscribe()
+
+    queue.push(_record("esc-1", "high", 0))
+    queue.claim("esc-1", "agent-a")
+
+    added = feed.get_nowait()
+    claimed = feed.get_nowait()
+    assert added["event"] == "added" and added["depth"] == 1
+    assert claimed["event"] == "claimed" and claimed["assigned_agent"] == "agent-a"
+
+    queue.unsubscribe(feed)
+    queue.push(_record("esc-2", "low", 0))
+    assert feed.empty()
+
+
+def test_claim_next_with_priority_only_takes_that_priority():
+    """A priority filter claims from that priority's heap, oldest first."""
+    queue = EscalationQueue()
+    queue.push(_record("critical", "critical", 0))
+    queue.push(_record("low-new", "low", 1))
+    queue.push(_record("low-old", "low", 30))
+    queue.claim("low-old", "agent-a")
+    queue.push(_record("low-old", "low", 30))
+
+    assert queue.claim_next("agent-b", priority="low")["id"] == "low-old"
+    assert queue.claim_next("agent-b", priority="low")["id"] == "low-new"
+    assert queue.claim_next("agent-b", priority="low") is None
+    assert queue.claim_next("agent-b", priority="high") is None
+    assert [r["id"] for r in queue.peek()] == ["critical"]
@@ -0,0 +1,51 @@
+"""
+Tests for the single-pass chat response encoding.
+"""
+import json
+
+from neoserve_ai.schemas.chat import ChatResponse, build_chat_response_payload
+from neoserve_ai.utils import fast_json
+from neoserve_ai.utils.fast_json import FastJSONResponse
+
+
+ESCALATED_RESULT = {
+    "response": "Connecting you with an agent.",
+    "intent": "escalation",
+    "confidence": 1,
+    "source": "escalation_agent",
+    "sources": [{"title": "Support hours", "url": "https://help.example.com/hours", "snippet": "24/7"}],
+    "escalation": {
+        "escalated": True,
+        "escalation_id": "esc-1",
+        "reason": "customer_request",
+        "priority": "high",
+        "timestamp": "2024-05-01T12:00:00"
+    },
+}
+
+
+def test_payload_matches_the_response_model():
+    """The payload encodes to the same JSON as the validated ChatResponse."""
+    payload = build_chat_response_payload("session-1", ESCALATED_RESULT)
+    model = ChatResponse.model_validate(payload)
+
+    assert json.loads(FastJSONResponse(payload).body) == json.loads(model.model_dump_json())
+    assert payload["confidence"] == 1.0 and isinstance(payload["confidence"], float)
+    assert "escalation_id" not in payload["escalation"]
+
+
+def test_missing_fields_get_defaults():
+    """An empty orchestrator result still produces a complete response."""
+    payload = build_chat_response_payload("session-1", {})
+
+    assert ChatResponse.model_validate(payload).response == "No response generated"
+    assert payload["sources"] == [] and payload["escalation"] is None
+
+
+def test_json_fallback_without_orjson(monkeypatch):
+    """Without orjson the standard library encodes the same document."""
+    payload = build_chat_response_payload("session-1", ESCALATED_RESULT)
+    encoded = fast_json.dumps(payload)
+
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert json.loads(fast_json.dumps(payload)) == json.loads(encoded)
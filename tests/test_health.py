@@ -0,0 +1,85 @@
+"""
+Tests for agent health and worker readiness reporting.
+"""
+from neoserve_ai.agents.base_agent import BaseAgent
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.utils.circuit_breaker import CircuitBreaker
+
+
+class _DependencyAgent(BaseAgent):
+    def __init__(self, client=None):
+        self.client = client
+        self.circuit_breaker = CircuitBreaker("test_dependency", window_size=4, minimum_calls=4)
+        super().__init__("test_agent")
+
+    def is_initialized(self) -> bool:
+        return self.client is not None
+
+    async def process(self, input_data):
+        return {}
+
+
+def test_agent_health_reflects_initialization_and_error_rate():
+    """Agents without a client run on fallback; failing dependencies degrade them."""
+    assert _DependencyAgent().health()["status"] == "fallback"
+
+    agent = _DependencyAgent(client=object())
+    for latency in (0.1, 0.2, 0.3):
+        agent.circuit_breaker.record_success(latency)
+    health = agent.health()
+    assert health["status"] == "operational"
+    assert health["dependency"] == "test_dependency"
+    assert health["latency_p50_seconds"] == 0.2
+
+    agent.circuit_breaker.record_failure(0.1)
+    agent.circuit_breaker.record_failure(0.1)
+    assert agent.health(max_error_rate=0.25)["status"] == "degraded"
+
+
+def test_readiness_requires_initialization_and_required_agents():
+    """A worker is ready once initialized and every required agent is operational."""
+    orchestrator = AgentOrchestrator(config={})
+    assert orchestrator.health_report()["ready"] is False
+
+    orchestrator.initialized = True
+    orchestrator.agents = {"knowledge_base": _DependencyAgent(client=object()), "escalation": _DependencyAgent()}
+    report = orchestrator.health_report()
+    assert report["ready"] is True
+    assert report["status"] == "degraded"
+
+    report = orchestrator.health_report(required_agents=["knowledge_base", "escalation"])
+    assert report["ready"] is False
+    assert report["unavailable_agents"] == ["escalation"]
+
+
+class _NoFallbackAgent(_DependencyAgent):
+    has_local_fallback = False
+
+
+def test_readiness_requires_agents_without_fallback_by_default():
+    """Agents that cannot answer without their dependency are required unless configured."""
+    orchestrator = AgentOrchestrator(config={})
+    orchestrator.initialized = True
+    orchestrator.agents = {"knowledge_base": _NoFallbackAgent(), "intent_classifier": _DependencyAgent()}
+
+    report = orchestrator.health_report()
+    assert report["ready"] is False
+    assert report["required_agents"] == ["knowledge_base"]
+    assert report["unavailable_agents"] == ["knowledge_base"]
+
+    assert orchestrator.health_report(required_agents=[])["ready"] is True
+
+
+def test_legacy_health_endpoint_reports_readiness(monkeypatch):
+    """/health answers with the readiness status code instead of a fixed 'ok'."""
+    from fastapi.testclient import TestClient
+
+    from neoserve_ai import main
+
+    monkeypatch.setattr(main, "readiness_report", lambda: {"ready": False, "status": "unavailable"})
+    response = TestClient(main.app).get("/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+    monkeypatch.setattr(main, "readiness_report", lambda: {"ready": True, "status": "operational"})
+    assert TestClient(main.app).get("/health").status_code == 200
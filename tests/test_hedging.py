@@ -0,0 +1,102 @@
+"""
+Tests for hedged idempotent reads.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from neoserve_ai.agents.personalization_agent import PersonalizationAgent
+from neoserve_ai.utils.circuit_breaker import CircuitBreaker
+from neoserve_ai.utils.hedging import Hedger
+
+
+def _warm(hedger: Hedger, latency: float, count: int = 20) -> None:
+    for _ in range(count):
+        hedger._attempt_latencies.append(latency)
+
+
+@pytest.mark.asyncio
+async def test_slow_first_attempt_is_hedged_and_backup_wins():
+    """A first attempt slower than the quantile gets a backup, and the faster answer wins."""
+    hedger = Hedger("discovery_engine", min_samples=20, min_delay=0.0)
+    _warm(hedger, 0.01)
+    delays = [0.5, 0.0]
+
+    async def search():
+        await asyncio.sleep(delays.pop(0))
+        return "result"
+
+    assert await asyncio.wait_for(hedger.call(search), 0.3) == "result"
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_before_enough_samples_or_when_disabled():
+    """Hedging needs a latency estimate and is off when the hedger is disabled."""
+    attempts = []
+
+    async def read():
+        attempts.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    assert await Hedger("firestore", min_samples=20).call(read) == "ok"
+    disabled = Hedger("firestore", enabled=False, min_samples=0)
+    assert await disabled.call(read) == "ok"
+    assert len(attempts) == 2
+    assert disabled.stats()["calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_caps_extra_attempts():
+    """Once the token budget is spent, slow calls wait for their first attempt."""
+    hedger = Hedger("vertex_ai", min_delay=0.0, budget_ratio=0.0, max_tokens=1.0)
+    # Enough fast samples that the slow attempts below do not move the p95
+    _warm(hedger, 0.001, count=100)
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    for _ in range(3):
+        assert await hedger.call(slow) == "ok"
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["budget_exhausted"] == 2
+
+
+class _SyncDocument:
+    """Blocking document reference, like the synchronous Firestore client's."""
+
+    def __init__(self, delays):
+        self.delays = delays
+
+    def get(self, timeout=None):
+        time.sleep(self.delays.pop(0))
+        return SimpleNamespace(exists=True, to_dict=lambda: {"preferences": {"tone": "formal"}})
+
+
+@pytest.mark.asyncio
+async def test_hedged_reads_through_a_synchronous_client():
+    """Synchronous client reads run in threads, so they are hedged and not counted as failures."""
+    for enabled in (False, True):
+        document = _SyncDocument([0.5, 0.0] if enabled else [0.0])
+        agent = PersonalizationAgent(config={})
+        agent.db = SimpleNamespace(collection=lambda name: SimpleNamespace(document=lambda user_id: document))
+        agent.user_collection = "users"
+        agent.circuit_breaker = CircuitBreaker("test_firestore")
+        agent.hedger = Hedger("firestore", enabled=enabled, min_samples=20, min_delay=0.0)
+        _warm(agent.hedger, 0.01)
+
+        profile = await asyncio.wait_for(agent._get_user_profile("u1"), 0.4)
+        assert profile["preferences"] == {"tone": "formal"}
+        assert agent.circuit_breaker.snapshot()["failure_rate"] == 0.0
+        assert agent.hedger.stats()["hedge_wins"] == (1 if enabled else 0)
+
+    # Plain synchronous callables are accepted as well
+    assert await Hedger("firestore").call(lambda: "ok") == "ok"
+    assert await Hedger("firestore", enabled=False).call(lambda: "ok") == "ok"
@@ -0,0 +1,148 @@
+"""
+Tests for the idempotency cache used for retried chat turns.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from neoserve_ai.api.api_v1.deps import get_optional_user
+from neoserve_ai.api.api_v1.endpoints import chat as chat_endpoints
+from neoserve_ai.main import app
+from neoserve_ai.models.user import UserInDB
+from neoserve_ai.utils.idempotency import IdempotencyCache
+
+
+@pytest.mark.asyncio
+async def test_retries_are_answered_from_cache():
+    """A completed request is replayed for retries with the same key."""
+    calls = []
+
+    async def turn():
+        calls.append(1)
+        return f"response-{len(calls)}"
+
+    cache = IdempotencyCache(ttl_seconds=60)
+    first = await cache.run(("s1", "m1"), turn)
+    retry = await cache.run(("s1", "m1"), turn)
+    other = await cache.run(("s1", "m2"), turn)
+
+    assert first == ("response-1", False)
+    assert retry == ("response-1", True)
+    assert other == ("response-2", False)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_the_first_request():
+    """Duplicates arriving mid-flight share the in-flight request."""
+    calls = 0
+
+    async def turn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    cache = IdempotencyCache()
+    results = await asyncio.gather(*(cache.run("key", turn) for _ in range(3)))
+
+    assert calls == 1
+    assert [replayed for _, replayed in results] == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_failures_and_uncacheable_results_are_not_kept():
+    """Errors and results rejected by the predicate let the next retry run again."""
+    cache = IdempotencyCache()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.run("a", fail)
+
+    async def error_response():
+        return "error"
+
+    await cache.run("a", error_response, cacheable=lambda result: result != "error")
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    """Retries after the idempotency window run the request again."""
+    cache = IdempotencyCache(ttl_seconds=0.01)
+
+    async def turn():
+        return "ok"
+
+    await cache.run("k", turn)
+    await asyncio.sleep(0.02)
+    assert await cache.run("k", turn) == ("ok", False)
+
+
+@pytest.mark.asyncio
+async def test_eviction_keeps_in_flight_requests():
+    """Over the entry limit, completed entries are evicted before running ones."""
+    cache = IdempotencyCache(max_entries=2)
+    release = asyncio.Event()
+    calls = []
+
+    async def slow():
+        calls.append("slow")
+        await release.wait()
+        return "slow"
+
+    async def fast():
+        return "fast"
+
+    running = asyncio.ensure_future(cache.run("running", slow))
+    await asyncio.sleep(0)
+    await cache.run("done-1", fast)
+    await cache.run("done-2", fast)
+
+    assert "running" in cache and "done-1" not in cache and "done-2" in cache
+    duplicate = asyncio.ensure_future(cache.run("running", slow))
+    release.set()
+    assert await running == ("slow", False)
+    assert await duplicate == ("slow", True)
+    assert calls == ["slow"]
+
+
+def test_streamed_turns_are_idempotent(monkeypatch):
+    """A retried streamed turn replays the first response without running again."""
+    calls = []
+
+    class FakeOrchestrator:
+        agents = {}
+
+        def claim_session(self, session_id, user_id):
+            return True
+
+        async def process_message(self, message, session_id, user_id, metadata, emit=None):
+            calls.append(message)
+            await emit("intent", {"intent": "greeting"})
+            return {"response": f"reply {len(calls)}", "intent": "greeting"}
+
+    monkeypatch.setattr(chat_endpoints, "orchestrator", FakeOrchestrator())
+    monkeypatch.setattr(chat_endpoints, "idempotency_cache", IdempotencyCache())
+    app.dependency_overrides[get_optional_user] = lambda: UserInDB(
+        id=3, username="streamer", email="streamer@example.com", hashed_password="", is_active=True
+    )
+    try:
+        client = TestClient(app)
+        body = {"message": "hello", "session_id": "s1", "message_id": "m1"}
+        first = client.post("/api/v1/chat/stream", json=body)
+        retry = client.post("/api/v1/chat/stream", json=body)
+    finally:
+        app.dependency_overrides.pop(get_optional_user, None)
+
+    def events(response):
+        return [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+
+    assert events(first) == ["intent", "response", "done"]
+    assert events(retry) == ["response", "done"]
+    assert "reply 1" in retry.text
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert calls == ["hello"]
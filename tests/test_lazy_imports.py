@@ -0,0 +1,53 @@
+"""
+Tests for lazy Google Cloud imports and the import-time profile.
+"""
+import sys
+
+from neoserve_ai.agents.google_imports import LazyImport
+from neoserve_ai.utils.import_profile import by_package, format_report, parse_importtime
+
+
+def test_lazy_import_defers_until_first_use():
+    """Nothing is imported until the proxy is used; calls reach the target."""
+    sys.modules.pop("colorsys", None)
+    loaded = []
+    proxy = LazyImport("colorsys", "rgb_to_hsv", on_load=loaded.append)
+
+    assert "colorsys" not in sys.modules
+    assert not proxy.loaded
+
+    assert proxy(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert proxy.loaded
+    assert [module.__name__ for module in loaded] == ["colorsys"]
+
+
+def test_missing_library_is_falsy():
+    """A proxy for a library that is not installed is falsy and raises ImportError on use."""
+    proxy = LazyImport("neoserve_ai_missing_sdk", "Client")
+
+    assert not proxy
+    try:
+        proxy()
+    except ImportError:
+        pass
+    else:
+        raise AssertionError("expected ImportError")
+
+
+def test_parse_importtime_output():
+    """Import-time lines are parsed with their nesting depth and summed per package."""
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     google.cloud.firestore_v1.types",
+        "import time:      3000 |       3120 |   google.cloud.firestore",
+        "import time:       400 |       3520 | neoserve_ai.agents",
+    ])
+
+    timings = parse_importtime(output)
+    assert [(t.module, t.depth) for t in timings] == [
+        ("google.cloud.firestore_v1.types", 2),
+        ("google.cloud.firestore", 1),
+        ("neoserve_ai.agents", 0),
+    ]
+    assert by_package(timings) == {"google": 3120, "neoserve_ai": 400}
+    assert "Total import time: 3.5 ms over 3 modules" in format_report(timings)
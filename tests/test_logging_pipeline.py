@@ -0,0 +1,66 @@
+"""
+Tests for the asynchronous, sampled logging pipeline.
+"""
+import logging
+import queue
+
+from neoserve_ai.utils.logging_pipeline import (
+    LOG_RECORDS_DROPPED,
+    BoundedQueueHandler,
+    LazyJson,
+    LoggingPipeline,
+    SamplingFilter,
+    parse_sample_rates,
+)
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def _record(name="neoserve_ai.test", level=logging.INFO, msg="hello", args=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_pipeline_writes_records_from_listener_thread():
+    """Records reach the original handlers, with lazy JSON formatted by the listener."""
+    target = logging.getLogger("neoserve_ai.test_pipeline")
+    target.propagate = False
+    handler = _ListHandler()
+    target.addHandler(handler)
+
+    pipeline = LoggingPipeline(max_message_chars=20)
+    pipeline.install([target])
+    try:
+        target.warning("%s", LazyJson({"model": "intent_classifier"}))
+        target.warning("x" * 100)
+    finally:
+        pipeline.stop()
+        target.removeHandler(handler)
+
+    assert handler.messages[0] == '{"model": "intent_classifier"}'
+    assert handler.messages[1].startswith("x" * 20 + "... [truncated 80 chars]")
+    assert target.handlers == []
+
+
+def test_full_queue_drops_and_counts_records():
+    """A full queue drops records instead of blocking the caller."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    before = LOG_RECORDS_DROPPED.value()
+    handler.handle(_record())
+    handler.handle(_record())
+    assert LOG_RECORDS_DROPPED.value() == before + 1
+
+
+def test_sampling_applies_to_matching_categories_below_warning():
+    """Sampled categories drop INFO records; warnings and other loggers always pass."""
+    sampler = SamplingFilter(parse_sample_rates("vertex_ai=0, neoserve_ai=1, bogus"))
+    assert not sampler.filter(_record(name="vertex_ai"))
+    assert sampler.filter(_record(name="vertex_ai", level=logging.WARNING))
+    assert sampler.filter(_record(name="neoserve_ai.agents"))
+    assert sampler.filter(_record(name="uvicorn"))
@@ -0,0 +1,62 @@
+"""
+Tests for the metrics registry and span tracing.
+"""
+import pytest
+
+from neoserve_ai.utils import tracing
+from neoserve_ai.utils.deadline import STAGE_DURATION, run_stage
+from neoserve_ai.utils.metrics import MetricsRegistry, Counter, Gauge, Histogram
+
+
+def test_registry_renders_prometheus_text():
+    """Counters, callback gauges and histograms render in the exposition format."""
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("test_requests_total", "Requests", ["cache", "result"]))
+    registry.register(Gauge("test_queue_depth", "Queue depth", callback=lambda: 3))
+    latency = registry.register(Histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0)))
+
+    requests.inc(cache="kb", result="hit")
+    requests.inc(2, cache="kb", result="hit")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{cache="kb",result="hit"} 3' in text
+    assert "test_queue_depth 3" in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_latency_seconds_count 3" in text
+
+
+def test_register_returns_existing_metric_and_rejects_conflicts():
+    """Declaring a metric twice shares it; redeclaring it with another type fails."""
+    registry = MetricsRegistry()
+    first = registry.register(Counter("test_total", "Total"))
+    assert registry.register(Counter("test_total", "Total")) is first
+    with pytest.raises(ValueError):
+        registry.register(Gauge("test_total", "Total"))
+
+
+@pytest.mark.asyncio
+async def test_stages_are_timed_and_traced_when_enabled():
+    """Stages feed the stage histogram and become child spans of the turn's trace."""
+    async def stage():
+        return "ok"
+
+    before = STAGE_DURATION.count(stage="test_stage")
+    with tracing.start_trace("chat_turn") as disabled:
+        await run_stage("test_stage", stage(), lambda: "fallback")
+    assert not isinstance(disabled, tracing.Span)
+    assert STAGE_DURATION.count(stage="test_stage") == before + 1
+
+    tracing.configure_tracing(enabled=True)
+    try:
+        with tracing.start_trace("chat_turn") as root:
+            await run_stage("test_stage", stage(), lambda: "fallback")
+    finally:
+        tracing.configure_tracing(enabled=False)
+    assert [child.name for child in root.children] == ["stage.test_stage"]
+    assert root.end is not None
@@ -0,0 +1,66 @@
+"""
+Tests for off-loop password hashing.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from neoserve_ai.utils.admission import Overloaded
+from neoserve_ai.utils.password_hashing import PASSWORD_HASH_REJECTIONS, PasswordHasher
+
+
+class _SlowContext:
+    """Stand-in for a CryptContext that blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = set()
+
+    def hash(self, password):
+        self.threads.add(threading.current_thread().name)
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify(self, password, hashed_password):
+        self.threads.add(threading.current_thread().name)
+        return hashed_password == f"hashed:{password}"
+
+
+@pytest.mark.asyncio
+async def test_hashing_runs_on_pool_threads():
+    """Hash and verify run on the pool, not on the event loop thread."""
+    context = _SlowContext()
+    context.release.set()
+    hasher = PasswordHasher(context, max_workers=1)
+    try:
+        hashed = await hasher.hash("secret")
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+    finally:
+        hasher.shutdown()
+
+    assert context.threads and all(name.startswith("password-hash") for name in context.threads)
+
+
+@pytest.mark.asyncio
+async def test_full_pool_rejects_new_requests():
+    """Beyond max_pending, requests fail fast with Overloaded and the loop stays responsive."""
+    context = _SlowContext()
+    hasher = PasswordHasher(context, max_workers=1, max_pending=2)
+    rejected_before = PASSWORD_HASH_REJECTIONS.value()
+    try:
+        running = [asyncio.create_task(hasher.hash(f"p{i}")) for i in range(2)]
+        await asyncio.sleep(0.01)
+        assert hasher.pending == 2
+
+        with pytest.raises(Overloaded):
+            await hasher.verify("p0", "hashed:p0")
+        assert PASSWORD_HASH_REJECTIONS.value() == rejected_before + 1
+
+        context.release.set()
+        assert await asyncio.gather(*running) == ["hashed:p0", "hashed:p1"]
+        assert hasher.pending == 0
+    finally:
+        context.release.set()
+        hasher.shutdown()
@@ -0,0 +1,57 @@
+"""
+Tests for pre-fork warm-up and single agent initialization.
+"""
+import gc
+
+import pytest
+
+from neoserve_ai.agents.escalation_agent import EscalationAgent
+from neoserve_ai.agents.intent_classifier import IntentClassifierAgent
+from neoserve_ai.agents.knowledge_agent import KnowledgeBaseAgent
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.agents.personalization_agent import PersonalizationAgent
+from neoserve_ai.agents.proactive_engagement_agent import ProactiveEngagementAgent
+from neoserve_ai.agents.preload import enabled_agents, preload_shared_state
+
+
+def test_enabled_agents_follow_agent_configuration():
+    """Only agents that will create a client have their SDKs preloaded."""
+    config = {
+        "intent_classifier": {"project_id": "p", "endpoint_id": ""},
+        "knowledge_base": {"project_id": "p", "search_engine_id": "engine"},
+        "personalization": {"enable_personalization": False},
+        "proactive_engagement": {"project_id": "p", "enable_proactive_engagement": True},
+        "escalation": {},
+    }
+
+    assert enabled_agents(config) == ["knowledge_base", "proactive_engagement"]
+
+
+def test_preload_without_enabled_agents_only_freezes():
+    """With nothing enabled no SDK is imported, and the heap is frozen."""
+    config = {"personalization": {"enable_personalization": False}}
+    try:
+        summary = preload_shared_state(config)
+        assert summary["agents"] == []
+        assert summary["unavailable_sdks"] == []
+        assert summary["frozen_objects"] > 0
+    finally:
+        gc.unfreeze()
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_initializes_each_agent_once(monkeypatch):
+    """Agent clients are created once, by the orchestrator, not also by the constructor."""
+    calls = []
+    for cls in (IntentClassifierAgent, KnowledgeBaseAgent, PersonalizationAgent,
+                ProactiveEngagementAgent, EscalationAgent):
+        monkeypatch.setattr(cls, "initialize_agent", lambda self: calls.append(type(self).__name__))
+
+    orchestrator = AgentOrchestrator(config={})
+    await orchestrator.initialize()
+
+    assert orchestrator.initialized
+    assert sorted(calls) == sorted(
+        ["IntentClassifierAgent", "KnowledgeBaseAgent", "PersonalizationAgent",
+         "ProactiveEngagementAgent", "EscalationAgent"]
+    )
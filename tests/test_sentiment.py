@@ -0,0 +1,49 @@
+"""
+Tests for the lexicon-based sentiment scorer.
+"""
+import numpy as np
+
+from neoserve_ai.utils.sentiment import LexiconSentimentScorer
+
+scorer = LexiconSentimentScorer()
+
+
+def test_words_are_matched_as_tokens():
+    """Lexicon words inside other words ("hate" in "whatever") do not count."""
+    assert scorer.score("whatever works for you") > 0
+    assert scorer.score("whatever") == 0.0
+
+
+def test_negation_flips_sentiment():
+    """A negator within the window flips the valence of the following term."""
+    assert scorer.score("this is bad") < 0
+    assert scorer.score("this is not bad") > 0
+    assert scorer.score("not really that great") < 0
+
+
+def test_intensifiers_and_exclamations_strengthen_sentiment():
+    """Intensifiers and exclamation marks push the score further from zero."""
+    plain = scorer.score("I am frustrated")
+    assert scorer.score("I am extremely frustrated") < plain
+    assert scorer.score("I am frustrated!!!") < plain
+
+
+def test_emoji_are_scored():
+    """Emoji carry sentiment like words do."""
+    assert scorer.score("my order \U0001F621") < 0
+    assert scorer.score("thanks \U0001F44D") > 0
+
+
+def test_batch_matches_single_message_scores():
+    """Batch scoring produces the same scores as scoring one message at a time."""
+    messages = [
+        "This is the worst service ever!!",
+        "",
+        "not bad at all, thanks :)",
+        "I am so angry \U0001F620 nothing works",
+        "whatever",
+        "really really terrible",
+    ]
+    expected = np.array([scorer.score(message) for message in messages])
+    np.testing.assert_allclose(scorer.score_batch(messages), expected)
+    assert scorer.score_batch([]).shape == (0,)
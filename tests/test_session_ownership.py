@@ -0,0 +1,69 @@
+"""
+Tests for keeping chat sessions to the user who started them.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.api.api_v1.deps import get_optional_user
+from neoserve_ai.api.api_v1.endpoints import chat as chat_endpoints
+from neoserve_ai.main import app
+from neoserve_ai.models.user import UserInDB
+
+
+def _user(user_id):
+    return UserInDB(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com",
+                    hashed_password="", is_active=True)
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    orchestrator = AgentOrchestrator(config={})
+    orchestrator.session_owners["owned"] = "1"
+
+    async def process_message(message, session_id, user_id, metadata=None, emit=None):
+        return {"response": f"re: {message}", "intent": "general_inquiry", "confidence": 1.0, "source": "test"}
+
+    orchestrator.process_message = process_message
+    monkeypatch.setattr(chat_endpoints, "orchestrator", orchestrator)
+    return orchestrator
+
+
+def test_sessions_are_claimed_by_their_first_user():
+    """A new session belongs to the first user who uses it; others are refused."""
+    orchestrator = AgentOrchestrator(config={})
+
+    assert orchestrator.claim_session("s1", "1")
+    assert orchestrator.claim_session("s1", "1")
+    assert not orchestrator.claim_session("s1", "2")
+    assert orchestrator.get_session_owner("s1") == "1"
+
+
+def test_turns_to_another_users_session_are_not_found(orchestrator):
+    """POST /chat and /chat/stream answer 404 for a session owned by someone else."""
+    app.dependency_overrides[get_optional_user] = lambda: _user(2)
+    try:
+        client = TestClient(app)
+        for path in ("/api/v1/chat", "/api/v1/chat/stream"):
+            response = client.post(path, json={"message": "hi", "session_id": "owned"})
+            assert response.status_code == 404
+        assert client.post("/api/v1/chat", json={"message": "hi", "session_id": "mine"}).status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_optional_user, None)
+    assert orchestrator.get_session_owner("mine") == "2"
+
+
+def test_websocket_to_another_users_session_is_closed(orchestrator, monkeypatch):
+    """Subscribing to someone else's session closes the socket with a policy violation."""
+    monkeypatch.setattr(chat_endpoints, "resolve_user_from_token", lambda token: _user(2))
+    client = TestClient(app)
+
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/api/v1/chat/ws?session_id=owned"):
+            pass
+    assert closed.value.code == 1008
+    assert "owned" not in orchestrator.session_listeners
+
+    with client.websocket_connect("/api/v1/chat/ws?session_id=mine") as ws:
+        assert ws.receive_json() == {"type": "session", "session_id": "mine"}
@@ -0,0 +1,98 @@
+"""
+Tests for checkpointing the session store to a local snapshot.
+"""
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from neoserve_ai.agents.conversation import MessageRecord
+from neoserve_ai.agents.orchestrator import AgentOrchestrator
+from neoserve_ai.agents.snapshot import SessionSnapshot, encode_session, write_snapshot
+from neoserve_ai.schemas.chat import MAX_SESSION_ID_LENGTH, ChatRequest
+
+
+def _orchestrator(path, **config):
+    return AgentOrchestrator(config={
+        "max_history_size": 4, "history_fold_size": 2, "session_snapshot_path": str(path), **config
+    })
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_a_restart(tmp_path):
+    """A new orchestrator restores messages and summaries from the snapshot on first use."""
+    path = tmp_path / "sessions.snapshot"
+    before = _orchestrator(path)
+    for i in range(5):
+        before._add_to_history("s1", "user", f"Order #1234{i} is missing", {"intent": "billing"})
+    before._add_to_history("s2", "assistant", "hello")
+    assert await before.checkpoint_sessions() == 2
+    before.close_session_snapshot()
+
+    after = _orchestrator(path)
+    assert after.load_session_snapshot() == 2
+    assert after.conversation_history == {}
+
+    assert [m["content"] for m in after._get_conversation_history("s1")] == [
+        m["content"] for m in before._get_conversation_history("s1")
+    ]
+    assert after._get_conversation_summary("s1") == before._get_conversation_summary("s1")
+    # Only the session that was looked up has been decoded
+    assert list(after.conversation_history) == ["s1"]
+    assert "s2" in after.session_snapshot
+    after.close_session_snapshot()
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_merge_other_writers_and_drop_stale_sessions(tmp_path):
+    """Sessions already in the file are kept unless replaced by a newer copy or expired."""
+    path = str(tmp_path / "sessions.snapshot")
+    write_snapshot(path, [
+        ("other-worker", 4102444800.0, encode_session([], None)),
+        ("stale", 1.0, encode_session([], None)),
+        ("s1", time.time() - 60, encode_session([], None)),
+        ("s2", 4102444800.0, encode_session([MessageRecord("user", "file copy", 4102444800.0)], None)),
+    ])
+
+    orchestrator = _orchestrator(path, session_snapshot_max_age_seconds=3600)
+    orchestrator._add_to_history("s1", "user", "newer copy")
+    orchestrator._add_to_history("s2", "user", "older copy")
+    assert await orchestrator.checkpoint_sessions() == 3
+
+    snapshot = SessionSnapshot.open(path)
+    assert sorted(session_id for session_id, _, _ in snapshot.entries()) == ["other-worker", "s1", "s2"]
+    assert [m.content for m in snapshot.pop("s1")[0]] == ["newer copy"]
+    assert [m.content for m in snapshot.pop("s2")[0]] == ["file copy"]
+    snapshot.close()
+    orchestrator.close_session_snapshot()
+
+
+def test_oversized_session_ids_are_skipped(tmp_path):
+    """Session IDs longer than a record header can describe are left out of the snapshot."""
+    path = str(tmp_path / "sessions.snapshot")
+    assert write_snapshot(path, [
+        ("x" * 70000, 4102444800.0, encode_session([], None)),
+        ("ok", 4102444800.0, encode_session([], None)),
+    ]) == 1
+
+    snapshot = SessionSnapshot.open(path)
+    assert len(snapshot) == 1 and "ok" in snapshot
+    snapshot.close()
+
+    with pytest.raises(ValidationError):
+        ChatRequest(message="hi", session_id="x" * (MAX_SESSION_ID_LENGTH + 1))
+
+
+def test_truncated_or_foreign_files_are_tolerated(tmp_path):
+    """A partially written file keeps its complete records; other files are ignored."""
+    path = tmp_path / "sessions.snapshot"
+    write_snapshot(str(path), [("a", 4102444800.0, encode_session([], None)),
+                               ("b", 4102444800.0, encode_session([], None))])
+    path.write_bytes(path.read_bytes()[:-3])
+    snapshot = SessionSnapshot.open(str(path))
+    assert "a" in snapshot and "b" not in snapshot
+    snapshot.close()
+
+    path.write_bytes(b"not a snapshot file")
+    assert SessionSnapshot.open(str(path)) is None
+    assert SessionSnapshot.open(str(tmp_path / "missing")) is None
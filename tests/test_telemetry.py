@@ -0,0 +1,61 @@
+"""
+Tests for the batched Vertex AI call telemetry sink and its report.
+"""
+import gzip
+import json
+import os
+
+from neoserve_ai.utils.telemetry import TelemetrySink
+from neoserve_ai.utils.telemetry_report import load_telemetry, summarize
+
+
+def test_flush_writes_compressed_ndjson_batch(tmp_path):
+    """Buffered records are written as one gzip NDJSON file per flush."""
+    sink = TelemetrySink(str(tmp_path), file_format="ndjson")
+    sink.record("model_call", "gemini-pro", 0.25, "success", payload_bytes=42)
+    sink.record("prediction", "intent_classifier", None, "error", error_type="TimeoutError")
+
+    path = sink.flush()
+    assert path.endswith(".ndjson.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["model"] for row in rows] == ["gemini-pro", "intent_classifier"]
+    assert rows[0]["latency_ms"] == 250.0
+    assert rows[1]["error_type"] == "TimeoutError"
+    assert sink.flush() is None
+
+
+def test_old_files_are_rotated_out(tmp_path):
+    """Only the newest max_files batch files are kept."""
+    sink = TelemetrySink(str(tmp_path), max_files=2, file_format="ndjson")
+    paths = []
+    for _ in range(4):
+        sink.record("model_call", "gemini-pro", 0.1, "success")
+        paths.append(sink.flush())
+
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths[2:])
+
+
+def test_background_thread_flushes_on_stop(tmp_path):
+    """Records still buffered at shutdown are written by stop()."""
+    sink = TelemetrySink(str(tmp_path), flush_interval=60, file_format="ndjson")
+    sink.start()
+    sink.record("model_call", "gemini-pro", 0.1, "success")
+    sink.stop()
+
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_report_percentiles_by_model(tmp_path):
+    """The report computes latency percentiles and error rates per model."""
+    sink = TelemetrySink(str(tmp_path), file_format="ndjson")
+    for ms in range(1, 101):
+        sink.record("model_call", "gemini-pro", ms / 1000, "success")
+    sink.record("prediction", "intent_classifier", 0.05, "error")
+    sink.flush()
+
+    summary = summarize(load_telemetry(str(tmp_path)), ["model"])
+    assert summary.loc["gemini-pro", "calls"] == 100
+    assert summary.loc["gemini-pro", "p50_ms"] == 50.5
+    assert summary.loc["gemini-pro", "p99_ms"] == 99.0
+    assert summary.loc["intent_classifier", "error_rate"] == 1.0
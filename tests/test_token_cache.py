@@ -0,0 +1,90 @@
+"""
+Tests for the verified-token cache and token revocation.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from neoserve_ai.utils.token_cache import TokenRevocationList, VerifiedTokenCache, token_digest
+from neoserve_ai.utils.user_repository import SQLiteUserRepository
+
+
+def test_cache_honors_exp_and_max_ttl():
+    """Entries expire at the token's exp or the cache's max TTL, whichever is first."""
+    cache = VerifiedTokenCache(max_ttl_seconds=60, revocations=TokenRevocationList())
+    now = time.time()
+
+    cache.put("valid", "user-a", expires_at=now + 3600)
+    cache.put("expired", "user-b", expires_at=now - 1)
+    assert cache.get("valid") == "user-a"
+    assert cache.get("expired") is None
+    assert cache._entries[next(iter(cache._entries))][0] <= now + 61
+
+
+def test_cache_evicts_least_recently_used():
+    """Past max_entries, the least recently used token is evicted."""
+    cache = VerifiedTokenCache(max_entries=2, revocations=TokenRevocationList())
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_revoked_token_is_not_served_from_cache():
+    """Revoking a token takes effect on the next lookup, until the token expires."""
+    revocations = TokenRevocationList()
+    cache = VerifiedTokenCache(revocations=revocations)
+    cache.put("token", "user")
+
+    revocations.revoke("token", expires_at=time.time() + 60)
+    assert cache.get("token") is None
+    assert revocations.is_revoked("token")
+
+    revocations.revoke("old", expires_at=time.time() - 1)
+    assert not revocations.is_revoked("old")
+
+
+def test_revocations_are_shared_through_the_store(tmp_path):
+    """A token revoked on one worker is no longer served from another worker's cache once it syncs."""
+    path = str(tmp_path / "users.db")
+    worker_a, worker_b = SQLiteUserRepository(path), SQLiteUserRepository(path)
+    revocations_a = TokenRevocationList(store=worker_a)
+    revocations_b = TokenRevocationList(store=worker_b)
+    cache_b = VerifiedTokenCache(revocations=revocations_b)
+    cache_b.put("token", "user")
+
+    revocations_a.revoke("token", expires_at=time.time() + 60)
+    revocations_a.revoke("expired", expires_at=time.time() - 1)
+    # Lookups only read memory; the store is read by sync()
+    assert cache_b.get("token") == "user"
+
+    revocations_b.sync()
+    assert cache_b.get("token") is None
+    assert not revocations_b.is_revoked("expired")
+    assert revocations_b._cursor == 1
+    worker_a.close()
+    worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_revocations_are_pulled_in_the_background(monkeypatch):
+    """run_sync reads the store from a worker thread, not from the event loop."""
+    threads = []
+
+    class Store:
+        def revoked_tokens_after(self, cursor):
+            threads.append(threading.current_thread())
+            return [(1, token_digest("token"), time.time() + 60)]
+
+    revocations = TokenRevocationList(store=Store(), sync_interval_seconds=0.01)
+    task = asyncio.create_task(revocations.run_sync())
+    await asyncio.sleep(0.05)
+    task.cancel()
+
+    assert revocations.is_revoked("token")
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,85 @@
+"""
+Tests for the SQLite user repository.
+"""
+import threading
+
+import pytest
+
+from neoserve_ai.schemas.user import UserInDB
+from neoserve_ai.utils.user_repository import (
+    SQLiteUserRepository,
+    UserAlreadyExistsError,
+    create_user_repository,
+    new_user_id,
+)
+
+
+def _user(email, user_id=None):
+    return UserInDB(email=email, user_id=user_id or new_user_id(), hashed_password="x", status="active")
+
+
+def test_lookup_by_email_and_id(tmp_path):
+    """Users are found by (case-insensitive) email and by ID, also from a fresh instance."""
+    path = str(tmp_path / "users.db")
+    repository = SQLiteUserRepository(path)
+    created = repository.create(_user("Alice@example.com", "user_a"))
+
+    assert repository.get_by_email("alice@example.com") == created
+    assert repository.get_by_id("user_a") == created
+    assert repository.get_by_email("bob@example.com") is None
+
+    other_worker = SQLiteUserRepository(path)
+    assert other_worker.get_by_id("user_a").email == "Alice@example.com"
+    repository.close()
+    other_worker.close()
+
+
+def test_unique_email_and_id(tmp_path):
+    """Duplicate emails or IDs are rejected by the unique indexes."""
+    repository = create_user_repository(f"sqlite:///{tmp_path / 'users.db'}")
+    repository.create(_user("alice@example.com", "user_a"))
+
+    with pytest.raises(UserAlreadyExistsError):
+        repository.create(_user("ALICE@example.com"))
+    with pytest.raises(UserAlreadyExistsError):
+        repository.create(_user("bob@example.com", "user_a"))
+    repository.close()
+
+
+def test_concurrent_registration_creates_one_user(tmp_path):
+    """Of many threads registering the same email, exactly one succeeds."""
+    repository = SQLiteUserRepository(str(tmp_path / "users.db"), pool_size=4)
+    results = []
+
+    def register():
+        try:
+            repository.create(_user("race@example.com"))
+            results.append("created")
+        except UserAlreadyExistsError:
+            results.append("exists")
+
+    threads = [threading.Thread(target=register) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ["created"] + ["exists"] * 7
+    repository.close()
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_use_a_thread_only_on_cache_misses(tmp_path, monkeypatch):
+    """Async reads and writes go through a worker thread unless the user is cached."""
+    repository = SQLiteUserRepository(str(tmp_path / "users.db"))
+    created = await repository.create_async(_user("alice@example.com", "user_a"))
+    repository._cache.clear()
+
+    calls = []
+    original = repository._query
+    monkeypatch.setattr(repository, "_query", lambda *args: calls.append(threading.current_thread()) or original(*args))
+
+    assert await repository.get_by_email_async("Alice@example.com") == created
+    assert await repository.get_by_email_async("alice@example.com") == created
+    assert len(calls) == 1 and calls[0] is not threading.main_thread()
+    repository.close()
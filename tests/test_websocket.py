@@ -0,0 +1,57 @@
+"""
+Tests for the WebSocket chat connection handling.
+"""
+import asyncio
+
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from neoserve_ai.utils.websocket import ChatConnection, WebSocketConnectionManager
+
+
+def _echo_app(max_pending_messages: int = 16) -> FastAPI:
+    app = FastAPI()
+
+    async def handler(payload):
+        await asyncio.sleep(0.01)
+        return {"type": "response", "correlation_id": payload.get("message_id"), "response": payload["message"]}
+
+    @app.websocket("/ws")
+    async def endpoint(websocket: WebSocket):
+        await websocket.accept()
+        await ChatConnection(websocket, handler, max_pending_messages=max_pending_messages).run()
+
+    return app
+
+
+def test_pipelined_messages_are_answered_in_order():
+    """Several messages sent without waiting are answered in the order they were sent."""
+    with TestClient(_echo_app()).websocket_connect("/ws") as ws:
+        for i in range(3):
+            ws.send_json({"type": "message", "message": f"m{i}", "message_id": str(i)})
+        ws.send_json({"type": "ping"})
+
+        frames = [ws.receive_json() for _ in range(4)]
+
+    assert {"type": "pong"} in frames
+    responses = [frame["correlation_id"] for frame in frames if frame["type"] == "response"]
+    assert responses == ["0", "1", "2"]
+
+
+def test_unknown_message_types_are_rejected():
+    """Frames that are not chat messages or heartbeats get an error frame."""
+    with TestClient(_echo_app()).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "subscribe"})
+        assert ws.receive_json()["type"] == "error"
+
+
+def test_connection_manager_enforces_limit():
+    """Connections beyond the limit are refused until one is released."""
+    manager = WebSocketConnectionManager(max_connections=1)
+    first, second = object(), object()
+
+    assert manager.register(first)
+    assert not manager.register(second)
+    manager.unregister(first)
+    assert manager.register(second)
+    assert manager.count == 1